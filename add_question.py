@@ -12,64 +12,51 @@ Usage:
     --question "Hvad symboliserer GWE'en til \"Taegeuk Il Jang\"?" \\
     --correct "Himmeriget/lyset (Keon)" \\
     --incorrect "Glæde/flod (Tae)" --incorrect "Ild/solen (Ri)" --incorrect "Torden (Jin)"
+
+  # Bulk import from CSV, JSONL or a roskilde-source style markdown table
+  python3 add_question.py import new-terms.csv
+  python3 add_question.py import roskilde-source/10-kup.md --dry-run
 """
 
-import json
 import argparse
+import csv
+import json
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from markdown_tables import is_theory_table, parse_markdown_table
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, QuestionBank, canonicalize_text, load_bank_or_exit, theory_prefix, vocab_prefix
 
 
-def load_questions(json_path: Path) -> Dict:
+def load_questions(json_path: Path) -> QuestionBank:
     """Load questions.json"""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_bank_or_exit(json_path)
 
 
-def save_questions(json_path: Path, data: Dict) -> None:
-    """Save questions.json with pretty formatting"""
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_questions(json_path: Path, bank: QuestionBank, journal: bool = False) -> None:
+    """Save questions.json with pretty formatting, or append the edit to its change journal"""
+    if journal:
+        bank.save_changes()
+    else:
+        bank.save(json_path)
 
 
-def generate_vocab_id(data: Dict, belt_rank: str, category: str) -> str:
+def generate_vocab_id(bank: QuestionBank, belt_rank: str, category: str) -> str:
     """Generate next available vocabulary question ID"""
-    prefix = f"vocab-{belt_rank}-{category}-"
-    existing_ids = [
-        q['id'] for q in data.get('vocabularyQuestions', [])
-        if q['id'].startswith(prefix)
-    ]
-
-    if not existing_ids:
-        return f"{prefix}001"
-
-    # Extract numbers and find max
-    numbers = [int(id.split('-')[-1]) for id in existing_ids]
-    next_num = max(numbers) + 1
-    return f"{prefix}{next_num:03d}"
+    return bank.allocate_id(vocab_prefix(belt_rank, category))
 
 
-def generate_theory_id(data: Dict, belt_rank: str) -> str:
+def generate_theory_id(bank: QuestionBank, belt_rank: str) -> str:
     """Generate next available theory question ID"""
-    prefix = f"theory-{belt_rank}-"
-    existing_ids = [
-        q['id'] for q in data.get('theoryQuestions', [])
-        if q['id'].startswith(prefix)
-    ]
-
-    if not existing_ids:
-        return f"{prefix}001"
-
-    # Extract numbers and find max
-    numbers = [int(id.split('-')[-1]) for id in existing_ids]
-    next_num = max(numbers) + 1
-    return f"{prefix}{next_num:03d}"
+    return bank.allocate_id(theory_prefix(belt_rank))
 
 
-def add_vocabulary_question(data: Dict, belt_rank: str, category: str,
-                           korean: str, danish: str, english: str = None) -> Dict:
-    """Add a vocabulary question"""
-    question_id = generate_vocab_id(data, belt_rank, category)
+def build_vocabulary_question(bank: QuestionBank, belt_rank: str, category: str,
+                              korean: str, danish: str, english: str = None) -> Dict:
+    """Create a vocabulary question with a new ID and add it to the bank"""
+    question_id = generate_vocab_id(bank, belt_rank, category)
 
     new_question = {
         "id": question_id,
@@ -87,10 +74,15 @@ def add_vocabulary_question(data: Dict, belt_rank: str, category: str,
         }
     }
 
-    if 'vocabularyQuestions' not in data:
-        data['vocabularyQuestions'] = []
+    return bank.add('vocabulary', new_question)
+
 
-    data['vocabularyQuestions'].append(new_question)
+def add_vocabulary_question(bank: QuestionBank, belt_rank: str, category: str,
+                           korean: str, danish: str, english: str = None) -> QuestionBank:
+    """Add a vocabulary question"""
+    question_id = build_vocabulary_question(
+        bank, belt_rank, category, korean, danish, english
+    )['id']
 
     print(f"✓ Added vocabulary question: {question_id}")
     print(f"  Korean: {korean}")
@@ -98,13 +90,14 @@ def add_vocabulary_question(data: Dict, belt_rank: str, category: str,
     if english:
         print(f"  English: {english}")
 
-    return data
+    return bank
 
 
-def add_theory_question(data: Dict, belt_rank: str, question_da: str,
-                       correct_da: str, incorrect_da: List[str]) -> Dict:
-    """Add a theory question"""
-    question_id = generate_theory_id(data, belt_rank)
+def build_theory_question(bank: QuestionBank, belt_rank: str, question_da: str,
+                          correct_da: str, incorrect_da: List[str],
+                          category: Optional[str] = None) -> Dict:
+    """Create a theory question with a new ID and add it to the bank"""
+    question_id = generate_theory_id(bank, belt_rank)
 
     new_question = {
         "id": question_id,
@@ -123,17 +116,25 @@ def add_theory_question(data: Dict, belt_rank: str, question_da: str,
         }
     }
 
-    if 'theoryQuestions' not in data:
-        data['theoryQuestions'] = []
+    if category:
+        new_question["category"] = category
+
+    return bank.add('theory', new_question)
+
 
-    data['theoryQuestions'].append(new_question)
+def add_theory_question(bank: QuestionBank, belt_rank: str, question_da: str,
+                       correct_da: str, incorrect_da: List[str]) -> QuestionBank:
+    """Add a theory question"""
+    question_id = build_theory_question(
+        bank, belt_rank, question_da, correct_da, incorrect_da
+    )['id']
 
     print(f"✓ Added theory question: {question_id}")
     print(f"  Question: {question_da}")
     print(f"  Correct: {correct_da}")
     print(f"  Incorrect: {', '.join(incorrect_da)}")
 
-    return data
+    return bank
 
 
 def validate_belt_rank(belt_rank: str) -> bool:
@@ -155,54 +156,321 @@ def validate_category(category: str) -> bool:
     return category in valid_categories
 
 
+# Category labels used in the first column of roskilde-source vocabulary tables
+MARKDOWN_CATEGORY_LABELS = {
+    'STAND': 'stances',
+    'HÅNDTEKNIK': 'hand_techniques',
+    'BENTEKNIK': 'leg_techniques',
+    'TEORI': 'theory_terms',
+}
+
+
+def _incorrect_answers(row: Dict) -> List[str]:
+    """Collect incorrect answers from 'incorrect' (list or '|'-separated) or 'incorrect_N' fields"""
+    value = row.get('incorrect')
+    if isinstance(value, list):
+        answers = list(value)
+    elif value:
+        answers = value.split('|')
+    else:
+        answers = [
+            row[key] for key in sorted(row)
+            if key and key.startswith('incorrect_') and row[key]
+        ]
+    return [answer.strip() for answer in answers if answer and answer.strip()]
+
+
+def iter_csv_rows(path: Path) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, row) from a CSV file with a header row"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, {k.strip().lower(): (v or '').strip() for k, v in row.items() if k}
+
+
+def iter_jsonl_rows(path: Path) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, row) from a JSON Lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_num, {'_error': f"invalid JSON: {e.msg}"}
+
+
+def iter_markdown_rows(path: Path) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yield (row number, row) from a roskilde-source style markdown table.
+
+    Vocabulary tables have the belt rank in the first header cell
+    ('10-kup | Koreansk | Dansk | ID'); theory tables start with 'Belt Rank'.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = parse_markdown_table(f.read())
+
+    if not rows:
+        return
+
+    header = rows[0]
+    is_theory = is_theory_table(rows)
+    belt_rank = header[0].replace('-', '_').lower()
+
+    for row_num, row in enumerate(rows[1:], 2):
+        if len(row) < 3:
+            continue
+        if is_theory:
+            yield row_num, {
+                'type': 'theory',
+                'belt': row[0].replace('-', '_').lower(),
+                'question': row[1],
+                'correct': row[2],
+                'incorrect': [
+                    cell for cell in row[3:6]
+                    if not cell.startswith('theory-') and cell != 'Not found'
+                ],
+            }
+        else:
+            label = row[0].strip().upper()
+            yield row_num, {
+                'type': 'vocab',
+                'belt': belt_rank,
+                'category': MARKDOWN_CATEGORY_LABELS.get(label, label),
+                'korean': row[1],
+                'danish': row[2],
+            }
+
+
+IMPORT_READERS = {
+    'csv': iter_csv_rows,
+    'jsonl': iter_jsonl_rows,
+    'md': iter_markdown_rows,
+}
+
+
+def import_row(bank: QuestionBank, row: Dict, seen: set) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Validate one import row and add it to the bank.
+
+    Returns (question, None) on success, (None, reason) if the row is skipped
+    as a duplicate, and raises ValueError if the row is invalid.
+    """
+    if '_error' in row:
+        raise ValueError(row['_error'])
+
+    belt_rank = (row.get('belt') or row.get('beltRank') or '').strip()
+    question_type = (row.get('type') or ('theory' if row.get('question') else 'vocab')).strip()
+
+    if not validate_belt_rank(belt_rank):
+        raise ValueError(f"invalid belt rank '{belt_rank}'")
+
+    if question_type == 'vocab':
+        category = (row.get('category') or '').strip()
+        korean = (row.get('korean') or '').strip()
+        danish = (row.get('danish') or '').strip()
+        if not validate_category(category):
+            raise ValueError(f"invalid category '{category}'")
+        if not korean or not danish:
+            raise ValueError("korean and danish are required")
+
+        key = ('vocab', belt_rank, category, korean.lower())
+        if key in seen or any(
+            q['beltRank'] == belt_rank and q['category'] == category
+            for q in bank.find_by_korean(korean)
+        ):
+            return None, f"'{korean}' already exists for {belt_rank}/{category}"
+        seen.add(key)
+
+        return build_vocabulary_question(
+            bank, belt_rank, category, korean, danish, row.get('english')
+        ), None
+
+    if question_type == 'theory':
+        question_da = (row.get('question') or '').strip()
+        correct_da = (row.get('correct') or '').strip()
+        incorrect_da = _incorrect_answers(row)
+        if not question_da or not correct_da:
+            raise ValueError("question and correct are required")
+        if len(incorrect_da) < 1 or len(incorrect_da) > 3:
+            raise ValueError(f"must provide 1-3 incorrect answers (got {len(incorrect_da)})")
+
+        key = ('theory', canonicalize_text(question_da))
+        if key in seen or bank.find_by_question_text(question_da):
+            return None, f"question already exists: {question_da}"
+        seen.add(key)
+
+        return build_theory_question(
+            bank, belt_rank, question_da, correct_da, incorrect_da,
+            category=(row.get('category') or '').strip() or None
+        ), None
+
+    raise ValueError(f"unknown question type '{question_type}'")
+
+
+def import_questions(bank: QuestionBank, source: Path, file_format: str) -> Dict:
+    """
+    Import all rows of a source file into the bank in one pass.
+
+    Returns a stats dict with 'added', 'skipped' and 'errors' lists.
+    """
+    stats = {'added': [], 'skipped': [], 'errors': [], 'rows': 0}
+    seen = set()
+
+    for line_num, row in IMPORT_READERS[file_format](source):
+        stats['rows'] += 1
+        try:
+            question, reason = import_row(bank, row, seen)
+        except ValueError as e:
+            stats['errors'].append((line_num, str(e)))
+            continue
+
+        if question is None:
+            stats['skipped'].append((line_num, reason))
+        else:
+            stats['added'].append(question['id'])
+
+    return stats
+
+
+def run_import(json_path: Path, args) -> int:
+    """Run the import subcommand"""
+    source = Path(args.source)
+    if not source.exists():
+        print(f"❌ Error: {source} not found")
+        return 1
+
+    file_format = args.format or source.suffix.lstrip('.').lower()
+    if file_format == 'markdown':
+        file_format = 'md'
+    if file_format not in IMPORT_READERS:
+        print(f"❌ Error: Unknown import format '{file_format}' (use csv, jsonl or md)")
+        return 1
+
+    start = time.perf_counter()
+    bank = load_questions(json_path)
+    with stage('import') as timing:
+        stats = import_questions(bank, source, file_format)
+        timing.rows = stats['rows']
+    elapsed = time.perf_counter() - start
+
+    for line_num, reason in stats['skipped']:
+        print(f"  ⚠️  Line {line_num}: skipped, {reason}")
+    for line_num, error in stats['errors']:
+        print(f"  ❌ Line {line_num}: {error}")
+
+    rate = stats['rows'] / elapsed if elapsed > 0 else 0
+
+    print(f"\n{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Rows read: {stats['rows']}")
+    print(f"  ✓ Added: {len(stats['added'])}")
+    print(f"  ⚠️  Skipped (already exists): {len(stats['skipped'])}")
+    print(f"  ✗ Invalid: {len(stats['errors'])}")
+    print(f"Throughput: {rate:,.0f} rows/s ({elapsed:.3f}s)")
+
+    summary = {'rows': stats['rows'], 'added': len(stats['added']),
+               'skipped': len(stats['skipped']), 'invalid': len(stats['errors'])}
+
+    if stats['errors'] and not args.skip_invalid:
+        print(f"\n❌ Import aborted, questions.json not changed. Fix the rows above or use --skip-invalid.")
+        print_profile(args, summary)
+        return 1
+
+    if args.dry_run:
+        print(f"\n✓ Dry run complete. No changes saved.")
+    elif stats['added']:
+        save_questions(json_path, bank)
+        print(f"\n✓ questions.json updated successfully")
+
+    print_profile(args, summary)
+    return 0
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, store_default=DEFAULT_JSON_PATH) -> None:
+    """--store and the profiling options, shared by every subcommand."""
+    parser.add_argument('--store', type=Path, default=store_default,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Add questions (vocabulary or theory) to questions.json',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__
     )
-
+    add_common_arguments(parser)
+    # Subcommands accept the same options; SUPPRESS defaults keep them from
+    # overwriting a value given before the subcommand
+    common = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    add_common_arguments(common, store_default=argparse.SUPPRESS)
     subparsers = parser.add_subparsers(dest='type', help='Question type')
 
     # Vocabulary question subcommand
-    vocab_parser = subparsers.add_parser('vocab', help='Add vocabulary question')
+    vocab_parser = subparsers.add_parser('vocab', help='Add vocabulary question', parents=[common])
     vocab_parser.add_argument('--belt', required=True, help='Belt rank (e.g., 8_kup, 1_dan)')
     vocab_parser.add_argument('--category', required=True,
                              help='Category (stances, hand_techniques, leg_techniques, theory_terms, miscellaneous)')
     vocab_parser.add_argument('--korean', required=True, help='Korean term (romanized)')
     vocab_parser.add_argument('--danish', required=True, help='Danish translation')
     vocab_parser.add_argument('--english', help='English translation (optional)')
+    vocab_parser.add_argument('--journal', action='store_true',
+                             help='Append to the change journal instead of rewriting questions.json')
 
     # Theory question subcommand
-    theory_parser = subparsers.add_parser('theory', help='Add theory question')
+    theory_parser = subparsers.add_parser('theory', help='Add theory question', parents=[common])
     theory_parser.add_argument('--belt', required=True, help='Belt rank (e.g., 1_dan, 2_dan)')
     theory_parser.add_argument('--question', required=True, help='Question text in Danish')
     theory_parser.add_argument('--correct', required=True, help='Correct answer in Danish')
     theory_parser.add_argument('--incorrect', action='append', required=True,
                               help='Incorrect answer in Danish (can be repeated 1-3 times)')
+    theory_parser.add_argument('--journal', action='store_true',
+                              help='Append to the change journal instead of rewriting questions.json')
+
+    # Bulk import subcommand
+    import_parser = subparsers.add_parser(
+        'import', help='Import many questions from a CSV, JSONL or markdown file', parents=[common]
+    )
+    import_parser.add_argument('source', help='File to import')
+    import_parser.add_argument('--format', choices=['csv', 'jsonl', 'md'],
+                               help='Input format (default: from file extension)')
+    import_parser.add_argument('--skip-invalid', action='store_true',
+                               help='Import valid rows even if some rows are invalid')
+    import_parser.add_argument('--dry-run', action='store_true',
+                               help='Validate and report without saving')
 
     args = parser.parse_args()
+    start_profiling(args)
 
     if not args.type:
         parser.print_help()
         return
 
+    if args.type == 'import':
+        json_path = args.store
+        if not json_path.exists():
+            print(f"❌ Error: questions.json not found at {json_path}")
+            return 1
+        return run_import(json_path, args)
+
     # Validate belt rank
     if not validate_belt_rank(args.belt):
         print(f"❌ Error: Invalid belt rank '{args.belt}'")
         print("Valid ranks: 10_kup, 9_kup, ..., 1_kup, 1_dan, 2_dan, 3_dan, ...")
         return
 
-    # Path to questions.json
-    script_dir = Path(__file__).parent
-    json_path = script_dir / 'src' / 'data' / 'questions.json'
+    # Path to questions.json (or the SQLite store)
+    json_path = args.store
 
     if not json_path.exists():
         print(f"❌ Error: questions.json not found at {json_path}")
         return
 
     # Load data
-    data = load_questions(json_path)
+    bank = load_questions(json_path)
 
     # Add question based on type
     if args.type == 'vocab':
@@ -211,8 +479,8 @@ def main():
             print("Valid categories: stances, hand_techniques, leg_techniques, theory_terms, miscellaneous")
             return
 
-        data = add_vocabulary_question(
-            data, args.belt, args.category,
+        bank = add_vocabulary_question(
+            bank, args.belt, args.category,
             args.korean, args.danish, args.english
         )
 
@@ -221,15 +489,19 @@ def main():
             print(f"❌ Error: Must provide 1-3 incorrect answers (got {len(args.incorrect)})")
             return
 
-        data = add_theory_question(
-            data, args.belt, args.question,
+        bank = add_theory_question(
+            bank, args.belt, args.question,
             args.correct, args.incorrect
         )
 
     # Save updated data
-    save_questions(json_path, data)
-    print(f"\n✓ questions.json updated successfully")
+    save_questions(json_path, bank, journal=args.journal)
+    if args.journal:
+        print(f"\n✓ Change journaled (run 'python3 question_bank.py compact' before building)")
+    else:
+        print(f"\n✓ questions.json updated successfully")
+    print_profile(args, {'added': 1})
 
 
 if __name__ == '__main__':
-    main()
+    exit(main())
@@ -4,35 +4,16 @@
 Add a new vocabulary question to questions.json with command-line parameters.
 """
 
-import json
 import argparse
 from pathlib import Path
 
+from profiling import add_profile_arguments, print_profile, start_profiling
+from question_bank import DEFAULT_JSON_PATH, load_bank_or_exit, vocab_prefix
 
-def get_next_id_number(questions, belt_rank, category):
-    """Find the next available ID number for a given belt rank and category."""
-    prefix = f"vocab-{belt_rank}-{category}-"
-    max_num = 0
 
-    for question in questions:
-        question_id = question.get('id', '')
-        if question_id.startswith(prefix):
-            try:
-                num = int(question_id.split('-')[-1])
-                max_num = max(max_num, num)
-            except ValueError:
-                continue
-
-    return max_num + 1
-
-
-def add_vocabulary_question(data, belt_rank, category, korean, danish, english):
-    """Add a new vocabulary question to the data."""
-    vocab_questions = data['vocabularyQuestions']
-
-    # Get next ID number
-    next_num = get_next_id_number(vocab_questions, belt_rank, category)
-    question_id = f"vocab-{belt_rank}-{category}-{next_num:03d}"
+def add_vocabulary_question(bank, belt_rank, category, korean, danish, english):
+    """Add a new vocabulary question to the bank."""
+    question_id = bank.allocate_id(vocab_prefix(belt_rank, category))
 
     # Create new question
     new_question = {
@@ -51,8 +32,8 @@ def add_vocabulary_question(data, belt_rank, category, korean, danish, english):
         }
     }
 
-    # Add to list
-    vocab_questions.append(new_question)
+    # Add to bank
+    bank.add('vocabulary', new_question)
 
     return question_id, new_question
 
@@ -89,11 +70,16 @@ Valid categories:
                        help='English translation')
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be added without saving')
+    parser.add_argument('--journal', action='store_true',
+                       help='Append to the change journal instead of rewriting questions.json')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                       help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
+    start_profiling(args)
 
-    script_dir = Path(__file__).parent
-    json_path = script_dir / 'src' / 'data' / 'questions.json'
+    json_path = args.store
 
     if not json_path.exists():
         print(f"❌ Error: questions.json not found at {json_path}")
@@ -116,12 +102,11 @@ Valid categories:
         return 1
 
     # Load questions.json
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    bank = load_bank_or_exit(json_path)
 
     # Add new question
     question_id, new_question = add_vocabulary_question(
-        data,
+        bank,
         belt_rank=args.belt,
         category=args.category,
         korean=args.korean,
@@ -139,14 +124,18 @@ Valid categories:
 
     if args.dry_run:
         print(f"\n✓ Dry run complete. No changes saved.")
+        print_profile(args, {'added': 0})
         return 0
 
     # Save updated questions.json
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"\n✅ Successfully added question to questions.json")
-    print(f"Total vocabulary questions: {len(data['vocabularyQuestions'])}")
+    if args.journal:
+        bank.save_changes()
+        print(f"\n✅ Successfully journaled question (run 'python3 question_bank.py compact' before building)")
+    else:
+        bank.save(json_path)
+        print(f"\n✅ Successfully added question to questions.json")
+    print(f"Total vocabulary questions: {len(bank.vocabulary)}")
+    print_profile(args, {'added': 1})
 
     return 0
 
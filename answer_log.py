@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Reader for answer logs: JSONL files with one event per answered question.
+
+  {"user": "anna", "id": "vocab-8_kup-stances-002", "chosen": "Hestestand",
+   "correct": "Hestestand", "direction": "ko_to_da", "latency": 2350,
+   "time": "2026-03-01T18:04:11+00:00"}
+
+  user       student (scheduler.py keeps progress per user)
+  id         question ID in questions.json
+  chosen     the answer the student picked
+  correct    the correct answer shown
+  direction  ko_to_da or da_to_ko for vocabulary, absent for theory
+  latency    milliseconds from showing the question to answering
+  time       ISO 8601 or seconds since the epoch
+
+Files are read line by line ('-' reads stdin, *.gz is decompressed), so logs
+of any size can be streamed.
+"""
+
+import gzip
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+
+DIRECTIONS = ('ko_to_da', 'da_to_ko')
+
+
+class AnswerLogError(Exception):
+    """An answer log line is not a JSON object."""
+
+
+def _open(path: Union[str, Path]):
+    if str(path) == '-':
+        return sys.stdin
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_events(path: Union[str, Path]) -> Iterator[Dict]:
+    """Yield the events of an answer log one at a time."""
+    # raw_decode skips json.loads' per-call checks; anything unusual gets the full parse
+    raw_decode = json.JSONDecoder().raw_decode
+    f = _open(path)
+    try:
+        for line_num, line in enumerate(f, 1):
+            try:
+                event, end = raw_decode(line)
+                if end != len(line) and line[end:].strip():
+                    raise ValueError(line)
+            except ValueError:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise AnswerLogError(f"{path}:{line_num}: {e}") from None
+            if not isinstance(event, dict):
+                raise AnswerLogError(f"{path}:{line_num}: expected a JSON object")
+            yield event
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def is_correct(event: Dict) -> bool:
+    return event.get('chosen') is not None and event.get('chosen') == event.get('correct')
+
+
+def event_time(event: Dict) -> Optional[float]:
+    """Seconds since the epoch of an event (None if it has no time). Raises ValueError if it is invalid."""
+    value = event.get('time')
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"invalid time: {value!r}")
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def event_latency(event: Dict) -> Optional[float]:
+    """Milliseconds an event took (None if it has none). Raises ValueError if it is not a number."""
+    value = event.get('latency')
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"invalid latency: {value!r}")
+    return value
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# Run with: python3 answer_stats.py ingest answers.jsonl [more.jsonl.gz] | report
+"""
+Item statistics per question from answer logs (see answer_log.py).
+
+'ingest' streams the events and adds them to the stats file
+(answer-stats.json by default, ignored by git as it names students), so
+each log only has to be read once; run it again with new logs to add them.
+Events with a latency that is not a number are skipped. For every question
+ID and direction (ko_to_da, da_to_ko, or 'none' for theory) it keeps a
+fixed set of counters:
+
+  difficulty      share of answers that were correct
+  discrimination  correlation between answering correctly and the student's
+                  accuracy on earlier answers (point-biserial; high values
+                  mean strong students get it right and weak ones do not)
+  pick rates      how often each wrong answer was chosen, for the
+                  MAX_TRACKED_ANSWERS most picked (Space-Saving counts, so
+                  memory per question stays fixed however many answers a
+                  log contains)
+  latency         mean milliseconds to answer
+
+The students' running accuracy is kept per user as two counters. Each
+ingest run is numbered (batch); questions record the last batch that
+changed them, so later jobs (rank_distractors.py) only recompute questions
+with new answers.
+
+'report' prints the hardest and least discriminating questions.
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from answer_log import DIRECTIONS, AnswerLogError, event_latency, iter_events
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, load_bank_or_exit
+
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_STATS_PATH = SCRIPT_DIR / 'answer-stats.json'
+
+FORMAT_VERSION = 1
+
+# Direction key for answers without a direction (theory questions)
+NO_DIRECTION = 'none'
+
+# Wrong answers counted per question and direction
+MAX_TRACKED_ANSWERS = 16
+
+# Answers needed before difficulty and discrimination are reported
+MIN_RESPONSES = 20
+
+# Order of the counters in the stats file
+FIELDS = ['n', 'correct', 'sumAbility', 'sumAbility2', 'sumCorrectAbility',
+          'latencySum', 'latencyCount', 'batch', 'picks']
+
+
+class ItemStats:
+    """Streaming counters for one question and direction."""
+
+    __slots__ = ('n', 'correct', 'sum_ability', 'sum_ability2', 'sum_correct_ability',
+                 'latency_sum', 'latency_count', 'batch', 'picks')
+
+    def __init__(self):
+        self.n = 0
+        self.correct = 0
+        self.sum_ability = 0.0
+        self.sum_ability2 = 0.0
+        self.sum_correct_ability = 0.0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.batch = 0
+        # Wrong answer -> times chosen (at most MAX_TRACKED_ANSWERS)
+        self.picks: Dict[str, int] = {}
+
+    def add(self, correct: bool, ability: float, chosen: Optional[str], latency, batch: int) -> None:
+        self.n += 1
+        self.sum_ability += ability
+        self.sum_ability2 += ability * ability
+        if correct:
+            self.correct += 1
+            self.sum_correct_ability += ability
+        elif chosen is not None:
+            picks = self.picks
+            if chosen in picks:
+                picks[chosen] += 1
+            elif len(picks) < MAX_TRACKED_ANSWERS:
+                picks[chosen] = 1
+            else:
+                # Space-Saving: the new answer takes over the smallest count
+                smallest = min(picks, key=picks.get)
+                picks[chosen] = picks.pop(smallest) + 1
+        if latency is not None:
+            self.latency_sum += latency
+            self.latency_count += 1
+        self.batch = batch
+
+    # Derived statistics
+
+    def difficulty(self) -> Optional[float]:
+        """Share of correct answers."""
+        return self.correct / self.n if self.n >= MIN_RESPONSES else None
+
+    def discrimination(self) -> Optional[float]:
+        """Point-biserial correlation of correctness with student accuracy."""
+        n = self.n
+        if n < MIN_RESPONSES:
+            return None
+        variance_x = n * self.correct - self.correct * self.correct
+        variance_a = n * self.sum_ability2 - self.sum_ability * self.sum_ability
+        if variance_x <= 0 or variance_a <= 1e-12:
+            return None
+        covariance = n * self.sum_correct_ability - self.correct * self.sum_ability
+        return covariance / math.sqrt(variance_x * variance_a)
+
+    def pick_rates(self) -> Dict[str, float]:
+        """Share of all answers that chose each tracked wrong answer."""
+        return {answer: count / self.n for answer, count in self.picks.items()} if self.n else {}
+
+    def mean_latency(self) -> Optional[float]:
+        return self.latency_sum / self.latency_count if self.latency_count else None
+
+    def to_json(self) -> List:
+        return [self.n, self.correct, round(self.sum_ability, 6), round(self.sum_ability2, 6),
+                round(self.sum_correct_ability, 6), self.latency_sum, self.latency_count,
+                self.batch, self.picks]
+
+    @classmethod
+    def from_json(cls, row: List) -> 'ItemStats':
+        stats = cls()
+        (stats.n, stats.correct, stats.sum_ability, stats.sum_ability2, stats.sum_correct_ability,
+         stats.latency_sum, stats.latency_count, stats.batch, stats.picks) = row
+        return stats
+
+
+class AnswerStats:
+    """ItemStats per question ID and direction, plus each student's running accuracy."""
+
+    def __init__(self):
+        self.batch = 0
+        self.events = 0
+        # question ID -> direction -> ItemStats
+        self.questions: Dict[str, Dict[str, ItemStats]] = {}
+        # user -> [answers, correct]
+        self.users: Dict[str, List[int]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> 'AnswerStats':
+        """Stats from a file, or empty stats if it does not exist."""
+        stats = cls()
+        if not Path(path).exists():
+            return stats
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != FORMAT_VERSION or data.get('fields') != FIELDS:
+            raise ValueError(f"Unsupported stats file format in {path}")
+        stats.batch = data['batch']
+        stats.events = data['events']
+        stats.questions = {
+            question_id: {direction: ItemStats.from_json(row) for direction, row in directions.items()}
+            for question_id, directions in data['questions'].items()
+        }
+        stats.users = data['users']
+        return stats
+
+    def save(self, path: Path, content: Optional[str] = None) -> None:
+        """
+        Write the stats file (content: format() output, if already made).
+
+        Writes to a temporary file and moves it into place, so a crash never
+        loses the counters accumulated so far.
+        """
+        if content is None:
+            content = self.format()
+        fd, tmp_path = tempfile.mkstemp(dir=Path(path).parent, prefix='.answer-stats-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, question_id: str) -> Dict[str, ItemStats]:
+        return self.questions.get(question_id, {})
+
+    def ingest(self, events: Iterable[Dict], known_ids: Optional[set] = None) -> Dict[str, int]:
+        """
+        Add answer events as a new batch.
+
+        Returns:
+            Counts of 'events', 'added', 'unknown' (question ID not in
+            known_ids, or no ID) and 'malformed' (latency not a number)
+        """
+        self.batch += 1
+        batch = self.batch
+        counts = {'events': 0, 'added': 0, 'unknown': 0, 'malformed': 0}
+        questions = self.questions
+        users = self.users
+
+        for event in events:
+            counts['events'] += 1
+            question_id = event.get('id')
+            if question_id is None or (known_ids is not None and question_id not in known_ids):
+                counts['unknown'] += 1
+                continue
+            try:
+                latency = event_latency(event)
+            except ValueError:
+                counts['malformed'] += 1
+                continue
+
+            direction = event.get('direction')
+            if direction not in DIRECTIONS:
+                direction = NO_DIRECTION
+            by_direction = questions.get(question_id)
+            if by_direction is None:
+                by_direction = questions[question_id] = {}
+            item = by_direction.get(direction)
+            if item is None:
+                item = by_direction[direction] = ItemStats()
+
+            chosen = event.get('chosen')
+            correct = chosen is not None and chosen == event.get('correct')
+            name = event.get('user') or ''
+            user = users.get(name)
+            if user is None:
+                user = users[name] = [0, 0]
+            # Accuracy on earlier answers, smoothed towards 1/2 for new students
+            ability = (user[1] + 1) / (user[0] + 2)
+            item.add(correct, ability, chosen, latency, batch)
+            user[0] += 1
+            user[1] += correct
+            counts['added'] += 1
+
+        self.events += counts['added']
+        return counts
+
+    def format(self) -> str:
+        """Compact JSON: one question per line."""
+        head = json.dumps({'version': FORMAT_VERSION, 'fields': FIELDS, 'batch': self.batch,
+                           'events': self.events}, ensure_ascii=False)[:-1]
+        lines = [head + ', "questions": {']
+        items = sorted(self.questions.items())
+        lines.append(',\n'.join(
+            f"  {json.dumps(question_id, ensure_ascii=False)}: "
+            + json.dumps({d: item.to_json() for d, item in sorted(directions.items())},
+                         ensure_ascii=False, separators=(',', ':'))
+            for question_id, directions in items
+        ))
+        lines.append('}, "users": ' + json.dumps(self.users, ensure_ascii=False, separators=(',', ':')) + '}')
+        return '\n'.join(lines) + '\n'
+
+
+def print_report(stats: AnswerStats, limit: int) -> None:
+    rows = []
+    for question_id, directions in stats.questions.items():
+        for direction, item in directions.items():
+            if item.difficulty() is not None:
+                rows.append((question_id, direction, item))
+
+    print(f"Questions with at least {MIN_RESPONSES} answers: {len(rows)}\n")
+
+    print(f"Hardest (share correct):")
+    for question_id, direction, item in sorted(rows, key=lambda r: r[2].difficulty())[:limit]:
+        top = max(item.picks.items(), key=lambda p: p[1], default=None)
+        picked = f"  most picked: '{top[0]}' ({top[1] / item.n:.0%})" if top else ''
+        print(f"  {item.difficulty():5.0%} {question_id} {direction} (n={item.n}){picked}")
+
+    scored = [r for r in rows if r[2].discrimination() is not None]
+    print(f"\nLeast discriminating (correlation with student accuracy):")
+    for question_id, direction, item in sorted(scored, key=lambda r: r[2].discrimination())[:limit]:
+        print(f"  {item.discrimination():+.2f} {question_id} {direction} (n={item.n})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Item statistics from answer logs')
+    parser.add_argument('command', choices=['ingest', 'report'],
+                        help='ingest: add answer logs to the stats file; report: print item statistics')
+    parser.add_argument('logs', nargs='*', help='ingest: answer log JSONL files (- for stdin, .gz allowed)')
+    parser.add_argument('--stats', type=Path, default=DEFAULT_STATS_PATH,
+                        help='Stats file (default: answer-stats.json)')
+    parser.add_argument('--limit', type=int, default=10, help='report: questions listed per table (default: 10)')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        with stage('load'):
+            stats = AnswerStats.load(args.stats)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    if args.command == 'report':
+        print_report(stats, args.limit)
+        print_profile(args)
+        return 0
+
+    if not args.logs:
+        print("❌ Error: no answer logs given")
+        return 1
+    if not args.store.exists():
+        print(f"❌ Error: questions.json not found at {args.store}")
+        return 1
+    known_ids = {question['id'] for _, question in load_bank_or_exit(args.store).iter_questions()}
+
+    totals = {'events': 0, 'added': 0, 'unknown': 0, 'malformed': 0}
+    start = time.perf_counter()
+    try:
+        with stage('ingest') as timing:
+            events = (event for log in args.logs for event in iter_events(log))
+            totals = stats.ingest(events, known_ids)
+            timing.rows = totals['events']
+    except AnswerLogError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    with stage('format') as timing:
+        content = stats.format()
+        timing.rows = len(stats.questions)
+    with stage('write'):
+        stats.save(args.stats, content)
+
+    print(f"{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Answer events: {totals['events']:,} ({totals['events'] / elapsed if elapsed else 0:,.0f}/s)")
+    print(f"  ✓ Added: {totals['added']:,} (batch {stats.batch})")
+    print(f"  ⚠️  Unknown question IDs: {totals['unknown']:,}")
+    print(f"  ⚠️  Latency not a number: {totals['malformed']:,}")
+    print(f"Questions with answers: {len(stats.questions)}")
+    print(f"Students: {len(stats.users)}")
+    print(f"✓ Written: {args.stats} ({len(content.encode('utf-8')) / 1024:,.0f} KB)")
+    print_profile(args, {**totals, 'batch': stats.batch, 'questions': len(stats.questions)})
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
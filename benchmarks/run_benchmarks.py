@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# Run with: python3 benchmarks/run_benchmarks.py [--sizes 1000,10000,100000]
+"""
+Benchmark the content pipeline on synthetic question banks.
+
+For each bank size a bank is generated with synthetic_bank.py in a temporary
+directory, and each stage is timed (best of --repeat runs) and then run once
+more under tracemalloc to record its peak memory:
+
+  load_vocabulary_questions  stream questions.json into the Korean -> ID map
+  load_question_bank         QuestionBank.load (JSON parse and indexes, no cache)
+  parse_markdown_table       parse every generated markdown file
+  format_markdown_table      format every parsed table
+  generate_vocab_id          allocate --ids new vocabulary IDs
+  validate_unique_ids        validate_unique_ids.py on questions.json
+
+Results are written as JSON. Pass an earlier results file with --compare to
+print the change per stage and exit with 1 if any stage got slower than
+--threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from add_question import generate_vocab_id  # noqa: E402
+from markdown_tables import format_markdown_table, parse_markdown_table  # noqa: E402
+from match_vocabulary import load_vocabulary_questions  # noqa: E402
+from question_bank import QuestionBank  # noqa: E402
+from validate_unique_ids import validate_unique_ids  # noqa: E402
+
+from synthetic_bank import (  # noqa: E402
+    BELT_RANKS,
+    VOCABULARY_CATEGORIES,
+    belt_rank_names,
+    category_names,
+    generate_bank,
+    write_bank,
+)
+
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARK_DIR / 'results'
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def measure(fn: Callable[[], int], repeat: int) -> Dict:
+    """
+    Time fn (best of `repeat` runs), then run it once under tracemalloc.
+    fn returns the number of rows it processed.
+    """
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': round(best, 6),
+        'rows': rows,
+        'rowsPerSecond': round(rows / best) if best else None,
+        'peakBytes': peak,
+    }
+
+
+def stages(bank_dir: Path, num_ids: int) -> List[Tuple[str, Callable[[], int]]]:
+    """(name, fn) for every benchmarked stage of a generated bank."""
+    json_path = bank_dir / 'questions.json'
+    md_files = sorted((bank_dir / 'roskilde-source').glob('*.md'))
+    contents = [path.read_text(encoding='utf-8') for path in md_files]
+    tables = [parse_markdown_table(content) for content in contents]
+    bank = QuestionBank.load(json_path, use_cache=False)
+    prefixes = sorted({(q['beltRank'], q['category']) for q in bank.data['vocabularyQuestions']})
+
+    def load_vocabulary():
+        return len(load_vocabulary_questions(json_path))
+
+    def load_bank():
+        loaded = QuestionBank.load(json_path, use_cache=False)
+        return sum(1 for _ in loaded.iter_questions())
+
+    def parse_tables():
+        return sum(len(parse_markdown_table(content)) for content in contents)
+
+    def format_tables():
+        for rows in tables:
+            format_markdown_table(rows)
+        return sum(len(rows) for rows in tables)
+
+    def allocate_ids():
+        for i in range(num_ids):
+            belt_rank, category = prefixes[i % len(prefixes)]
+            generate_vocab_id(bank, belt_rank, category)
+        return num_ids
+
+    def validate_ids():
+        with contextlib.redirect_stdout(io.StringIO()):
+            validate_unique_ids(str(json_path))
+        return sum(1 for _ in bank.iter_questions())
+
+    return [
+        ('load_vocabulary_questions', load_vocabulary),
+        ('load_question_bank', load_bank),
+        ('parse_markdown_table', parse_tables),
+        ('format_markdown_table', format_tables),
+        ('generate_vocab_id', allocate_ids),
+        ('validate_unique_ids', validate_ids),
+    ]
+
+
+def git_revision() -> str:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], repeat: int, num_ids: int, seed: int,
+        belts: int = len(BELT_RANKS), categories: int = len(VOCABULARY_CATEGORIES)) -> Dict:
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            bank_dir = Path(tmp)
+            write_bank(bank_dir, generate_bank(size, belt_rank_names(belts),
+                                               category_names(categories), seed=seed))
+            print(f"\n{size} questions:")
+            for name, fn in stages(bank_dir, num_ids):
+                result = {'size': size, 'stage': name, **measure(fn, repeat)}
+                results.append(result)
+                print(f"  {name:<26} {result['seconds'] * 1000:10.2f} ms "
+                      f"{result['rows']:>8} rows {result['peakBytes'] / 1e6:9.2f} MB peak")
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'belts': belts,
+        'categories': categories,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print time and memory ratios against a baseline. Returns the regressed stages."""
+    before = {(r['size'], r['stage']): r for r in baseline.get('results', [])}
+    regressions = []
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp')}):")
+    for result in report['results']:
+        old = before.get((result['size'], result['stage']))
+        if not old or not old['seconds']:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        memory = result['peakBytes'] / old['peakBytes'] if old['peakBytes'] else 1.0
+        flag = ''
+        if ratio > threshold:
+            flag = '  ❌ slower'
+            regressions.append(f"{result['stage']} @ {result['size']}")
+        print(f"  {result['size']:>7} {result['stage']:<26} time x{ratio:5.2f}  memory x{memory:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the content pipeline on synthetic banks')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated bank sizes (default: 1000,10000,100000)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per stage; the best is reported (default: 3)')
+    parser.add_argument('--ids', type=int, default=1000,
+                        help='IDs to allocate in the generate_vocab_id stage (default: 1000)')
+    parser.add_argument('--belts', type=int, default=len(BELT_RANKS),
+                        help=f'Belt ranks (and vocabulary markdown files) per bank (default: {len(BELT_RANKS)})')
+    parser.add_argument('--categories', type=int, default=len(VOCABULARY_CATEGORIES),
+                        help=f'Vocabulary categories per bank (default: {len(VOCABULARY_CATEGORIES)})')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the banks (default: 0)')
+    parser.add_argument('--out', type=Path,
+                        help='Results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', type=Path, metavar='RESULTS',
+                        help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio counted as a regression with --compare (default: 1.2)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    report = run(sizes, args.repeat, args.ids, args.seed, args.belts, args.categories)
+
+    out = args.out
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"\n✓ Results written to {out}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stages slower than x{args.threshold}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
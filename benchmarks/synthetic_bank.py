@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# Run with: python3 benchmarks/synthetic_bank.py 10000 /tmp/bank
+"""
+Generate a synthetic question bank for benchmarks and load tests.
+
+Writes questions.json and a roskilde-source-style directory of markdown
+files with the same layout as the real data, so every script can be run
+against it: one vocabulary table per belt rank (--belts sets the number of
+files) plus additional-questions.md for theory. Output is deterministic for
+a given seed.
+
+By default questions are spread over belt ranks and categories in the same
+proportions as src/data/questions.json (--like), theory questions get as
+many incorrect answers as the real ones do, and the markdown files contain
+the kinds of problems the content scripts have to handle:
+
+  --variants       rows whose Korean term is a romanization variant of the
+                   question's ('Momtong-makki', 'Eolgul jileugi', ...)
+  --duplicates     rows also listed in another belt's file
+  --misplaced      questions whose beltRank and ID differ from the file that
+                   lists them, for fix_belt_ranks.py to move
+  --duplicate-ids  questions reusing an earlier question's ID
+
+Every planted problem is listed in manifest.json next to questions.json.
+"""
+
+import argparse
+import json
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from markdown_tables import format_markdown_table  # noqa: E402
+from question_bank import DEFAULT_JSON_PATH  # noqa: E402
+
+
+# Belt ranks and categories of the real bank, in metadata order
+BELT_RANKS = [
+    '10_kup', '9_kup', '8_kup', '7_kup', '6_kup', '5_kup', '4_kup',
+    '3_kup', '2_kup', '1_kup', '1_dan', '2_dan', '3_dan',
+]
+VOCABULARY_CATEGORIES = ['stances', 'hand_techniques', 'leg_techniques', 'theory_terms']
+THEORY_CATEGORIES = ['technical_knowledge', 'symbolism_philosophy']
+
+# Labels used in the first column of vocabulary tables
+CATEGORY_LABELS = {
+    'stances': 'STAND',
+    'hand_techniques': 'HÅNDTEKNIK',
+    'leg_techniques': 'BENTEKNIK',
+    'theory_terms': 'TEORI',
+}
+
+# Share of questions that are theory questions when not taken from --like
+THEORY_SHARE = 1 / 6
+
+# Incorrect answers per theory question (count -> weight) when not taken from --like
+INCORRECT_ANSWER_WEIGHTS = {1: 1, 2: 2, 3: 2}
+
+SYLLABLES = [
+    'an', 'ap', 'ba', 'bak', 'cha', 'chi', 'dan', 'deul', 'do', 'dol', 'eol', 'gam',
+    'geu', 'gi', 'gul', 'gyeo', 'ha', 'han', 'jang', 'jeo', 'jin', 'ju', 'kal', 'keum',
+    'ki', 'kyo', 'mak', 'mok', 'mom', 'mu', 'na', 'nae', 'pal', 'pum', 'ri', 'sam',
+    'seo', 'son', 'tae', 'tong', 'ttui', 'ul', 'wen', 'ye', 'yeop', 'yuk',
+]
+SUFFIXES = {
+    'stances': 'seogi',
+    'hand_techniques': 'makki',
+    'leg_techniques': 'chagi',
+    'theory_terms': '',
+}
+DANISH_WORDS = [
+    'blokering', 'spark', 'slag', 'stand', 'høj', 'lav', 'midter', 'sektion', 'hånd',
+    'fod', 'knæ', 'albue', 'dobbelt', 'indadgående', 'udadgående', 'hop', 'drejende',
+]
+
+# Spellings that differ between romanization systems and sources
+ROMANIZATION_SWAPS = [('eo', 'o'), ('eu', 'u'), ('ch', 'j'), ('k', 'g'), ('p', 'b'), ('t', 'd'), ('r', 'l')]
+
+
+def belt_rank_names(count: int) -> List[str]:
+    """The first `count` real belt ranks, continued with higher dan grades."""
+    names = BELT_RANKS[:count]
+    dan = 4
+    while len(names) < count:
+        names.append(f"{dan}_dan")
+        dan += 1
+    return names
+
+
+def category_names(count: int) -> List[str]:
+    """The first `count` real vocabulary categories, continued with numbered ones."""
+    names = VOCABULARY_CATEGORIES[:count]
+    while len(names) < count:
+        names.append(f"category_{len(names) + 1}")
+    return names
+
+
+def build_metadata(belt_ranks: Sequence[str], categories: Sequence[str],
+                   like: Optional[Dict] = None) -> Dict:
+    """metadata for the generated bank, reusing the labels of `like` where it has them."""
+    like = like or {}
+
+    def label(name: str) -> Dict[str, str]:
+        number, kind = name.split('_')
+        return {'da': f"{number}. {kind}", 'en': f"{number} {kind}"}
+
+    def category_label(name: str) -> Dict[str, str]:
+        return {'da': name.replace('_', ' ').capitalize(), 'en': name.replace('_', ' ').title()}
+
+    return {
+        'beltRanks': {belt: like.get('beltRanks', {}).get(belt) or label(belt) for belt in belt_ranks},
+        'categories': {category: like.get('categories', {}).get(category) or category_label(category)
+                       for category in categories},
+    }
+
+
+def distribution_of(document: Dict) -> Dict:
+    """
+    Question counts of a questions.json document to generate a bank like it:
+    per (beltRank, category) for each section, and per number of incorrect
+    Danish answers for theory.
+    """
+    return {
+        'vocabulary': Counter((q.get('beltRank'), q.get('category'))
+                              for q in document.get('vocabularyQuestions', [])),
+        'theory': Counter((q.get('beltRank'), q.get('category'))
+                          for q in document.get('theoryQuestions', [])),
+        'incorrectAnswers': Counter(len((q.get('incorrectAnswers') or {}).get('da') or [])
+                                    for q in document.get('theoryQuestions', [])),
+    }
+
+
+def apportion(total: int, weights: Dict[Hashable, float]) -> List[Hashable]:
+    """
+    Split `total` items over the weighted keys (largest remainder method).
+    Returns the key of every item, grouped in key order.
+    """
+    weight_sum = sum(weights.values())
+    if total <= 0 or weight_sum <= 0:
+        return []
+    shares = {key: total * weight / weight_sum for key, weight in weights.items()}
+    counts = {key: int(share) for key, share in shares.items()}
+    remaining = total - sum(counts.values())
+    for key in sorted(shares, key=lambda k: counts[k] - shares[k])[:remaining]:
+        counts[key] += 1
+    return [key for key in weights for _ in range(counts[key])]
+
+
+def section_weights(keys: Sequence, observed: Optional[Counter]) -> Dict:
+    """Observed counts for the keys, or equal weights if none of them were observed."""
+    if observed:
+        weights = {key: observed.get(key, 0) for key in keys}
+        if any(weights.values()):
+            return weights
+    return {key: 1 for key in keys}
+
+
+def korean_term(index: int, category: str, rng: random.Random) -> str:
+    """A romanized term that is unique per index: the index spelled in syllables."""
+    syllables = []
+    n = index
+    while True:
+        n, digit = divmod(n, len(SYLLABLES))
+        syllables.append(SYLLABLES[digit])
+        if n == 0:
+            break
+        n -= 1
+    words = [''.join(syllables).capitalize()]
+    if rng.random() < 0.5:
+        words.append(rng.choice(SYLLABLES))
+    if SUFFIXES.get(category):
+        words.append(SUFFIXES[category])
+    return ' '.join(words)
+
+
+def romanization_variant(term: str, rng: random.Random) -> str:
+    """Another spelling of a term, as found in hand-written sources."""
+    swaps = [(old, new) for old, new in ROMANIZATION_SWAPS if old in term.lower()]
+    changes = ['lower', 'spaces']
+    if ' ' in term:
+        changes.append('hyphen')
+    if swaps:
+        changes += ['swap', 'swap']
+
+    change = rng.choice(changes)
+    if change == 'swap':
+        old, new = rng.choice(swaps)
+        lowered = term.lower()
+        start = lowered.index(old)
+        variant = lowered[:start] + new + lowered[start + len(old):]
+        return variant.capitalize()
+    if change == 'hyphen':
+        return term.replace(' ', '-', 1)
+    if change == 'spaces':
+        return term.replace(' ', '  ') if ' ' in term else f" {term} "
+    return term.lower()
+
+
+def danish_text(rng: random.Random, words: int = 3) -> str:
+    return ' '.join(rng.choice(DANISH_WORDS) for _ in range(words)).capitalize()
+
+
+def generate_bank(num_questions: int, belt_ranks: Optional[Sequence[str]] = None,
+                  categories: Sequence[str] = VOCABULARY_CATEGORIES,
+                  seed: int = 0, like: Optional[Dict] = None,
+                  variants: float = 0.0, duplicates: float = 0.0,
+                  misplaced: float = 0.0, duplicate_ids: float = 0.0) -> Dict:
+    """
+    Build a synthetic bank of num_questions questions.
+
+    Args:
+        belt_ranks: Belt ranks to use (default: the real ones)
+        categories: Vocabulary categories to use
+        seed: Random seed; the same arguments always give the same bank
+        like: A questions.json document whose proportions to copy (see
+              distribution_of); without it questions are spread evenly
+        variants, duplicates, misplaced, duplicate_ids: Share of vocabulary
+              questions with each kind of planted problem (see module docstring)
+
+    Returns:
+        {'document': questions.json, 'markdown': file name -> table rows,
+         'manifest': the planted problems}
+    """
+    rng = random.Random(seed)
+    belt_ranks = list(belt_ranks or BELT_RANKS)
+    distribution = distribution_of(like) if like else {}
+
+    theory_share = THEORY_SHARE
+    if like:
+        total = sum(distribution['vocabulary'].values()) + sum(distribution['theory'].values())
+        theory_share = sum(distribution['theory'].values()) / total if total else THEORY_SHARE
+    num_theory = int(num_questions * theory_share)
+
+    vocabulary_slots = apportion(num_questions - num_theory, section_weights(
+        [(belt, category) for belt in belt_ranks for category in categories],
+        distribution.get('vocabulary')))
+    theory_slots = apportion(num_theory, section_weights(
+        [(belt, category) for belt in belt_ranks for category in THEORY_CATEGORIES],
+        distribution.get('theory')))
+    incorrect_weights = {count: weight for count, weight in
+                         (distribution.get('incorrectAnswers') or INCORRECT_ANSWER_WEIGHTS).items()
+                         if count > 0} or INCORRECT_ANSWER_WEIGHTS
+    incorrect_counts, incorrect_count_weights = zip(*sorted(incorrect_weights.items()))
+
+    counters: Dict[str, int] = {}
+
+    def next_id(prefix: str) -> str:
+        counters[prefix] = counters.get(prefix, 0) + 1
+        return f"{prefix}{counters[prefix]:03d}"
+
+    def vocabulary_file(belt: str) -> str:
+        return f"{belt.replace('_', '-')}.md"
+
+    markdown: Dict[str, List[List[str]]] = {
+        vocabulary_file(belt): [[belt.replace('_', '-'), 'Koreansk', 'Dansk', 'ID']]
+        for belt in belt_ranks
+    }
+    manifest = {
+        'seed': seed,
+        'questions': {'vocabulary': len(vocabulary_slots), 'theory': len(theory_slots)},
+        'variants': [],
+        'duplicateRows': [],
+        'misplaced': [],
+        'duplicateIds': [],
+    }
+
+    # One planted problem at most per question, chosen from a single draw
+    thresholds = []
+    for kind, share in (('variant', variants), ('duplicate', duplicates),
+                        ('misplaced', misplaced), ('duplicate_id', duplicate_ids)):
+        thresholds.append((kind, (thresholds[-1][1] if thresholds else 0.0) + share))
+
+    def planted_problem() -> Optional[str]:
+        draw = rng.random()
+        for kind, limit in thresholds:
+            if draw < limit:
+                return kind
+        return None
+
+    vocabulary = []
+    for i, (belt, category) in enumerate(vocabulary_slots):
+        korean = korean_term(i, category, rng)
+        problem = planted_problem()
+        if problem in ('duplicate', 'misplaced') and len(belt_ranks) < 2:
+            problem = None
+        # A reused ID belongs to the same belt rank and category, like a copy-paste mistake
+        prefix = f"vocab-{belt}-{category}-"
+        if problem == 'duplicate_id' and prefix not in counters:
+            problem = None
+
+        question_belt = belt
+        if problem == 'misplaced':
+            question_belt = rng.choice([other for other in belt_ranks if other != belt])
+        if problem == 'duplicate_id':
+            question_id = f"{prefix}{rng.randint(1, counters[prefix]):03d}"
+            manifest['duplicateIds'].append(question_id)
+        else:
+            question_id = next_id(f"vocab-{question_belt}-{category}-")
+
+        question = {
+            'id': question_id,
+            'beltRank': question_belt,
+            'category': category,
+            'translations': {'ko': korean, 'da': danish_text(rng), 'en': ''},
+            'incorrectAnswers': {'da': [], 'ko': [], 'en': []},
+        }
+        vocabulary.append(question)
+
+        listed_korean = korean
+        if problem == 'variant':
+            listed_korean = romanization_variant(korean, rng)
+            manifest['variants'].append({'id': question_id, 'ko': korean, 'listed': listed_korean})
+        if problem == 'misplaced':
+            manifest['misplaced'].append({'id': question_id, 'beltRank': question_belt, 'listedIn': belt})
+
+        label = CATEGORY_LABELS.get(category, category.upper())
+        row = [label, listed_korean, question['translations']['da'], question_id]
+        markdown[vocabulary_file(belt)].append(row)
+        if problem == 'duplicate':
+            other = rng.choice([other for other in belt_ranks if other != belt])
+            markdown[vocabulary_file(other)].append(list(row))
+            manifest['duplicateRows'].append({'id': question_id, 'listedIn': [belt, other]})
+
+    theory = []
+    for belt, category in theory_slots:
+        question_id = next_id(f"theory-{belt}-")
+        incorrect_count = rng.choices(incorrect_counts, incorrect_count_weights)[0]
+        theory.append({
+            'id': question_id,
+            'beltRank': belt,
+            'question': {'da': f"Hvad betyder {korean_term(len(theory), 'theory_terms', rng)}?", 'en': None},
+            'correctAnswer': {'da': danish_text(rng, 2), 'en': None},
+            'incorrectAnswers': {'da': [danish_text(rng, 2) for _ in range(incorrect_count)], 'en': []},
+            'category': category,
+        })
+
+    if theory:
+        columns = max(3, max(incorrect_counts))
+        theory_rows = [['Belt Rank', 'Question', 'Correct Answer']
+                       + [f"Incorrect {n}" for n in range(1, columns + 1)] + ['ID']]
+        for question in theory:
+            incorrect = question['incorrectAnswers']['da']
+            theory_rows.append([question['beltRank'].replace('_', '-'), question['question']['da'],
+                                question['correctAnswer']['da']]
+                               + incorrect + [''] * (columns - len(incorrect)) + [question['id']])
+        markdown['additional-questions.md'] = theory_rows
+
+    document = {
+        'metadata': build_metadata(belt_ranks, list(categories) + THEORY_CATEGORIES,
+                                   (like or {}).get('metadata')),
+        'vocabularyQuestions': vocabulary,
+        'theoryQuestions': theory,
+    }
+    return {
+        'document': document,
+        'markdown': {name: rows for name, rows in markdown.items() if len(rows) > 1},
+        'manifest': manifest,
+    }
+
+
+def write_bank(out_dir: Path, bank: Dict) -> Path:
+    """
+    Write questions.json, roskilde-source/*.md and manifest.json under out_dir.
+    Returns the path of questions.json.
+    """
+    out_dir = Path(out_dir)
+    source_dir = out_dir / 'roskilde-source'
+    source_dir.mkdir(parents=True, exist_ok=True)
+
+    json_path = out_dir / 'questions.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(bank['document'], f, ensure_ascii=False, indent=2)
+
+    for name, rows in bank['markdown'].items():
+        (source_dir / name).write_text(format_markdown_table(rows), encoding='utf-8')
+
+    with open(out_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(bank['manifest'], f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    return json_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic question bank')
+    parser.add_argument('questions', type=int, help='Number of questions')
+    parser.add_argument('out_dir', type=Path,
+                        help='Directory for questions.json, roskilde-source/ and manifest.json')
+    parser.add_argument('--belts', type=int, default=len(BELT_RANKS),
+                        help=f'Number of belt ranks (default: {len(BELT_RANKS)})')
+    parser.add_argument('--categories', type=int, default=len(VOCABULARY_CATEGORIES),
+                        help=f'Number of vocabulary categories (default: {len(VOCABULARY_CATEGORIES)})')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--like', type=Path, default=DEFAULT_JSON_PATH,
+                        help='questions.json whose belt/category proportions to copy '
+                             '(default: src/data/questions.json)')
+    parser.add_argument('--uniform', action='store_true',
+                        help='Spread questions evenly instead of copying --like')
+    parser.add_argument('--variants', type=float, default=0.05,
+                        help='Share of rows listing a romanization variant (default: 0.05)')
+    parser.add_argument('--duplicates', type=float, default=0.01,
+                        help="Share of rows also listed in another belt's file (default: 0.01)")
+    parser.add_argument('--misplaced', type=float, default=0.01,
+                        help='Share of questions in the wrong belt rank (default: 0.01)')
+    parser.add_argument('--duplicate-ids', type=float, default=0.001,
+                        help="Share of questions reusing another question's ID (default: 0.001)")
+    args = parser.parse_args()
+
+    like = None
+    if not args.uniform and args.like.exists():
+        with open(args.like, 'r', encoding='utf-8') as f:
+            like = json.load(f)
+
+    bank = generate_bank(args.questions, belt_rank_names(args.belts), category_names(args.categories),
+                         seed=args.seed, like=like, variants=args.variants, duplicates=args.duplicates,
+                         misplaced=args.misplaced, duplicate_ids=args.duplicate_ids)
+    json_path = write_bank(args.out_dir, bank)
+
+    document = bank['document']
+    manifest = bank['manifest']
+    print(f"✓ Wrote {len(document['vocabularyQuestions'])} vocabulary and "
+          f"{len(document['theoryQuestions'])} theory questions to {json_path}")
+    print(f"✓ Wrote {len(bank['markdown'])} markdown files to {args.out_dir / 'roskilde-source'}")
+    print(f"\n{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Proportions: {'uniform' if like is None else args.like}")
+    print(f"Romanization variants: {len(manifest['variants'])}")
+    print(f"Duplicate rows: {len(manifest['duplicateRows'])}")
+    print(f"Misplaced questions: {len(manifest['misplaced'])}")
+    print(f"Duplicate IDs: {len(manifest['duplicateIds'])}")
+    print(f"Manifest: {args.out_dir / 'manifest.json'}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
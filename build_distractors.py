@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# Run with: python3 build_distractors.py
+"""
+Precompute ranked distractor candidates for vocabulary questions.
+
+For every vocabulary question and target language (da/ko/en) this applies the
+same fallback as generateVocabularyIncorrectAnswers in answerGenerator.js:
+  1. same category (any belt rank)
+  2. if fewer than 3, same belt rank
+  3. if still fewer than 3, the 4 lower (easier) belt ranks
+Within a tier, candidates from the question's own belt rank come first,
+then the nearest belt ranks. Answers equal to the correct answer or to an
+earlier candidate are skipped, and the nearest --limit candidates are kept,
+so every row is short and the table grows linearly with the bank. The app
+draws from those nearest candidates rather than the whole category.
+
+The table is written to src/data/distractors.json with candidates stored as
+indexes into its `ids` list:
+
+  {"source": "...", "ids": [...], "da": [[3, 17, ...], ...], "ko": [...], "en": [...]}
+
+answerGenerator.js looks up a question's row by ID and draws 3 random
+positions from it (constant time), and falls back to generating them if the
+row is too short or stale.
+`source` is a hash of the vocabulary the table was built from; --check
+exits with 1 if it no longer matches the bank, and the Python tools warn
+when they load a stale table.
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from markdown_tables import write_if_changed
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, QuestionBank, load_bank_or_exit
+
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_OUTPUT_PATH = SCRIPT_DIR / 'src' / 'data' / 'distractors.json'
+
+LANGUAGES = ['da', 'ko', 'en']
+
+# Candidates kept per question and language (answerGenerator.js draws 3)
+DEFAULT_LIMIT = 10
+
+# Number of lower belt ranks used as the last fallback (getLowerBeltRanks)
+LOWER_BELT_COUNT = 4
+
+MIN_DISTRACTORS = 3
+
+
+def nearest_first(belt_index: int, belt_count: int) -> Iterator[int]:
+    """Belt indexes ordered by distance from belt_index (own belt, then -1, +1, -2, ...)."""
+    yield belt_index
+    for distance in range(1, belt_count):
+        if belt_index - distance >= 0:
+            yield belt_index - distance
+        if belt_index + distance < belt_count:
+            yield belt_index + distance
+
+
+class DistractorBuilder:
+    """Buckets of vocabulary questions by belt rank and category for fast tier walks."""
+
+    def __init__(self, bank: QuestionBank):
+        self.belt_ranks = list(bank.data.get('metadata', {}).get('beltRanks', {}))
+        self.belt_index = {belt: i for i, belt in enumerate(self.belt_ranks)}
+        self.vocabulary = bank.vocabulary
+        self.by_belt_category: Dict = {}
+        self.by_belt: Dict[str, List[Dict]] = {}
+        for question in self.vocabulary:
+            key = (question.get('beltRank'), question.get('category'))
+            self.by_belt_category.setdefault(key, []).append(question)
+            self.by_belt.setdefault(question.get('beltRank'), []).append(question)
+
+    def tiers(self, question: Dict) -> Iterator[List[Dict]]:
+        belt = question.get('beltRank')
+        category = question.get('category')
+        index = self.belt_index.get(belt)
+
+        # 1. Same category, nearest belt ranks first
+        if index is None:
+            yield self.by_belt_category.get((belt, category), [])
+        else:
+            yield [
+                candidate
+                for i in nearest_first(index, len(self.belt_ranks))
+                for candidate in self.by_belt_category.get((self.belt_ranks[i], category), [])
+            ]
+
+        # 2. Same belt rank
+        yield self.by_belt.get(belt, [])
+
+        # 3. Lower belt ranks, nearest first
+        if index is not None:
+            yield [
+                candidate
+                for i in range(index - 1, max(0, index - LOWER_BELT_COUNT) - 1, -1)
+                for candidate in self.by_belt.get(self.belt_ranks[i], [])
+            ]
+
+    def candidates(self, question: Dict, language: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        correct = question.get('translations', {}).get(language)
+        seen = set()
+        selected = []
+
+        for tier in self.tiers(question):
+            for candidate in tier:
+                if len(selected) >= limit:
+                    break
+                answer = candidate.get('translations', {}).get(language)
+                if (candidate is question or not answer or answer == correct
+                        or answer in seen):
+                    continue
+                seen.add(answer)
+                selected.append(candidate)
+            # Like the JS fallback, only move to the next tier if this one was too small
+            if len(selected) >= MIN_DISTRACTORS:
+                break
+
+        return selected
+
+
+def build_table(bank: QuestionBank, limit: int = DEFAULT_LIMIT) -> Dict:
+    """Build the distractor table for all vocabulary questions."""
+    builder = DistractorBuilder(bank)
+    ids = [question['id'] for question in bank.vocabulary]
+    position = {id(question): i for i, question in enumerate(bank.vocabulary)}
+
+    table = {'ids': ids}
+    for language in LANGUAGES:
+        table[language] = [
+            [position[id(candidate)] for candidate in builder.candidates(question, language, limit)]
+            for question in bank.vocabulary
+        ]
+    return table
+
+
+def source_hash(bank: QuestionBank) -> str:
+    """Hash of the vocabulary fields the table depends on (same for JSON and SQLite stores)."""
+    fields = [[q.get('id'), q.get('beltRank'), q.get('category'), q.get('translations')]
+              for q in bank.vocabulary]
+    content = json.dumps([bank.data.get('metadata', {}).get('beltRanks'), fields],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def is_stale(table: Dict, bank: QuestionBank) -> bool:
+    """True if the table was built from other vocabulary than the bank's."""
+    return table.get('source') != source_hash(bank)
+
+
+def load_table(path: Path, bank: QuestionBank) -> Optional[Dict]:
+    """The distractor table at path (None if missing), with a warning if it is stale."""
+    if not path or not Path(path).exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if is_stale(table, bank):
+        print(f"⚠️  {Path(path).name} is out of date; run build_distractors.py")
+    return table
+
+
+def format_table(table: Dict, source: str) -> str:
+    """One row per line keeps the file compact but diffable."""
+    lines = ['{', f'  "source": "{source}",', '  "ids": [']
+    lines.append(',\n'.join(f'    {json.dumps(question_id)}' for question_id in table['ids']))
+    lines.append('  ],')
+    for n, language in enumerate(LANGUAGES):
+        lines.append(f'  "{language}": [')
+        lines.append(',\n'.join(
+            f"    {json.dumps(row, separators=(',', ':'))}" for row in table[language]
+        ))
+        lines.append('  ]' + (',' if n < len(LANGUAGES) - 1 else ''))
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Precompute distractor candidates for vocabulary questions'
+    )
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f'Nearest candidates kept per question and language (default: {DEFAULT_LIMIT})')
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUTPUT_PATH,
+                        help='Output file (default: src/data/distractors.json)')
+    parser.add_argument('--check', action='store_true',
+                        help='Only check that the output file matches the bank (exit 1 if stale)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    json_path = args.store
+    if not json_path.exists():
+        print(f"❌ Error: questions.json not found at {json_path}")
+        return 1
+
+    bank = load_bank_or_exit(json_path)
+    if args.check:
+        if not args.out.exists():
+            print(f"❌ {args.out.name} not found")
+            return 1
+        with open(args.out, 'r', encoding='utf-8') as f:
+            stale = is_stale(json.load(f), bank)
+        print(f"❌ {args.out.name} is out of date" if stale else f"✓ {args.out.name} is up to date")
+        print_profile(args, {'stale': stale})
+        return 1 if stale else 0
+
+    with stage('build') as timing:
+        table = build_table(bank, args.limit)
+        timing.rows = len(table['ids'])
+    with stage('format') as timing:
+        content = format_table(table, source_hash(bank))
+        timing.rows = len(table['ids'])
+    written = write_if_changed(args.out, content)
+
+    short = {
+        language: sum(1 for row in table[language] if len(row) < MIN_DISTRACTORS)
+        for language in LANGUAGES
+    }
+
+    print(f"{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Vocabulary questions: {len(table['ids'])}")
+    for language in LANGUAGES:
+        print(f"  {language}: {short[language]} with fewer than {MIN_DISTRACTORS} candidates")
+    print(f"{'✓ Written' if written else '✓ Unchanged'}: {args.out}")
+    print_profile(args, {'questions': len(table['ids']), 'short': short, 'written': written})
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
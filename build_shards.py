@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# Run with: python3 build_shards.py
+"""
+Build per-belt, per-category JSON shards of questions.json for lazy loading.
+
+Writes one compact JSON file per (belt rank, category) plus a manifest.json
+with the metadata and question counts, so the app can fetch only the shards
+for the belt ranks (and categories) a quiz needs instead of bundling the
+whole bank:
+
+  public/shards/manifest.json
+  public/shards/10_kup/stances.json
+  public/shards/10_kup/theory_terms.json
+  ...
+
+Each shard has the same shape as questions.json (vocabularyQuestions,
+theoryQuestions) restricted to one belt rank and category. Shards are only
+rewritten when their content changes, and shards no longer in the bank are
+removed.
+"""
+
+import argparse
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from markdown_tables import write_if_changed
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, QuestionBank, load_bank_or_exit
+
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_OUTPUT_DIR = SCRIPT_DIR / 'public' / 'shards'
+
+# Shard name for questions without a category
+UNCATEGORIZED = 'uncategorized'
+
+
+def to_json(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def group_questions(bank: QuestionBank) -> Dict[Tuple[str, str], Dict[str, List[Dict]]]:
+    """Group questions by (beltRank, category), keeping file order within each group."""
+    groups = defaultdict(lambda: {'vocabularyQuestions': [], 'theoryQuestions': []})
+    for section, question in bank.iter_questions():
+        key = (question.get('beltRank'), question.get('category') or UNCATEGORIZED)
+        groups[key][f"{section}Questions"].append(question)
+    return groups
+
+
+def build_shards(bank: QuestionBank, output_dir: Path) -> Dict:
+    """
+    Write shards and manifest to output_dir.
+
+    Returns:
+        Stats dict with 'shards', 'written' and 'removed' counts
+    """
+    with stage('build') as timing:
+        groups = group_questions(bank)
+        timing.rows = len(bank.vocabulary) + len(bank.theory)
+    belt_order = list(bank.data.get('metadata', {}).get('beltRanks', {}))
+    known_belts = set(belt_order)
+    belt_order += sorted({belt for belt, _ in groups if belt not in known_belts})
+
+    stats = {'shards': 0, 'written': 0, 'removed': 0}
+    belts = {}
+    expected = {output_dir / 'manifest.json'}
+
+    for belt_rank in belt_order:
+        shards = {}
+        for (belt, category), questions in sorted(groups.items()):
+            if belt != belt_rank:
+                continue
+            relative = f"{belt_rank}/{category}.json"
+            path = output_dir / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with stage('format') as timing:
+                content = to_json(questions)
+                timing.rows = len(questions['vocabularyQuestions']) + len(questions['theoryQuestions'])
+            if write_if_changed(path, content):
+                stats['written'] += 1
+            stats['shards'] += 1
+            expected.add(path)
+            shards[category] = {
+                'file': relative,
+                'vocabulary': len(questions['vocabularyQuestions']),
+                'theory': len(questions['theoryQuestions']),
+                'sha256': hashlib.sha256(content.encode('utf-8')).hexdigest()[:16],
+            }
+
+        if shards:
+            belts[belt_rank] = {
+                'vocabulary': sum(shard['vocabulary'] for shard in shards.values()),
+                'theory': sum(shard['theory'] for shard in shards.values()),
+                'shards': shards,
+            }
+
+    manifest = {
+        'metadata': bank.data.get('metadata', {}),
+        'totals': {
+            'vocabulary': len(bank.vocabulary),
+            'theory': len(bank.theory),
+        },
+        'beltRanks': belts,
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if write_if_changed(output_dir / 'manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2) + '\n'):
+        stats['written'] += 1
+
+    # Remove shards for belt/category combinations that no longer exist
+    for path in output_dir.glob('*/*.json'):
+        if path not in expected:
+            path.unlink()
+            stats['removed'] += 1
+    for directory in output_dir.iterdir():
+        if directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build per-belt, per-category question shards and a manifest'
+    )
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help=f'Output directory (default: {DEFAULT_OUTPUT_DIR.relative_to(SCRIPT_DIR)})')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    json_path = args.store
+    if not json_path.exists():
+        print(f"❌ Error: questions.json not found at {json_path}")
+        return 1
+
+    bank = load_bank_or_exit(json_path)
+    stats = build_shards(bank, args.out)
+
+    print(f"{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Shards: {stats['shards']} in {args.out}")
+    print(f"  ✓ Written: {stats['written']} (including manifest)")
+    print(f"  ✗ Removed: {stats['removed']}")
+    print_profile(args, stats)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# Run with: python3 changeset.py show|apply changes.json
+"""
+Change sets for the scripts that modify files.
+
+match_vocabulary.py, match_theory.py and fix_belt_ranks.py record their
+writes in a ChangeSet instead of writing directly. A change set can be
+printed as a unified diff (--dry-run), saved as JSON (--save-changes FILE)
+for review, and applied later in a single write without recomputing it:
+
+  python3 match_vocabulary.py --save-changes changes.json
+  python3 changeset.py show changes.json
+  python3 changeset.py apply changes.json
+
+File changes store the new content; question bank changes store the
+QuestionBank edit operations, so they are applied through the bank (journal
+or SQLite store included). Applying refuses to run if any file changed
+since the change set was made.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from markdown_tables import write_if_changed
+from profiling import add_profile_arguments, print_profile, start_profiling
+from question_bank import JournalError, QuestionBank, is_sqlite_path, journal_path_for
+
+
+SCRIPT_DIR = Path(__file__).parent
+
+FORMAT_VERSION = 1
+
+
+class StaleChangeSetError(Exception):
+    """A file changed after the change set was made."""
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    """SHA-256 of a file, or None if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def bank_fingerprint(path: Path) -> Optional[str]:
+    """SHA-256 over a question store and its change journal."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.sha256(path.read_bytes())
+    journal_path = journal_path_for(path)
+    if not is_sqlite_path(path) and journal_path.exists():
+        digest.update(journal_path.read_bytes())
+    return digest.hexdigest()
+
+
+def render_bank(data: Dict) -> str:
+    """questions.json as the bank saves it."""
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def _label(path: Path) -> str:
+    try:
+        return str(Path(path).resolve().relative_to(SCRIPT_DIR.resolve()))
+    except ValueError:
+        return str(path)
+
+
+class ChangeSet:
+    """File writes and question bank edits collected in memory."""
+
+    def __init__(self):
+        # path -> {'sha256': hash of the file when first recorded, 'content': new text}
+        self.files: Dict[str, Dict] = {}
+        # path -> {'fingerprint': store fingerprint, 'ops': QuestionBank operations}
+        self.banks: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.files) + len(self.banks)
+
+    def write(self, path: Path, content: str) -> bool:
+        """Record new content for a file. Returns True if it differs from the file on disk."""
+        key = str(Path(path).resolve())
+        entry = self.files.get(key)
+        if entry is None:
+            entry = {'sha256': file_sha256(path), 'content': content}
+        else:
+            entry['content'] = content
+
+        path = Path(path)
+        unchanged = path.exists() and path.read_bytes() == content.encode('utf-8')
+        if unchanged:
+            self.files.pop(key, None)
+        else:
+            self.files[key] = entry
+        return not unchanged
+
+    def save_bank(self, bank: QuestionBank, fingerprint: Optional[str] = None) -> bool:
+        """
+        Record a bank's pending edits instead of saving them. Pass the store's
+        fingerprint from when the bank was loaded to also catch changes made
+        since then (default: the store as it is now). Returns True if there
+        were any edits.
+        """
+        if not bank.pending:
+            return False
+        key = str(Path(bank.path).resolve())
+        if fingerprint is None:
+            fingerprint = bank_fingerprint(bank.path)
+        entry = self.banks.setdefault(key, {'fingerprint': fingerprint, 'ops': []})
+        entry['ops'].extend(json.loads(json.dumps(bank.pending)))
+        bank.pending = []
+        return True
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def diff(self) -> str:
+        """Unified diff of every recorded change."""
+        chunks = []
+        for path, entry in self.files.items():
+            before = Path(path).read_text(encoding='utf-8') if Path(path).exists() else ''
+            chunks.append(self._unified(path, before, entry['content']))
+
+        for path, entry in self.banks.items():
+            bank = QuestionBank.load(Path(path))
+            before = render_bank(bank.data)
+            bank.replay(entry['ops'])
+            chunks.append(self._unified(path, before, render_bank(bank.data)))
+
+        return ''.join(chunks)
+
+    @staticmethod
+    def _unified(path: str, before: str, after: str) -> str:
+        label = _label(Path(path))
+        lines = difflib.unified_diff(
+            before.splitlines(keepends=True), after.splitlines(keepends=True),
+            fromfile=f"a/{label}", tofile=f"b/{label}",
+        )
+        return ''.join(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n'
+                       for line in lines)
+
+    def to_json(self) -> Dict:
+        return {
+            'version': FORMAT_VERSION,
+            'files': [{'path': path, **entry} for path, entry in self.files.items()],
+            'banks': [{'path': path, **entry} for path, entry in self.banks.items()],
+        }
+
+    def save(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    @classmethod
+    def load(cls, path: Path) -> 'ChangeSet':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported change set version: {data.get('version')}")
+        changes = cls()
+        for entry in data.get('files', []):
+            changes.files[entry['path']] = {'sha256': entry['sha256'], 'content': entry['content']}
+        for entry in data.get('banks', []):
+            changes.banks[entry['path']] = {'fingerprint': entry['fingerprint'], 'ops': entry['ops']}
+        return changes
+
+    # ------------------------------------------------------------------
+    # Apply
+    # ------------------------------------------------------------------
+
+    def check(self) -> List[str]:
+        """Paths that changed since the change set was made."""
+        stale = [path for path, entry in self.files.items() if file_sha256(path) != entry['sha256']]
+        stale += [path for path, entry in self.banks.items()
+                  if bank_fingerprint(path) != entry['fingerprint']]
+        return stale
+
+    def apply(self) -> int:
+        """
+        Write every change. Raises StaleChangeSetError, without writing
+        anything, if a file changed since the change set was made.
+        Returns the number of files and banks written.
+        """
+        stale = self.check()
+        if stale:
+            raise StaleChangeSetError(
+                'Changed since the change set was made: ' + ', '.join(_label(Path(p)) for p in stale)
+            )
+
+        written = 0
+        for path, entry in self.banks.items():
+            bank = QuestionBank.load(Path(path))
+            bank.replay(entry['ops'])
+            bank.save()
+            written += 1
+        for path, entry in self.files.items():
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            if write_if_changed(Path(path), entry['content']):
+                written += 1
+        return written
+
+
+def write_file(path: Path, content: str, changes: Optional[ChangeSet] = None) -> bool:
+    """Write a file only if its content changes (creating its directory), or record it in a change set."""
+    if changes is not None:
+        return changes.write(path, content)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return write_if_changed(path, content)
+
+
+def add_changeset_arguments(parser: argparse.ArgumentParser) -> None:
+    """--dry-run and --save-changes for scripts that write files."""
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the changes as a unified diff without writing')
+    parser.add_argument('--save-changes', type=Path, metavar='FILE',
+                        help='Save the changes as a JSON change set (see changeset.py) without writing')
+
+
+def is_preview(args: argparse.Namespace) -> bool:
+    """True if --dry-run or --save-changes was given, so nothing is written."""
+    return bool(args.dry_run or args.save_changes)
+
+
+def summary_title(args: argparse.Namespace) -> str:
+    """SUMMARY heading, marked as a dry run when nothing is written."""
+    return f"SUMMARY{' (DRY RUN)' if is_preview(args) else ''}"
+
+
+def finish(changes: ChangeSet, args: argparse.Namespace) -> int:
+    """Print, save or apply a script's change set according to its arguments. Returns files written."""
+    if args.dry_run:
+        print(f"\n{changes.diff()}", end='')
+    if args.save_changes:
+        changes.save(args.save_changes)
+        print(f"\n✓ Change set with {len(changes)} changed files saved to {args.save_changes}")
+    if is_preview(args):
+        return 0
+    return changes.apply()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or apply a saved change set')
+    parser.add_argument('command', choices=['show', 'apply'],
+                        help='show: print as a unified diff; apply: write the changes')
+    parser.add_argument('changeset', type=Path, help='Change set JSON file')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if not args.changeset.exists():
+        print(f"❌ Error: change set not found at {args.changeset}")
+        return 1
+
+    changes = ChangeSet.load(args.changeset)
+
+    if args.command == 'show':
+        try:
+            print(changes.diff(), end='')
+        except JournalError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        stale = changes.check()
+        for path in stale:
+            print(f"⚠️  {_label(Path(path))} changed since the change set was made")
+        print_profile(args, {'changes': len(changes), 'stale': len(stale)})
+        return 0
+
+    try:
+        written = changes.apply()
+    except (StaleChangeSetError, JournalError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    print(f"✓ Applied change set: {written} files written")
+    print_profile(args, {'changes': len(changes), 'written': written})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# Run with: python3 coverage_report.py [--lengths 10,25,50,100] [--json report.json]
+"""
+Report whether the question bank can fill every quiz the app offers.
+
+Reads the bank once (streamed, so very large banks are fine) and builds:
+
+  - a belt rank x category matrix of the questions selectQuestions can use
+    (theory questions without incorrect answers are left out, as in
+    filterQuestionsByBeltRanks)
+  - for every belt rank and quiz length, the shortfall of each level against
+    the targetCounts of getDistribution, and the questions the top-up cannot
+    fill at all (the level shortfalls are what the top-up silently takes
+    from other belt ranks)
+  - the categories with fewer than 3 distinct same-category answers per
+    question, where generateVocabularyIncorrectAnswers falls back to the
+    same belt rank and lower belt ranks for distractors
+
+The matrix is aggregated with NumPy if it is installed and with plain arrays
+otherwise; the results are the same. Per category only the first 4 distinct
+answers of each language are kept, which is enough to decide the distractor
+check, so memory does not grow with the bank.
+"""
+
+import argparse
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH
+from question_stream import iter_questions
+from quiz_engine import BELT_RANKS, QUESTION_COUNTS, target_counts
+
+try:
+    import numpy as np
+except ImportError:  # plain arrays
+    np = None
+
+
+# Target languages of vocabulary questions (ko_to_da asks for da, da_to_ko for ko)
+DISTRACTOR_LANGUAGES = ('da', 'ko')
+
+# A question needs 3 same-category answers other than its own
+MIN_DISTINCT_ANSWERS = 4
+
+
+class BankCounts:
+    """Everything the report needs from one pass over the bank."""
+
+    def __init__(self):
+        self.categories: List[str] = []
+        self.category_index: Dict[str, int] = {}
+        # belt index * MAX_CATEGORIES + category index of every usable question
+        self.codes = array('l')
+        self.skipped_belts: Dict[str, int] = {}
+        self.unusable_theory = 0
+        # (category, language) -> up to MIN_DISTINCT_ANSWERS distinct answers
+        self.answers: Dict[Tuple[str, str], set] = {}
+        # (category, language) -> vocabulary questions without their own incorrect answers
+        self.generated: Dict[Tuple[str, str], int] = {}
+        self.vocabulary = 0
+
+    def category(self, name: str) -> int:
+        index = self.category_index.get(name)
+        if index is None:
+            index = self.category_index[name] = len(self.categories)
+            self.categories.append(name)
+        return index
+
+
+# Codes are belt * MAX_CATEGORIES + category, so categories can be added mid-pass
+MAX_CATEGORIES = 1 << 16
+
+_BELT_INDEX = {belt: i for i, belt in enumerate(BELT_RANKS)}
+
+
+def count_questions(questions: Iterable[Tuple[str, Dict]]) -> BankCounts:
+    """One pass over (section, question) pairs."""
+    counts = BankCounts()
+    for section, question in questions:
+        category = question.get('category') or 'uncategorized'
+        incorrect = question.get('incorrectAnswers') or {}
+
+        if section == 'vocabulary':
+            counts.vocabulary += 1
+            translations = question.get('translations') or {}
+            for language in DISTRACTOR_LANGUAGES:
+                key = (category, language)
+                answer = translations.get(language)
+                seen = counts.answers.setdefault(key, set())
+                if answer and len(seen) < MIN_DISTINCT_ANSWERS:
+                    seen.add(answer)
+                if not incorrect.get(language):
+                    counts.generated[key] = counts.generated.get(key, 0) + 1
+        elif not incorrect.get('da'):
+            counts.unusable_theory += 1
+            continue
+
+        belt = question.get('beltRank')
+        belt_index = _BELT_INDEX.get(belt)
+        if belt_index is None:
+            counts.skipped_belts[belt] = counts.skipped_belts.get(belt, 0) + 1
+            continue
+        counts.codes.append(belt_index * MAX_CATEGORIES + counts.category(category))
+    return counts
+
+
+def count_matrix(counts: BankCounts) -> List[List[int]]:
+    """Belt rank x category question counts (rows in BELT_RANKS order)."""
+    width = len(counts.categories)
+    if np is not None:
+        codes = np.asarray(counts.codes)
+        flat = np.bincount((codes // MAX_CATEGORIES) * width + codes % MAX_CATEGORIES,
+                           minlength=len(BELT_RANKS) * width)
+        return flat.reshape(len(BELT_RANKS), width).tolist()
+
+    flat = array('l', [0]) * (len(BELT_RANKS) * width)
+    for code in counts.codes:
+        flat[(code // MAX_CATEGORIES) * width + code % MAX_CATEGORIES] += 1
+    return [flat[row * width:(row + 1) * width].tolist() for row in range(len(BELT_RANKS))]
+
+
+def shortfalls(available: Sequence[int], lengths: Sequence[int]) -> List[Dict]:
+    """
+    Shortfall per level for every belt rank and quiz length.
+
+    Args:
+        available: Usable questions per belt rank, in BELT_RANKS order
+    """
+    results = []
+    for belt_index, belt in enumerate(BELT_RANKS):
+        # The top-up can use every included belt rank (this one and all earlier)
+        capacity = sum(available[:belt_index + 1])
+        for length in lengths:
+            targets = target_counts(belt, length)
+            missing = [max(0, target - available[belt_index - level])
+                       for level, target in enumerate(targets)]
+            results.append({
+                'beltRank': belt,
+                'questions': length,
+                'targets': targets,
+                'shortfall': missing,
+                'unfilled': max(0, length - capacity),
+            })
+    return results
+
+
+def distractor_shortages(counts: BankCounts) -> List[Dict]:
+    """Categories where generated questions get fewer than 3 same-category distractors."""
+    shortages = []
+    for (category, language), answers in sorted(counts.answers.items()):
+        if len(answers) < MIN_DISTINCT_ANSWERS and counts.generated.get((category, language)):
+            shortages.append({
+                'category': category,
+                'language': language,
+                'distinctAnswers': len(answers),
+                'questions': counts.generated[(category, language)],
+            })
+    return shortages
+
+
+def build_report(questions: Iterable[Tuple[str, Dict]], lengths: Sequence[int],
+                 categories: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Count the bank and compute the report.
+
+    Args:
+        categories: Only count these categories toward the shortfall (the
+            quiz category filter); the matrix always has all of them
+    """
+    with stage('count') as timing:
+        counts = count_questions(questions)
+        timing.rows = len(counts.codes)
+
+    with stage('report'):
+        matrix = count_matrix(counts)
+        columns = [i for i, name in enumerate(counts.categories)
+                   if categories is None or name in categories]
+        if np is not None:
+            available = np.asarray(matrix).reshape(len(BELT_RANKS), -1)[:, columns].sum(axis=1).tolist()
+        else:
+            available = [sum(row[i] for i in columns) for row in matrix]
+
+        return {
+            'categories': counts.categories,
+            'beltRanks': BELT_RANKS,
+            'matrix': matrix,
+            'available': available,
+            'shortfalls': shortfalls(available, lengths),
+            'distractorShortages': distractor_shortages(counts),
+            'unknownBeltRanks': counts.skipped_belts,
+            'theoryWithoutIncorrectAnswers': counts.unusable_theory,
+            'vocabularyQuestions': counts.vocabulary,
+        }
+
+
+def print_report(report: Dict) -> None:
+    categories = report['categories']
+    widths = [max(len(name), 5) for name in categories]
+
+    print("Usable questions per belt rank and category:\n")
+    print(f"{'':<7} " + ' '.join(f"{name:>{w}}" for name, w in zip(categories, widths)) + f" {'total':>6}")
+    for belt, row, total in zip(report['beltRanks'], report['matrix'], report['available']):
+        print(f"{belt:<7} " + ' '.join(f"{n:>{w}}" for n, w in zip(row, widths)) + f" {total:>6}")
+
+    short = [r for r in report['shortfalls'] if any(r['shortfall']) or r['unfilled']]
+    if short:
+        print(f"\n⚠️  Quizzes below the distribution (missing per level, current first):")
+        for result in short:
+            missing = ' '.join(f"{n}/{t}" for n, t in zip(result['shortfall'], result['targets']))
+            unfilled = f"  ❌ {result['unfilled']} unfilled" if result['unfilled'] else ''
+            print(f"  {result['beltRank']:<7} {result['questions']:>4} questions: {missing}{unfilled}")
+
+    if report['distractorShortages']:
+        print(f"\n⚠️  Categories with too few same-category distractors:")
+        for shortage in report['distractorShortages']:
+            print(f"  {shortage['category']} ({shortage['language']}): {shortage['distinctAnswers']} distinct "
+                  f"answers, {shortage['questions']} questions fall back to other categories")
+
+    for belt, count in report['unknownBeltRanks'].items():
+        print(f"\n⚠️  {count} questions with belt rank '{belt}' are never selected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report belt rank and category coverage of the question bank')
+    parser.add_argument('--lengths', default=','.join(map(str, QUESTION_COUNTS)),
+                        help='Comma-separated quiz lengths (default: 10,25,50,100)')
+    parser.add_argument('--categories', help='Comma-separated categories selected in the quiz (default: all)')
+    parser.add_argument('--json', type=Path, metavar='FILE', help='Also write the report as JSON')
+    parser.add_argument('--strict', action='store_true',
+                        help='Exit with 1 if any quiz cannot be filled')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if not args.store.exists():
+        print(f"❌ Error: questions.json not found at {args.store}")
+        return 1
+
+    lengths = [int(n) for n in args.lengths.split(',') if n.strip()]
+    categories = args.categories.split(',') if args.categories else None
+    report = build_report(iter_questions(args.store), lengths, categories)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    below = sum(1 for r in report['shortfalls'] if any(r['shortfall']))
+    unfilled = sum(1 for r in report['shortfalls'] if r['unfilled'])
+    print(f"\n{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Usable questions: {sum(report['available'])} ({'NumPy' if np is not None else 'plain arrays'})")
+    print(f"  ⚠️  Belt/length pairs below the distribution: {below} of {len(report['shortfalls'])}")
+    print(f"  ✗ Belt/length pairs that cannot be filled: {unfilled}")
+    print(f"  ⚠️  Category/language pairs short of distractors: {len(report['distractorShortages'])}")
+    if args.json:
+        print(f"✓ Report written to {args.json}")
+    print_profile(args, {'below': below, 'unfilled': unfilled,
+                         'distractorShortages': len(report['distractorShortages'])})
+    return 1 if args.strict and unfilled else 0
+
+
+if __name__ == '__main__':
+    exit(main())
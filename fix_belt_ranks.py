@@ -2,32 +2,30 @@
 # Run with: python3 fix_belt_ranks.py
 """
 Fix belt ranks in questions.json based on markdown files (which are the master source).
+
+A moved question keeps its ID number if that ID is free in the new belt rank,
+otherwise it gets the next free number. Old -> new IDs are recorded in
+src/data/id-remap.json (chained across runs, so retired IDs are never reused),
+and the remap is applied to the markdown ID columns and to any progress files
+given with --progress.
 """
 
+import argparse
 import json
-import re
 from pathlib import Path
-from typing import Dict, List, Tuple
-
+from typing import Dict, List, Optional, Set, Tuple
 
-def parse_markdown_table(content: str) -> List[List[str]]:
-    """Parse markdown table and return rows."""
-    lines = content.strip().split('\n')
-    rows = []
-
-    for line in lines:
-        # Skip separator lines
-        if re.match(r'^\s*\|[\s\-|]+\|\s*$', line):
-            continue
+from changeset import ChangeSet, add_changeset_arguments, finish, is_preview, summary_title, write_file
+from markdown_tables import (
+    belt_rank_from_filename,
+    format_markdown_table,
+    parse_markdown_table,
+)
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, QuestionBank, load_bank_or_exit, vocab_prefix
 
-        # Parse table row
-        if '|' in line:
-            cells = [cell.strip() for cell in line.split('|')]
-            cells = [cell for cell in cells if cell]
-            if cells:
-                rows.append(cells)
 
-    return rows
+DEFAULT_REMAP_PATH = Path(__file__).parent / 'src' / 'data' / 'id-remap.json'
 
 
 def extract_belt_rank_from_filename(filename: str) -> str:
@@ -35,10 +33,7 @@ def extract_belt_rank_from_filename(filename: str) -> str:
     Extract belt rank from filename.
     E.g., '10-kup.md' -> '10_kup', '1-dan.md' -> '1_dan'
     """
-    # Remove .md extension
-    name = filename.replace('.md', '')
-    # Replace hyphen with underscore
-    return name.replace('-', '_')
+    return belt_rank_from_filename(filename)
 
 
 def normalize_belt_rank(belt_str: str) -> str:
@@ -87,83 +82,223 @@ def collect_corrections(source_dir: Path) -> Dict[str, str]:
         if not rows:
             continue
 
-        # Skip header row, process data rows
-        for row in rows[1:]:
-            if len(row) < 4:
-                continue
+        with stage('match') as timing:
+            # Skip header row, process data rows
+            for row in rows[1:]:
+                if len(row) < 4:
+                    continue
 
-            question_id = row[3].strip()
+                question_id = row[3].strip()
 
-            # Skip if not a valid ID
-            if question_id == 'Not found' or not question_id.startswith('vocab-'):
-                continue
+                # Skip if not a valid ID
+                if question_id == 'Not found' or not question_id.startswith('vocab-'):
+                    continue
 
-            # Extract belt rank from ID
-            id_belt_rank, id_category, id_number = extract_id_info(question_id)
+                # Extract belt rank from ID
+                id_belt_rank, id_category, id_number = extract_id_info(question_id)
 
-            if not id_belt_rank:
-                continue
+                if not id_belt_rank:
+                    continue
 
-            # Check if belt rank needs correction
-            if id_belt_rank != correct_belt_rank:
-                corrections[question_id] = correct_belt_rank
+                # Check if belt rank needs correction
+                if id_belt_rank != correct_belt_rank:
+                    corrections[question_id] = correct_belt_rank
+            timing.rows = len(rows) - 1
 
     return corrections
 
 
-def apply_corrections(json_path: Path, corrections: Dict[str, str]) -> int:
+def corrected_id(bank: QuestionBank, question_id: str, new_belt: str,
+                 retired: Set[str] = frozenset()) -> str:
     """
-    Apply belt rank corrections to questions.json.
-    Returns number of corrections made.
+    New ID for a vocabulary question moved to another belt rank.
+
+    Keeps the number if that ID is neither in use nor retired (an old ID in
+    the remap history), otherwise allocates the next free number for the
+    belt rank and category.
+    """
+    _, id_category, id_number = extract_id_info(question_id)
+    new_id = f"vocab-{new_belt}-{id_category}-{id_number}"
+    prefix = vocab_prefix(new_belt, id_category)
+    while bank.get(new_id) is not None or new_id in retired:
+        new_id = bank.allocate_id(prefix)
+    return new_id
+
+
+def load_remap(remap_path: Path) -> Dict[str, str]:
+    """Old -> new IDs recorded by earlier corrections."""
+    if not remap_path.exists():
+        return {}
+    with open(remap_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_remap(remap_path: Path, history: Dict[str, str], remap: Dict[str, str],
+               changes: Optional[ChangeSet] = None) -> Dict[str, str]:
+    """
+    Add a run's remap to the history and write it.
+
+    Earlier entries pointing at an ID renamed in this run are redirected to
+    its new ID, so every old ID maps straight to the current one.
+    """
+    merged = {old: remap.get(new, new) for old, new in history.items()}
+    merged.update(remap)
+    merged = {old: new for old, new in merged.items() if old != new}
+    write_file(remap_path, json.dumps(merged, ensure_ascii=False, indent=2) + '\n', changes)
+    return merged
+
+
+def apply_remap_to_markdown(source_dir: Path, remap: Dict[str, str],
+                            changes: Optional[ChangeSet] = None) -> List[Path]:
+    """Replace old IDs in the ID column of every markdown table. Returns the files changed."""
+    changed = []
+    for md_file in sorted(source_dir.glob('*.md')):
+        with open(md_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        rows = parse_markdown_table(content)
+        if not rows or 'ID' not in rows[0]:
+            continue
+
+        id_column = rows[0].index('ID')
+        replaced = 0
+        for row in rows[1:]:
+            if id_column < len(row) and row[id_column] in remap:
+                row[id_column] = remap[row[id_column]]
+                replaced += 1
+
+        if replaced and write_file(md_file, format_markdown_table(rows), changes):
+            changed.append(md_file)
+    return changed
+
+
+def _remap_value(value, remap: Dict[str, str]) -> Tuple[object, int]:
+    """Replace old IDs in JSON strings and object keys. Returns (value, replacements)."""
+    if isinstance(value, str):
+        return (remap[value], 1) if value in remap else (value, 0)
+    if isinstance(value, list):
+        total = 0
+        items = []
+        for item in value:
+            item, count = _remap_value(item, remap)
+            items.append(item)
+            total += count
+        return items, total
+    if isinstance(value, dict):
+        total = 0
+        result = {}
+        for key, item in value.items():
+            if key in remap:
+                key = remap[key]
+                total += 1
+            result[key], count = _remap_value(item, remap)
+            total += count
+        return result, total
+    return value, 0
+
+
+def apply_remap_to_progress(progress_path: Path, remap: Dict[str, str],
+                            changes: Optional[ChangeSet] = None) -> int:
+    """
+    Replace old question IDs in a stored progress file (.json, or .jsonl with
+    one record per line), as keys or values. Returns the number of replacements.
+    """
+    with open(progress_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if progress_path.suffix == '.jsonl':
+        lines = []
+        total = 0
+        for line in content.splitlines():
+            if line.strip():
+                record, count = _remap_value(json.loads(line), remap)
+                line = json.dumps(record, ensure_ascii=False)
+                total += count
+            lines.append(line)
+        updated = '\n'.join(lines) + ('\n' if content.endswith('\n') else '')
+    else:
+        data, total = _remap_value(json.loads(content), remap)
+        updated = json.dumps(data, ensure_ascii=False, indent=2)
+
+    if total:
+        write_file(progress_path, updated, changes)
+    return total
+
+
+def apply_corrections(json_path: Path, corrections: Dict[str, str],
+                      retired: Set[str] = frozenset(),
+                      changes: Optional[ChangeSet] = None) -> Dict[str, str]:
+    """
+    Apply belt rank corrections to questions.json (or record them in `changes`).
+    Returns the old -> new ID remap of the corrections made.
     """
     # Load questions.json
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    bank = load_bank_or_exit(json_path)
 
-    corrections_made = 0
+    remap = {}
+    # IDs renamed in this run are retired too, so a swap cannot reuse them
+    retired = set(retired)
 
-    # Update vocabulary questions
-    for question in data['vocabularyQuestions']:
-        question_id = question.get('id', '')
+    with stage('correct') as timing:
+        # Update vocabulary questions
+        for question in bank.vocabulary:
+            question_id = question.get('id', '')
+
+            if question_id not in corrections:
+                continue
 
-        if question_id in corrections:
             old_belt = question['beltRank']
             new_belt = corrections[question_id]
 
-            question['beltRank'] = new_belt
-            corrections_made += 1
-
             # Also update the ID to reflect new belt rank
-            id_belt_rank, id_category, id_number = extract_id_info(question_id)
-            new_id = f"vocab-{new_belt}-{id_category}-{id_number}"
-            question['id'] = new_id
+            new_id = corrected_id(bank, question_id, new_belt, retired)
+            bank.rename(question, new_id, belt_rank=new_belt)
+            retired.add(question_id)
+            # With duplicate IDs the first question's new ID is the one recorded
+            remap.setdefault(question_id, new_id)
 
             korean = question.get('translations', {}).get('ko', '')
             print(f"  ✓ {korean}: {old_belt} → {new_belt}")
             print(f"    Old ID: {question_id}")
             print(f"    New ID: {new_id}")
+        timing.rows = len(remap)
 
     # Save updated questions.json
-    if corrections_made > 0:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    if remap and changes is not None:
+        changes.save_bank(bank)
+    elif remap:
+        bank.save(json_path)
 
-    return corrections_made
+    return remap
 
 
 def main():
-    script_dir = Path(__file__).parent
-    json_path = script_dir / 'src' / 'data' / 'questions.json'
-    source_dir = script_dir / 'roskilde-source'
+    parser = argparse.ArgumentParser(
+        description='Fix belt ranks in questions.json based on the roskilde-source markdown files'
+    )
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    parser.add_argument('--source-dir', type=Path, default=Path(__file__).parent / 'roskilde-source',
+                        help='Directory of markdown files (default: roskilde-source)')
+    parser.add_argument('--remap-file', type=Path, default=DEFAULT_REMAP_PATH,
+                        help='Old -> new ID history (default: src/data/id-remap.json)')
+    parser.add_argument('--progress', type=Path, action='append', default=[],
+                        help='Stored progress file (.json or .jsonl) to update with new IDs; can be repeated')
+    add_changeset_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    json_path = args.store
+    source_dir = args.source_dir
 
     # Validate paths
     if not json_path.exists():
         print(f"❌ Error: questions.json not found at {json_path}")
-        return
+        return 1
 
     if not source_dir.exists():
         print(f"❌ Error: roskilde-source directory not found at {source_dir}")
-        return
+        return 1
 
     print("Scanning markdown files for misplaced questions...\n")
 
@@ -172,19 +307,49 @@ def main():
 
     if not corrections:
         print("✅ No misplaced questions found. All belt ranks are correct!")
-        return
+        print_profile(args, {'corrected': 0})
+        return 0
 
     print(f"Found {len(corrections)} misplaced questions:\n")
 
     # Apply corrections
-    corrections_made = apply_corrections(json_path, corrections)
+    changes = ChangeSet()
+    history = load_remap(args.remap_file)
+    remap = apply_corrections(json_path, corrections, retired=set(history), changes=changes)
+    save_remap(args.remap_file, history, remap, changes)
+
+    # Update references to the old IDs in one pass each
+    changed_files = apply_remap_to_markdown(source_dir, remap, changes)
+    progress_updates = {}
+    for progress_path in args.progress:
+        if progress_path.exists():
+            progress_updates[progress_path] = apply_remap_to_progress(progress_path, remap, changes)
+        else:
+            print(f"  ⚠️  Progress file not found: {progress_path}")
+
+    written = finish(changes, args)
 
     print(f"\n{'='*60}")
-    print(f"SUMMARY")
+    print(summary_title(args))
     print(f"{'='*60}")
-    print(f"Corrected {corrections_made} questions in questions.json")
-    print(f"\n⚠️  Remember to run match_korean_ids.py to update markdown files!")
+    preview = is_preview(args)
+    print(f"{'Questions to correct' if preview else 'Corrected questions'} in questions.json: {len(remap)}")
+    print(f"ID remap: {args.remap_file}")
+    print(f"Files written: {written} of {len(changes)} changed")
+    print(f"Markdown files {'to update' if preview else 'updated'}: {len(changed_files)}")
+    for md_file in changed_files:
+        print(f"  ✓ {md_file.name}")
+    for progress_path, count in progress_updates.items():
+        print(f"Progress {progress_path.name}: {count} IDs {'to update' if preview else 'updated'}")
+    print_profile(args, {
+        'corrected': len(remap),
+        'changed': len(changes),
+        'written': written,
+        'markdown_updated': [md_file.name for md_file in changed_files],
+        'progress_updated': {path.name: count for path, count in progress_updates.items()},
+    })
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    exit(main())
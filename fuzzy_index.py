@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Fuzzy lookup of romanized Korean terms and Danish theory questions.
+
+FuzzyIndex is used by match_vocabulary.py to suggest the closest known term
+for rows that have no exact match ("Jireugi" vs "Chireugi", curly vs straight
+quotes, doubled spaces). Terms are indexed by character trigrams once; a query
+only scores the terms that share trigrams with it and re-ranks the best of
+those by edit distance, instead of comparing every row against every term.
+
+TokenIndex is used by match_theory.py: questions are canonicalized
+(question_bank.canonicalize_text) and indexed by word; a query is ranked
+against the questions sharing words with it by IDF-weighted cosine similarity.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from question_bank import canonicalize_text
+
+
+# Quote and dash variants folded away before matching
+_FOLD = str.maketrans({
+    '‘': None, '’': None, '‚': None, '‛': None,
+    '“': None, '”': None, '„': None, '‟': None,
+    '´': None, '`': None, "'": None, '"': None,
+    '‐': ' ', '‑': ' ', '‒': ' ', '–': ' ', '—': ' ', '-': ' ',
+})
+
+
+def normalize_term(text: str) -> str:
+    """NFKC, lowercase, drop quotes, treat hyphens as spaces and collapse whitespace."""
+    text = unicodedata.normalize('NFKC', text or '').lower().translate(_FOLD)
+    return ' '.join(text.split())
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of a normalized term, padded so short terms still have some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _pattern_masks(pattern: str) -> Dict[str, int]:
+    """Bit mask of the positions of each character in the pattern."""
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def levenshtein(pattern: str, text: str, masks: Optional[Dict[str, int]] = None) -> int:
+    """
+    Levenshtein distance using Myers' bit-parallel algorithm.
+
+    Processes one character of `text` per step with integer bit operations
+    instead of filling a full DP table. `masks` can be precomputed with
+    _pattern_masks(pattern) when the same pattern is compared many times.
+    """
+    length = len(pattern)
+    if not length:
+        return len(text)
+    if masks is None:
+        masks = _pattern_masks(pattern)
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    pv, mv, score = full, 0, length
+
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+
+    return score
+
+
+def similarity(a: str, b: str, masks: Optional[Dict[str, int]] = None) -> float:
+    """1 - Levenshtein distance / length of the longer string."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return 1.0 - levenshtein(a, b, masks) / max(len(a), len(b))
+
+
+class FuzzyIndex:
+    """
+    Trigram index over terms, each mapped to a value (e.g. a question ID).
+    """
+
+    def __init__(self, terms: Dict[str, str]):
+        self.terms: List[Tuple[str, str, str]] = []   # (normalized, original, value)
+        self.exact: Dict[str, int] = {}
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.gram_counts: List[int] = []
+
+        for term, value in terms.items():
+            normalized = normalize_term(term)
+            if not normalized:
+                continue
+            index = len(self.terms)
+            self.terms.append((normalized, term, value))
+            self.exact[normalized] = index
+            grams = trigrams(normalized)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(index)
+
+    def lookup(self, query: str, threshold: float = 0.7,
+               candidates: int = 10) -> Optional[Tuple[str, str, float]]:
+        """
+        Best match for a query as (term, value, score), or None below threshold.
+
+        Candidates are the terms with the highest trigram Dice coefficient;
+        the top `candidates` of those are re-ranked by edit-distance similarity.
+        """
+        normalized = normalize_term(query)
+        if not normalized:
+            return None
+
+        if normalized in self.exact:
+            _, term, value = self.terms[self.exact[normalized]]
+            return term, value, 1.0
+
+        query_grams = trigrams(normalized)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for index in self.postings.get(gram, ()):
+                shared[index] += 1
+
+        if not shared:
+            return None
+
+        dice = heapq.nlargest(candidates, (
+            (2 * count / (len(query_grams) + self.gram_counts[index]), index)
+            for index, count in shared.items()
+        ))
+
+        masks = _pattern_masks(normalized)
+        best = None
+        for _, index in dice:
+            normalized_term, term, value = self.terms[index]
+            score = similarity(normalized, normalized_term, masks)
+            if best is None or score > best[2]:
+                best = (term, value, score)
+
+        if best and best[2] >= threshold:
+            return best
+        return None
+
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Words of a canonicalized question."""
+    return _WORD.findall(canonicalize_text(text))
+
+
+class TokenIndex:
+    """
+    Inverted word index over texts, each mapped to a value (e.g. a question ID).
+    """
+
+    def __init__(self, texts: Dict[str, str]):
+        self.texts: List[Tuple[str, str]] = []   # (original, value)
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.tokens: List[set] = []
+
+        for text, value in texts.items():
+            tokens = set(tokenize(text))
+            if not tokens:
+                continue
+            index = len(self.texts)
+            self.texts.append((text, value))
+            self.tokens.append(tokens)
+            for token in tokens:
+                self.postings[token].append(index)
+
+        total = max(len(self.texts), 1)
+        self.idf = {
+            token: math.log(1 + total / len(indexes))
+            for token, indexes in self.postings.items()
+        }
+        self.norms = [
+            math.sqrt(sum(self.idf[token] ** 2 for token in tokens))
+            for tokens in self.tokens
+        ]
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[str, str, float]]:
+        """Best matches for a query as (text, value, score) with score in [0, 1], best first."""
+        query_tokens = set(tokenize(query))
+        # Words never seen in the index still count towards the query's norm
+        unseen_idf = math.log(1 + max(len(self.texts), 1))
+        query_norm = math.sqrt(sum(self.idf.get(token, unseen_idf) ** 2 for token in query_tokens))
+        if not query_norm:
+            return []
+
+        dot: Dict[int, float] = defaultdict(float)
+        for token in query_tokens:
+            weight = self.idf.get(token)
+            if weight is None:
+                continue
+            for index in self.postings[token]:
+                dot[index] += weight * weight
+
+        best = heapq.nlargest(limit, (
+            (score / (query_norm * self.norms[index]), index)
+            for index, score in dot.items()
+        ))
+        return [(self.texts[index][0], self.texts[index][1], score) for score, index in best]
+
+    def lookup(self, query: str, threshold: float = 0.5) -> Optional[Tuple[str, str, float]]:
+        """Best match as (text, value, score), or None below threshold."""
+        matches = self.search(query, limit=1)
+        if matches and matches[0][2] >= threshold:
+            return matches[0]
+        return None
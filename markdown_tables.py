@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Shared markdown table helpers for the roskilde-source files.
+
+Used by match_vocabulary.py, match_theory.py, fix_belt_ranks.py and
+sync_sources.py so every script parses and formats tables the same way.
+
+ParseCache keeps parsed rows in .cache/markdown-parse-cache.json, keyed by
+path, mtime and SHA-256, so unchanged files are not parsed again, and
+write_if_changed() only touches a file when its bytes actually change.
+
+map_files() runs a per-file function serially or in a process pool
+(--jobs N), returning results and captured output in input order. Either
+way cached files are handled in this process and only the others are
+parsed (by the workers, whose parsed rows are added to the cache). Parsing,
+formatting and writing are timed as the 'parse', 'format' and 'write'
+stages for --profile (see profiling.py).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import profiling
+from profiling import stage
+
+
+PARSE_CACHE_PATH = Path(__file__).parent / '.cache' / 'markdown-parse-cache.json'
+
+
+def is_separator_line(line: str) -> bool:
+    """True for table separator lines (only |, - and spaces), e.g. '| --- | --- |'."""
+    stripped = line.strip()
+    return (
+        len(stripped) > 2
+        and stripped[0] == '|'
+        and stripped[-1] == '|'
+        and not stripped.strip('|- \t')
+    )
+
+
+def parse_markdown_table(content: str) -> List[List[str]]:
+    """
+    Parse markdown table and return rows.
+
+    Returns:
+        List of rows, where each row is a list of cell contents
+    """
+    rows = []
+
+    with stage('parse') as timing:
+        for line in content.strip().split('\n'):
+            # Skip non-table lines and separator lines
+            if '|' not in line or is_separator_line(line):
+                continue
+
+            # Split by | and strip whitespace, dropping empty cells from leading/trailing |
+            cells = [cell for cell in (cell.strip() for cell in line.split('|')) if cell]
+            if cells:
+                rows.append(cells)
+        timing.rows = len(rows)
+
+    return rows
+
+
+def format_markdown_table(rows: List[List[str]]) -> str:
+    """
+    Format rows back into a markdown table with proper alignment.
+    """
+    if not rows:
+        return ""
+
+    with stage('format') as timing:
+        # Calculate column widths
+        num_cols = max(len(row) for row in rows)
+        col_widths = [0] * num_cols
+
+        for row in rows:
+            for i, cell in enumerate(row):
+                col_widths[i] = max(col_widths[i], len(cell))
+
+        # Build table
+        lines = []
+
+        # Header row
+        header = rows[0]
+        header_line = "| " + " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(header)) + " |"
+        lines.append(header_line)
+
+        # Separator row
+        separator = "| " + " | ".join("-" * col_widths[i] for i in range(len(header))) + " |"
+        lines.append(separator)
+
+        # Data rows
+        for row in rows[1:]:
+            # Ensure row has same number of columns as header
+            while len(row) < len(header):
+                row.append("")
+
+            row_line = "| " + " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(row)) + " |"
+            lines.append(row_line)
+        timing.rows = len(rows)
+
+    return "\n".join(lines) + "\n"
+
+
+def belt_rank_from_filename(filename: str) -> str:
+    """
+    Extract belt rank from filename.
+    E.g., '10-kup.md' -> '10_kup', '1-dan.md' -> '1_dan'
+    """
+    return filename.replace('.md', '').replace('-', '_')
+
+
+def is_theory_table(rows: List[List[str]]) -> bool:
+    """Theory tables start with a 'Belt Rank' column; vocabulary tables with the belt (e.g. '10-kup')."""
+    return bool(rows) and rows[0][0].strip().lower() == 'belt rank'
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path only if it differs from what is on disk. Returns True if written."""
+    with stage('write') as timing:
+        data = content.encode('utf-8')
+        if path.exists() and path.read_bytes() == data:
+            return False
+        path.write_bytes(data)
+        timing.rows = 1
+    return True
+
+
+class ParseCache:
+    """
+    Persistent cache of parsed markdown tables.
+
+    An entry is reused when the file's mtime and size are unchanged, or when
+    its SHA-256 still matches (e.g. after a touch or a checkout).
+    """
+
+    def __init__(self, cache_path: Optional[Path] = PARSE_CACHE_PATH):
+        """cache_path=None keeps the cache in memory only (map_files workers)."""
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if cache_path is not None and cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def is_cached(self, path: Path) -> bool:
+        """True if read_table would not have to parse the file."""
+        entry = self.entries.get(str(Path(path).resolve()))
+        if not entry:
+            return False
+        stat = path.stat()
+        if entry['mtimeNs'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return True
+        return entry['sha256'] == hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def merge(self, other: 'ParseCache') -> None:
+        """Add the entries and counts of another cache (e.g. a worker's)."""
+        self.entries.update(other.entries)
+        self.hits += other.hits
+        self.misses += other.misses
+        self._dirty = self._dirty or other._dirty
+
+    def read_table(self, path: Path) -> Tuple[str, List[List[str]]]:
+        """Return (content, rows) for a markdown file, parsing only on a cache miss."""
+        key = str(Path(path).resolve())
+        stat = path.stat()
+        data = path.read_bytes()
+        content = data.decode('utf-8')
+        entry = self.entries.get(key)
+
+        if entry and entry['mtimeNs'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            return content, [list(row) for row in entry['rows']]
+
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry['sha256'] == digest:
+            self.hits += 1
+            rows = entry['rows']
+        else:
+            self.misses += 1
+            rows = parse_markdown_table(content)
+
+        self.entries[key] = {
+            'mtimeNs': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'rows': rows,
+        }
+        self._dirty = True
+        return content, [list(row) for row in rows]
+
+    def save(self) -> None:
+        """Persist the cache if anything changed."""
+        if not self._dirty or self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Temporary file and os.replace, so an interrupted save never leaves a truncated cache
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_path.parent, prefix='.markdown-parse-cache-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
+
+
+# Per-process state for map_files() workers, set once by the pool initializer
+_worker_state: Dict = {}
+
+
+def _init_worker(func: Callable, shared, profile: bool = False) -> None:
+    _worker_state['func'] = func
+    _worker_state['shared'] = shared
+    if profile:
+        profiling.enable()
+        # Forked workers inherit the parent's stages; report only their own
+        profiling.take_stages()
+
+
+def _run_captured(func: Callable, path: Path, shared, **kwargs) -> Tuple[object, str]:
+    """Call func(path, shared) and return (result, everything it printed)."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        result = func(path, shared, **kwargs)
+    return result, output.getvalue()
+
+
+def _run_in_worker(path: Path) -> Tuple[object, str, List[Dict], ParseCache]:
+    # An in-memory cache records the parsed rows for the parent's cache
+    cache = ParseCache(None)
+    result, output = _run_captured(_worker_state['func'], path, _worker_state['shared'], cache=cache)
+    return result, output, profiling.take_stages(), cache
+
+
+def map_files(func: Callable, files: Sequence[Path], shared, jobs: int = 1,
+              cache: Optional[ParseCache] = None) -> List[Tuple[object, str]]:
+    """
+    Apply func(path, shared) to every file and return (result, output) pairs in file order.
+
+    With jobs > 1 the files the parse cache does not have are processed in a
+    process pool; `shared` (e.g. the Korean term -> ID map) is sent to each
+    worker once instead of per file, and the rows the workers parse are
+    added to the cache. Cached files are processed in this process. Stages
+    the workers time for --profile are merged into this process.
+    """
+    pending = files if cache is None else [path for path in files if not cache.is_cached(path)]
+    if jobs <= 1 or len(pending) <= 1:
+        return [_run_captured(func, path, shared, cache=cache) for path in files]
+
+    chunksize = max(1, len(pending) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(func, shared, profiling.is_enabled())) as pool:
+        parsed = dict(zip(pending, pool.map(_run_in_worker, pending, chunksize=chunksize)))
+
+    results = []
+    for path in files:
+        if path not in parsed:
+            results.append(_run_captured(func, path, shared, cache=cache))
+            continue
+        result, output, stages, worker_cache = parsed[path]
+        profiling.merge_stages(stages)
+        if cache is not None:
+            cache.merge(worker_cache)
+        results.append((result, output))
+    return results
@@ -5,76 +5,68 @@ Match theory questions in markdown files with questions.json and add IDs to ID c
 Works only with theory files (question-based, not vocabulary).
 """
 
-import json
-import re
+import argparse
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from changeset import ChangeSet, add_changeset_arguments, finish, summary_title
+from fuzzy_index import TokenIndex
+from markdown_tables import (
+    ParseCache,
+    format_markdown_table,
+    map_files,
+    parse_markdown_table,
+)
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, canonicalize_text
+from question_stream import iter_questions
 
 
 def load_theory_questions(json_path: Path) -> Dict[str, str]:
     """
     Load theory questions from questions.json.
 
-    Returns:
-        Dictionary mapping normalized Danish question text to question IDs
-    """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    question_to_id = {}
-
-    for question in data.get('theoryQuestions', []):
-        question_text = question.get('question', {}).get('da', '')
-        question_id = question.get('id', '')
-        if question_text and question_id:
-            # Normalize: strip whitespace and convert to lowercase for matching
-            normalized = question_text.strip().lower()
-            question_to_id[normalized] = question_id
-
-    return question_to_id
-
-
-def parse_markdown_table(content: str) -> List[List[str]]:
-    """
-    Parse markdown table and return rows.
+    Questions are streamed from the file rather than loaded all at once.
 
     Returns:
-        List of rows, where each row is a list of cell contents
+        Dictionary mapping canonical Danish question text to question IDs
+        (the last question with a text wins, as in QuestionBank.question_to_id)
     """
-    lines = content.strip().split('\n')
-    rows = []
-
-    for line in lines:
-        # Skip separator lines (lines with only |, -, and spaces)
-        if re.match(r'^\s*\|[\s\-|]+\|\s*$', line):
-            continue
-
-        # Parse table row
-        if '|' in line:
-            # Split by | and strip whitespace from each cell
-            cells = [cell.strip() for cell in line.split('|')]
-            # Remove empty cells at start/end (from leading/trailing |)
-            cells = [cell for cell in cells if cell]
-            if cells:
-                rows.append(cells)
-
-    return rows
+    with stage('load') as timing:
+        question_to_id = {}
+        for _, question in iter_questions(json_path, section='theory'):
+            question_text = (question.get('question') or {}).get('da', '')
+            if not question_text:
+                continue
+            text = canonicalize_text(question_text)
+            if question.get('id'):
+                question_to_id[text] = question['id']
+            else:
+                question_to_id.pop(text, None)
+        timing.rows = len(question_to_id)
+    return question_to_id
 
 
-def process_theory_file(file_path: Path, question_to_id: Dict[str, str]) -> str:
+def process_theory_file(file_path: Path, question_to_id: Dict[str, str],
+                        cache: Optional[ParseCache] = None,
+                        missing: Optional[List[str]] = None) -> str:
     """
     Process a theory markdown file, adding ID column with matched question IDs.
     ONLY updates the ID column (last column), leaves all other columns untouched.
+    Questions are compared in canonical form (quotes, whitespace, case);
+    questions without a match are appended to `missing` if given.
 
     Expected columns: Belt Rank | Question | Correct Answer | Incorrect 1 | Incorrect 2 | Incorrect 3 | ID
 
     Returns:
         Updated markdown content with ID column
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    rows = parse_markdown_table(content)
+    if cache is not None:
+        content, rows = cache.read_table(file_path)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        rows = parse_markdown_table(content)
 
     if not rows:
         print(f"  ⚠️  No table found in {file_path.name}")
@@ -92,71 +84,80 @@ def process_theory_file(file_path: Path, question_to_id: Dict[str, str]) -> str:
     if len(header) < 7:
         print(f"  ⚠️  Warning: Expected 7 columns (Belt Rank, Question, Correct Answer, Incorrect 1-3, ID), found {len(header)}")
 
-    # Process data rows (skip header at index 0)
-    for i in range(1, len(rows)):
-        row = rows[i]
+    with stage('match') as timing:
+        # Process data rows (skip header at index 0)
+        for i in range(1, len(rows)):
+            row = rows[i]
 
-        if len(row) < 2:
-            continue
+            if len(row) < 2:
+                continue
 
-        # Pad row to have enough columns
-        while len(row) <= id_column_index:
-            row.append('')
+            # Pad row to have enough columns
+            while len(row) <= id_column_index:
+                row.append('')
 
-        # Match by question text in column 1 (index 1, column 0 is belt rank)
-        question_text = row[1].strip()
-        normalized_question = question_text.lower()
-        question_id = question_to_id.get(normalized_question, 'Not found')
+            # Match by question text in column 1 (index 1, column 0 is belt rank)
+            question_text = row[1].strip()
+            normalized_question = canonicalize_text(question_text)
+            question_id = question_to_id.get(normalized_question, 'Not found')
+            if question_id == 'Not found' and missing is not None:
+                missing.append(question_text)
 
-        # ONLY update the ID column (last column, index 6)
-        row[id_column_index] = question_id
+            # ONLY update the ID column (last column, index 6)
+            row[id_column_index] = question_id
+        timing.rows = len(rows) - 1
 
     # Reconstruct markdown table
     return format_markdown_table(rows)
 
 
-def format_markdown_table(rows: List[List[str]]) -> str:
-    """
-    Format rows back into a markdown table with proper alignment.
+def match_theory_file(file_path: Path, question_to_id: Dict[str, str],
+                      cache: Optional[ParseCache] = None) -> Tuple[str, List[str]]:
     """
-    if not rows:
-        return ""
-
-    # Calculate column widths
-    num_cols = max(len(row) for row in rows)
-    col_widths = [0] * num_cols
-
-    for row in rows:
-        for i, cell in enumerate(row):
-            col_widths[i] = max(col_widths[i], len(cell))
-
-    # Build table
-    lines = []
-
-    # Header row
-    header = rows[0]
-    header_line = "| " + " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(header)) + " |"
-    lines.append(header_line)
-
-    # Separator row
-    separator = "| " + " | ".join("-" * col_widths[i] for i in range(len(header))) + " |"
-    lines.append(separator)
-
-    # Data rows
-    for row in rows[1:]:
-        # Ensure row has same number of columns as header
-        while len(row) < len(header):
-            row.append("")
+    Process a theory markdown file.
 
-        row_line = "| " + " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(row)) + " |"
-        lines.append(row_line)
-
-    return "\n".join(lines) + "\n"
+    Returns:
+        (updated markdown content, questions that could not be matched)
+    """
+    missing = []
+    updated_content = process_theory_file(file_path, question_to_id, cache, missing)
+    return updated_content, missing
+
+
+def print_candidates(missing: List[Tuple[str, str]], question_to_id: Dict[str, str],
+                     threshold: float) -> None:
+    """Print the best-ranked known question for each unmatched (file, question)."""
+    index = TokenIndex(question_to_id)
+    print(f"\nBest candidates (score >= {threshold:.2f}):")
+    for file_name, question in missing:
+        match = index.lookup(question, threshold=threshold)
+        print(f"  {file_name}: {question}")
+        if match:
+            candidate, question_id, score = match
+            print(f"    → {candidate} ({question_id}, {score:.2f})")
+        else:
+            print(f"    → no candidate")
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Match theory questions in roskilde-source markdown files with questions.json'
+    )
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes for parsing and formatting files (default: 1)')
+    parser.add_argument('--candidate-threshold', type=float, default=0.5,
+                        help='Minimum score (0-1) for reporting a candidate for unmatched questions (default: 0.5)')
+    parser.add_argument('--no-suggest', action='store_true',
+                        help='Do not report candidates for unmatched questions')
+    add_changeset_arguments(parser)
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
     script_dir = Path(__file__).parent
-    json_path = script_dir / 'src' / 'data' / 'questions.json'
+    json_path = args.store
     source_dir = script_dir / 'roskilde-source'
 
     # Validate paths
@@ -183,13 +184,17 @@ def main():
 
     print(f"Processing {len(md_files)} theory markdown file(s):\n")
 
-    stats = {'found': 0, 'not_found': 0, 'total': 0}
+    stats = {'found': 0, 'not_found': 0, 'total': 0, 'changed': 0}
+    cache = ParseCache()
+    changes = ChangeSet()
 
-    for md_file in md_files:
-        print(f"Processing {md_file.name}...")
+    results = map_files(match_theory_file, md_files, question_to_id, jobs=args.jobs, cache=cache)
+    missing = []
 
-        # Process file
-        updated_content = process_theory_file(md_file, question_to_id)
+    for md_file, ((updated_content, file_missing), output) in zip(md_files, results):
+        print(f"Processing {md_file.name}...")
+        print(output, end='')
+        missing.extend((md_file.name, question) for question in file_missing)
 
         # Count matches for this file (only count in ID column)
         file_found = updated_content.count('theory-')
@@ -200,19 +205,25 @@ def main():
         stats['not_found'] += file_not_found
         stats['total'] += file_total
 
-        print(f"  ✓ {file_found} matched, {file_not_found} not found")
+        # Record the new content (only if the table actually changed)
+        if changes.write(md_file, updated_content):
+            stats['changed'] += 1
+            print(f"  ✓ {file_found} matched, {file_not_found} not found (updated)")
+        else:
+            print(f"  ✓ {file_found} matched, {file_not_found} not found (unchanged)")
 
-        # Write back to file
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+    cache.save()
+    stats['written'] = finish(changes, args)
 
     # Summary
     print(f"\n{'='*50}")
-    print(f"SUMMARY")
+    print(summary_title(args))
     print(f"{'='*50}")
     print(f"Total theory questions processed: {stats['total']}")
     print(f"  ✓ Matched: {stats['found']}")
     print(f"  ✗ Not found: {stats['not_found']}")
+    print(f"Files written: {stats['written']} of {stats['changed']} changed (parse cache: {cache.hits} hits, {cache.misses} misses)")
+    print_profile(args, {**stats, 'cache_hits': cache.hits, 'cache_misses': cache.misses})
 
     if stats['not_found'] > 0:
         print(f"\n⚠️  {stats['not_found']} questions could not be matched.")
@@ -221,6 +232,9 @@ def main():
         print("  - Quote character differences")
         print("  - Questions not yet in questions.json")
 
+        if not args.no_suggest:
+            print_candidates(missing, question_to_id, args.candidate_threshold)
+
 
 if __name__ == '__main__':
     main()
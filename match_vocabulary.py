@@ -5,74 +5,65 @@ Match Korean vocabulary terms in markdown files with questions.json and add IDs
 Works only with vocabulary files (Korean terms).
 """
 
-import json
-import re
+import argparse
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from changeset import ChangeSet, add_changeset_arguments, finish, summary_title
+from fuzzy_index import FuzzyIndex
+from markdown_tables import (
+    ParseCache,
+    format_markdown_table,
+    map_files,
+    parse_markdown_table,
+)
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, normalize_text
+from question_stream import iter_questions
 
 
 def load_vocabulary_questions(json_path: Path) -> Dict[str, str]:
     """
     Load vocabulary questions from questions.json.
 
+    Questions are streamed from the file rather than loaded all at once.
+
     Returns:
         Dictionary mapping normalized Korean terms to question IDs
+        (the last question with a term wins, as in QuestionBank.korean_to_id)
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    korean_to_id = {}
-
-    for question in data.get('vocabularyQuestions', []):
-        korean_term = question.get('translations', {}).get('ko', '')
-        question_id = question.get('id', '')
-        if korean_term and question_id:
-            # Normalize: strip whitespace and convert to lowercase for matching
-            normalized = korean_term.strip().lower()
-            korean_to_id[normalized] = question_id
-
+    with stage('load') as timing:
+        korean_to_id = {}
+        for _, question in iter_questions(json_path, section='vocabulary'):
+            korean = question.get('translations', {}).get('ko', '')
+            if not korean:
+                continue
+            term = normalize_text(korean)
+            if question.get('id'):
+                korean_to_id[term] = question['id']
+            else:
+                korean_to_id.pop(term, None)
+        timing.rows = len(korean_to_id)
     return korean_to_id
 
 
-def parse_markdown_table(content: str) -> List[List[str]]:
-    """
-    Parse markdown table and return rows.
-
-    Returns:
-        List of rows, where each row is a list of cell contents
-    """
-    lines = content.strip().split('\n')
-    rows = []
-
-    for line in lines:
-        # Skip separator lines (lines with only |, -, and spaces)
-        if re.match(r'^\s*\|[\s\-|]+\|\s*$', line):
-            continue
-
-        # Parse table row
-        if '|' in line:
-            # Split by | and strip whitespace from each cell
-            cells = [cell.strip() for cell in line.split('|')]
-            # Remove empty cells at start/end (from leading/trailing |)
-            cells = [cell for cell in cells if cell]
-            if cells:
-                rows.append(cells)
-
-    return rows
-
-
-def process_vocabulary_file(file_path: Path, korean_to_id: Dict[str, str]) -> str:
+def process_vocabulary_file(file_path: Path, korean_to_id: Dict[str, str],
+                            cache: Optional[ParseCache] = None,
+                            missing: Optional[List[str]] = None) -> str:
     """
     Process a vocabulary markdown file, adding ID column with matched question IDs.
     ONLY updates the ID column (last column), leaves all other columns untouched.
+    Korean terms without a match are appended to `missing` if given.
 
     Returns:
         Updated markdown content with ID column
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    rows = parse_markdown_table(content)
+    if cache is not None:
+        content, rows = cache.read_table(file_path)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        rows = parse_markdown_table(content)
 
     if not rows:
         print(f"  ⚠️  No table found in {file_path.name}")
@@ -86,71 +77,79 @@ def process_vocabulary_file(file_path: Path, korean_to_id: Dict[str, str]) -> st
 
     id_column_index = header.index('ID')
 
-    # Process data rows (skip header at index 0)
-    for i in range(1, len(rows)):
-        row = rows[i]
+    with stage('match') as timing:
+        # Process data rows (skip header at index 0)
+        for i in range(1, len(rows)):
+            row = rows[i]
 
-        if len(row) < 2:
-            continue
+            if len(row) < 2:
+                continue
 
-        # Pad row to have enough columns
-        while len(row) <= id_column_index:
-            row.append('')
+            # Pad row to have enough columns
+            while len(row) <= id_column_index:
+                row.append('')
 
-        # Match by Korean term in column 1 (index 1, since column 0 is the kup level)
-        korean_term = row[1].strip()
-        normalized_korean = korean_term.lower()
-        question_id = korean_to_id.get(normalized_korean, 'Not found')
+            # Match by Korean term in column 1 (index 1, since column 0 is the kup level)
+            korean_term = row[1].strip()
+            normalized_korean = korean_term.lower()
+            question_id = korean_to_id.get(normalized_korean, 'Not found')
+            if question_id == 'Not found' and missing is not None:
+                missing.append(korean_term)
 
-        # ONLY update the ID column
-        row[id_column_index] = question_id
+            # ONLY update the ID column
+            row[id_column_index] = question_id
+        timing.rows = len(rows) - 1
 
     # Reconstruct markdown table
     return format_markdown_table(rows)
 
 
-def format_markdown_table(rows: List[List[str]]) -> str:
+def match_vocabulary_file(file_path: Path, korean_to_id: Dict[str, str],
+                          cache: Optional[ParseCache] = None) -> Tuple[str, List[str]]:
     """
-    Format rows back into a markdown table with proper alignment.
-    """
-    if not rows:
-        return ""
-
-    # Calculate column widths
-    num_cols = max(len(row) for row in rows)
-    col_widths = [0] * num_cols
-
-    for row in rows:
-        for i, cell in enumerate(row):
-            col_widths[i] = max(col_widths[i], len(cell))
-
-    # Build table
-    lines = []
-
-    # Header row
-    header = rows[0]
-    header_line = "| " + " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(header)) + " |"
-    lines.append(header_line)
+    Process a vocabulary markdown file.
 
-    # Separator row
-    separator = "| " + " | ".join("-" * col_widths[i] for i in range(len(header))) + " |"
-    lines.append(separator)
-
-    # Data rows
-    for row in rows[1:]:
-        # Ensure row has same number of columns as header
-        while len(row) < len(header):
-            row.append("")
+    Returns:
+        (updated markdown content, Korean terms that could not be matched)
+    """
+    missing = []
+    updated_content = process_vocabulary_file(file_path, korean_to_id, cache, missing)
+    return updated_content, missing
 
-        row_line = "| " + " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(row)) + " |"
-        lines.append(row_line)
 
-    return "\n".join(lines) + "\n"
+def print_suggestions(missing: List[Tuple[str, str]], korean_to_id: Dict[str, str],
+                      threshold: float) -> None:
+    """Print the closest known Korean term for each unmatched (file, term)."""
+    index = FuzzyIndex(korean_to_id)
+    print(f"\nClosest matches (similarity >= {threshold:.2f}):")
+    for file_name, term in missing:
+        match = index.lookup(term, threshold=threshold)
+        if match:
+            suggestion, question_id, score = match
+            print(f"  {file_name}: '{term}' → '{suggestion}' ({question_id}, {score:.2f})")
+        else:
+            print(f"  {file_name}: '{term}' → no close match")
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Match vocabulary questions in roskilde-source markdown files with questions.json'
+    )
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes for parsing and formatting files (default: 1)')
+    parser.add_argument('--fuzzy-threshold', type=float, default=0.7,
+                        help='Minimum similarity (0-1) for suggesting a term for unmatched rows (default: 0.7)')
+    parser.add_argument('--no-suggest', action='store_true',
+                        help='Do not suggest close matches for unmatched terms')
+    add_changeset_arguments(parser)
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
     script_dir = Path(__file__).parent
-    json_path = script_dir / 'src' / 'data' / 'questions.json'
+    json_path = args.store
     source_dir = script_dir / 'roskilde-source'
 
     # Validate paths
@@ -176,13 +175,17 @@ def main():
 
     print(f"Processing {len(md_files)} vocabulary markdown files:\n")
 
-    stats = {'found': 0, 'not_found': 0, 'total': 0}
+    stats = {'found': 0, 'not_found': 0, 'total': 0, 'changed': 0}
+    cache = ParseCache()
+    changes = ChangeSet()
 
-    for md_file in md_files:
-        print(f"Processing {md_file.name}...")
+    results = map_files(match_vocabulary_file, md_files, korean_to_id, jobs=args.jobs, cache=cache)
+    missing = []
 
-        # Process file
-        updated_content = process_vocabulary_file(md_file, korean_to_id)
+    for md_file, ((updated_content, file_missing), output) in zip(md_files, results):
+        print(f"Processing {md_file.name}...")
+        print(output, end='')
+        missing.extend((md_file.name, term) for term in file_missing)
 
         # Count matches for this file
         file_found = updated_content.count('vocab-')
@@ -193,19 +196,25 @@ def main():
         stats['not_found'] += file_not_found
         stats['total'] += file_total
 
-        print(f"  ✓ {file_found} matched, {file_not_found} not found")
+        # Record the new content (only if the table actually changed)
+        if changes.write(md_file, updated_content):
+            stats['changed'] += 1
+            print(f"  ✓ {file_found} matched, {file_not_found} not found (updated)")
+        else:
+            print(f"  ✓ {file_found} matched, {file_not_found} not found (unchanged)")
 
-        # Write back to file
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+    cache.save()
+    stats['written'] = finish(changes, args)
 
     # Summary
     print(f"\n{'='*50}")
-    print(f"SUMMARY")
+    print(summary_title(args))
     print(f"{'='*50}")
     print(f"Total vocabulary terms processed: {stats['total']}")
     print(f"  ✓ Matched: {stats['found']}")
     print(f"  ✗ Not found: {stats['not_found']}")
+    print(f"Files written: {stats['written']} of {stats['changed']} changed (parse cache: {cache.hits} hits, {cache.misses} misses)")
+    print_profile(args, {**stats, 'cache_hits': cache.hits, 'cache_misses': cache.misses})
 
     if stats['not_found'] > 0:
         print(f"\n⚠️  {stats['not_found']} terms could not be matched.")
@@ -214,6 +223,9 @@ def main():
         print("  - Spacing differences")
         print("  - Terms not yet in questions.json")
 
+        if not args.no_suggest:
+            print_suggestions(missing, korean_to_id, args.fuzzy_threshold)
+
 
 if __name__ == '__main__':
     main()
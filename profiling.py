@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Per-stage profiling for the content scripts.
+
+Every script accepts the same flags (add_profile_arguments):
+
+  --profile             add per-stage wall time, rows processed and peak RSS
+                        to the SUMMARY block
+  --profile-json FILE   also write the SUMMARY and the stage metrics as JSON
+  --profile-dump FILE   also write cProfile stats for the whole run
+                        (view with: python3 -m pstats FILE)
+
+Code marks its stages (load, parse, match, format, write, ...) with
+
+  with stage('parse') as s:
+      rows = parse_markdown_table(content)
+      s.rows = len(rows)
+
+Stages with the same name are summed, and a stage entered again inside
+itself (e.g. a save that falls back to a full save) is only timed once.
+When profiling is off, stage() only costs a function call. Stages run in
+map_files() worker processes (--jobs N) are sent back with their results
+and merged, so their times are summed over the workers rather than wall
+time.
+
+Peak RSS is the high-water mark of the process that ran the stage, from
+resource.getrusage (not available on Windows, where it is reported as None).
+"""
+
+import argparse
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class StageRecord:
+    """Totals for one named stage."""
+
+    __slots__ = ('name', 'seconds', 'rows', 'calls', 'peak_rss')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = 0
+        self.calls = 0
+        self.peak_rss: Optional[int] = None
+
+    def to_json(self) -> Dict:
+        return {
+            'stage': self.name,
+            'seconds': round(self.seconds, 6),
+            'rows': self.rows,
+            'calls': self.calls,
+            'peakRssBytes': self.peak_rss,
+        }
+
+
+class _Rows:
+    """What stage() yields: the caller sets .rows to the number of rows processed."""
+
+    __slots__ = ('rows',)
+
+    def __init__(self):
+        self.rows = 0
+
+
+# Profiling state of this process
+_enabled = False
+_stages: Dict[str, StageRecord] = {}
+_active: set = set()
+_started_at = time.perf_counter()
+_cprofile: Optional[cProfile.Profile] = None
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    """Start collecting stage metrics (e.g. in a worker process)."""
+    global _enabled
+    _enabled = True
+
+
+@contextmanager
+def stage(name: str) -> Iterator[_Rows]:
+    """Time a block of work as part of the named stage."""
+    rows = _Rows()
+    if not _enabled or name in _active:
+        yield rows
+        return
+
+    _active.add(name)
+    start = time.perf_counter()
+    try:
+        yield rows
+    finally:
+        _active.discard(name)
+        record = _stages.get(name)
+        if record is None:
+            record = _stages[name] = StageRecord(name)
+        record.seconds += time.perf_counter() - start
+        record.rows += rows.rows
+        record.calls += 1
+        rss = peak_rss()
+        if rss is not None:
+            record.peak_rss = max(record.peak_rss or 0, rss)
+
+
+def take_stages() -> List[Dict]:
+    """Return and clear the stages recorded in this process (for sending to the parent)."""
+    records = [record.to_json() for record in _stages.values()]
+    _stages.clear()
+    return records
+
+
+def merge_stages(records: List[Dict]) -> None:
+    """Add stages recorded in another process."""
+    for data in records:
+        record = _stages.get(data['stage'])
+        if record is None:
+            record = _stages[data['stage']] = StageRecord(data['stage'])
+        record.seconds += data['seconds']
+        record.rows += data['rows']
+        record.calls += data['calls']
+        if data['peakRssBytes'] is not None:
+            record.peak_rss = max(record.peak_rss or 0, data['peakRssBytes'])
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """--profile, --profile-json and --profile-dump."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Report wall time, rows and peak RSS per stage in the summary')
+    parser.add_argument('--profile-json', type=Path, metavar='FILE',
+                        help='Write the summary and per-stage metrics as JSON (implies --profile)')
+    parser.add_argument('--profile-dump', type=Path, metavar='FILE',
+                        help='Write cProfile stats for the whole run (implies --profile)')
+
+
+def start_profiling(args: argparse.Namespace) -> None:
+    """Enable stage metrics (and cProfile) if the script was run with a profile flag."""
+    global _started_at, _cprofile
+    if not (args.profile or args.profile_json or args.profile_dump):
+        return
+    enable()
+    _stages.clear()
+    _started_at = time.perf_counter()
+    if args.profile_dump:
+        _cprofile = cProfile.Profile()
+        _cprofile.enable()
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    return 'n/a' if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+
+def print_profile(args: argparse.Namespace, summary: Optional[Dict] = None) -> None:
+    """
+    Print the stage metrics (as part of a script's SUMMARY block) and write
+    the JSON and cProfile outputs that were asked for. Does nothing unless
+    start_profiling() enabled profiling.
+
+    Args:
+        summary: The script's summary counts, included in the JSON output
+    """
+    global _cprofile
+    if not _enabled:
+        return
+    if _cprofile is not None:
+        _cprofile.disable()
+
+    total = time.perf_counter() - _started_at
+    records = list(_stages.values())
+
+    print(f"\nProfile (wall time, rows, peak RSS):")
+    for record in records:
+        rate = f"{record.rows / record.seconds:,.0f} rows/s" if record.rows and record.seconds else ''
+        print(f"  {record.name:<10} {record.seconds * 1000:10.1f} ms {record.rows:>9} rows "
+              f"{_format_bytes(record.peak_rss):>10}  {rate}")
+    print(f"  {'total':<10} {total * 1000:10.1f} ms {'':>14} {_format_bytes(peak_rss()):>10}")
+
+    if args.profile_json:
+        report = {
+            'script': Path(sys.argv[0]).name,
+            'summary': summary or {},
+            'seconds': round(total, 6),
+            'peakRssBytes': peak_rss(),
+            'stages': [record.to_json() for record in records],
+        }
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"  Profile JSON written to {args.profile_json}")
+
+    if _cprofile is not None:
+        _cprofile.dump_stats(str(args.profile_dump))
+        print(f"  cProfile stats written to {args.profile_dump} (view with: python3 -m pstats {args.profile_dump})")
+        _cprofile = None
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+# Run with: python3 question_bank.py compact
+"""
+Shared in-memory question bank used by the content scripts.
+
+Loads questions.json once and keeps hash indexes so lookups and ID allocation
+do not have to scan vocabularyQuestions/theoryQuestions:
+  - by ID
+  - by (beltRank, category)
+  - by normalized Korean term (vocabulary)
+  - by canonical Danish question text (theory, see canonicalize_text)
+  - highest allocated number per ID prefix (e.g. 'vocab-8_kup-stances-')
+
+Edits made through the bank can either be saved as a full (atomic) rewrite of
+questions.json, or appended to a change journal next to it
+(questions.journal.jsonl) so a single edit costs O(edit). The journal is
+replayed on load and compacted into questions.json once it grows past
+JOURNAL_COMPACT_THRESHOLD operations, or on demand:
+
+  python3 question_bank.py compact
+
+The Vite app only reads questions.json, so compact before building.
+
+Parsed documents are cached in .cache/ as marshal files (with the keys and
+belt/category strings interned) so warm starts skip the JSON parse. A cache
+entry is rebuilt whenever questions.json's size, mtime or SHA-256 changes.
+"""
+
+import argparse
+import copy
+import gc
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+import unicodedata
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+
+
+DEFAULT_JSON_PATH = Path(__file__).parent / 'src' / 'data' / 'questions.json'
+CACHE_DIR = Path(__file__).parent / '.cache'
+
+# Store paths with these suffixes are SQLite files handled by question_store.py
+SQLITE_SUFFIXES = {'.db', '.sqlite', '.sqlite3'}
+
+# Bumped when the cached layout changes; marshal data is also Python-version specific
+CACHE_FORMAT = (1, marshal.version, sys.version_info[:2])
+
+# Journaled operations before save_changes() compacts into questions.json
+JOURNAL_COMPACT_THRESHOLD = 1000
+
+# Section name -> key in questions.json
+SECTIONS = {
+    'vocabulary': 'vocabularyQuestions',
+    'theory': 'theoryQuestions',
+}
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a Korean term for matching."""
+    return (text or '').strip().lower()
+
+
+# Typographic quotes and apostrophes folded to their ASCII forms
+_QUOTE_FOLD = str.maketrans({
+    '“': '"', '”': '"', '„': '"', '‟': '"', '«': '"', '»': '"',
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", '´': "'", '`': "'",
+})
+
+
+def canonicalize_text(text: str) -> str:
+    """
+    Canonical form of a Danish question for matching: NFKC, typographic quotes
+    and apostrophes folded to ASCII, whitespace collapsed, case folded.
+    """
+    text = unicodedata.normalize('NFKC', text or '').translate(_QUOTE_FOLD)
+    return ' '.join(text.split()).casefold()
+
+
+def split_id(question_id: str) -> Tuple[str, Optional[int]]:
+    """
+    Split a question ID into its prefix and number.
+    E.g., 'vocab-10_kup-leg_techniques-001' -> ('vocab-10_kup-leg_techniques-', 1)
+    Returns (question_id, None) if the ID has no numeric suffix.
+    """
+    prefix, sep, number = question_id.rpartition('-')
+    if not sep:
+        return question_id, None
+    try:
+        return prefix + sep, int(number)
+    except ValueError:
+        return question_id, None
+
+
+def is_sqlite_path(path: Path) -> bool:
+    """True if a store path refers to a SQLite file (see question_store.py) rather than JSON."""
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+def journal_path_for(json_path: Path) -> Path:
+    """Path of the change journal for a questions.json file."""
+    json_path = Path(json_path)
+    return json_path.with_name(f"{json_path.stem}.journal.jsonl")
+
+
+def _file_stamp(path: Path) -> Dict[str, int]:
+    """Size and mtime of a file, used to tie a journal to its base file."""
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns}
+
+
+class JournalError(Exception):
+    """The change journal does not belong to the current questions.json."""
+
+
+def cache_path_for(json_path: Path) -> Path:
+    """Path of the marshal cache for a questions.json file."""
+    key = hashlib.sha1(str(Path(json_path).resolve()).encode('utf-8')).hexdigest()[:12]
+    return CACHE_DIR / f"{Path(json_path).stem}-{key}.marshal"
+
+
+def _intern_strings(data: Dict) -> Dict:
+    """Intern dict keys and beltRank/category values so the cache stores each once."""
+    def intern(value):
+        if isinstance(value, dict):
+            return {
+                sys.intern(key): (sys.intern(item) if key in ('beltRank', 'category')
+                                  and isinstance(item, str) else intern(item))
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [intern(item) for item in value]
+        return value
+    return intern(data)
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause the cycle collector while building thousands of small dicts,
+    which otherwise dominates load time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_cache(cache_path: Path) -> Tuple[Optional[Dict], bytes]:
+    """Return (header, marshalled document) of a cache file, or (None, b'') if unreadable."""
+    try:
+        raw = cache_path.read_bytes()
+        header_size = int.from_bytes(raw[:4], 'little')
+        header = marshal.loads(raw[4:4 + header_size])
+        return header, raw[4 + header_size:]
+    except (OSError, EOFError, ValueError, TypeError):
+        return None, b''
+
+
+def _write_cache(cache_path: Path, header: Dict, payload: bytes) -> None:
+    header_bytes = marshal.dumps(header)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(len(header_bytes).to_bytes(4, 'little'))
+            f.write(header_bytes)
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_document(json_path: Path, use_cache: bool = True) -> Dict:
+    """
+    Load a questions.json document, from the marshal cache when it is current.
+
+    The cache header records the file's size, mtime and SHA-256; if size or
+    mtime differ the hash is checked before re-parsing (e.g. after a touch or
+    a checkout).
+    """
+    json_path = Path(json_path)
+    if not use_cache:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    cache_path = cache_path_for(json_path)
+    stamp = _file_stamp(json_path)
+    header, payload = _read_cache(cache_path) if cache_path.exists() else (None, b'')
+    current = isinstance(header, dict) and header.get('format') == CACHE_FORMAT
+    if current and header.get('stamp') == stamp:
+        try:
+            with _gc_paused():
+                return marshal.loads(payload)
+        except (EOFError, ValueError, TypeError):
+            current = False
+
+    raw = json_path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    new_header = {'format': CACHE_FORMAT, 'stamp': stamp, 'sha256': digest}
+    if current and header.get('sha256') == digest:
+        # Same content with a new mtime: keep the cached document, refresh the stamp
+        try:
+            with _gc_paused():
+                data = marshal.loads(payload)
+            _write_cache(cache_path, new_header, payload)
+            return data
+        except (EOFError, ValueError, TypeError, OSError):
+            pass
+
+    with _gc_paused():
+        data = _intern_strings(json.loads(raw))
+    try:
+        _write_cache(cache_path, new_header, marshal.dumps(data))
+    except OSError:
+        pass  # The cache is only an optimization
+    return data
+
+
+def vocab_prefix(belt_rank: str, category: str) -> str:
+    """ID prefix for vocabulary questions of a belt rank and category."""
+    return f"vocab-{belt_rank}-{category}-"
+
+
+def theory_prefix(belt_rank: str) -> str:
+    """ID prefix for theory questions of a belt rank."""
+    return f"theory-{belt_rank}-"
+
+
+class QuestionBank:
+    """
+    questions.json loaded into memory with lookup indexes.
+
+    The raw document is kept in `data` so it can be saved back unchanged
+    apart from the edits made through this class.
+    """
+
+    def __init__(self, data: Dict, path: Optional[Path] = None):
+        self.data = data
+        self.path = path
+        for key in SECTIONS.values():
+            self.data.setdefault(key, [])
+        # Operations not yet written anywhere, and operations already in the journal
+        self.pending: List[Dict] = []
+        self.journal_ops = 0
+        self._build_indexes()
+
+    @classmethod
+    def load(cls, json_path: Path = DEFAULT_JSON_PATH, use_cache: bool = True) -> 'QuestionBank':
+        """
+        Load questions.json (or its cache), replay its change journal and build the indexes.
+        A SQLite store (see question_store.py) is loaded from its tables instead.
+        """
+        json_path = Path(json_path)
+        with stage('load') as timing:
+            if is_sqlite_path(json_path):
+                import question_store
+                bank = cls(question_store.load_document(json_path), json_path)
+            else:
+                bank = cls(load_document(json_path, use_cache=use_cache), json_path)
+                bank._replay_journal()
+            timing.rows = len(bank.vocabulary) + len(bank.theory)
+        return bank
+
+    def save(self, json_path: Optional[Path] = None) -> None:
+        """
+        Save questions.json with pretty formatting.
+
+        Writes to a temporary file in the same directory and moves it into
+        place, so an interrupted save never leaves a truncated bank behind.
+        Saving over the loaded file compacts its journal.
+
+        Saving a bank loaded from a SQLite store back to it only applies the
+        pending edits; saving to another .db file writes the whole bank.
+        """
+        json_path = Path(json_path or self.path)
+        if is_sqlite_path(json_path):
+            import question_store
+            with stage('write') as timing:
+                if self.path and json_path == Path(self.path):
+                    timing.rows = len(self.pending)
+                    question_store.apply_ops(json_path, self.pending)
+                else:
+                    timing.rows = len(self.vocabulary) + len(self.theory)
+                    question_store.write_document(json_path, self.data)
+            self.pending = []
+            return
+        with stage('write') as timing:
+            timing.rows = len(self.vocabulary) + len(self.theory)
+            self._write_atomic(json_path)
+
+        journal_path = journal_path_for(json_path)
+        if self.path and json_path == Path(self.path) and journal_path.exists():
+            journal_path.unlink()
+        self.pending = []
+        self.journal_ops = 0
+
+    def save_changes(self) -> None:
+        """
+        Append pending edits to the change journal.
+
+        Falls back to a full save (which compacts the journal) once the
+        journal would exceed JOURNAL_COMPACT_THRESHOLD operations.
+        """
+        if not self.pending:
+            return
+
+        # SQLite stores take row-level edits directly, so they need no journal
+        if is_sqlite_path(self.path) or self.journal_ops + len(self.pending) > JOURNAL_COMPACT_THRESHOLD:
+            self.save()
+            return
+
+        journal_path = journal_path_for(self.path)
+        with stage('write') as timing, open(journal_path, 'a', encoding='utf-8') as f:
+            timing.rows = len(self.pending)
+            if self.journal_ops == 0:
+                header = {'op': 'base', **_file_stamp(Path(self.path))}
+                f.write(json.dumps(header) + '\n')
+            for op in self.pending:
+                f.write(json.dumps(op, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.journal_ops += len(self.pending)
+        self.pending = []
+
+    def _replay_journal(self) -> None:
+        journal_path = journal_path_for(self.path)
+        if not journal_path.exists():
+            return
+
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                op = json.loads(line)
+                if op['op'] == 'base':
+                    stamp = _file_stamp(Path(self.path))
+                    if stamp != {'size': op['size'], 'mtimeNs': op['mtimeNs']}:
+                        raise JournalError(
+                            f"{journal_path.name} was written against a different "
+                            f"{Path(self.path).name}; remove or re-apply it before editing"
+                        )
+                    continue
+                try:
+                    self._apply(op)
+                except KeyError as e:
+                    raise JournalError(f"{journal_path.name}:{line_num}: unknown question {e}")
+                self.journal_ops += 1
+
+    def _write_atomic(self, json_path: Path) -> None:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=json_path.parent, prefix=f".{json_path.name}.", suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file as 0600; keep the bank's permissions
+            mode = json_path.stat().st_mode if json_path.exists() else 0o644
+            os.chmod(tmp_path, mode & 0o777)
+            os.replace(tmp_path, json_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    # ------------------------------------------------------------------
+    # Indexes
+    # ------------------------------------------------------------------
+
+    def _build_indexes(self) -> None:
+        self.by_id: Dict[str, Dict] = {}
+        # Later questions with an ID already in by_id, in file order
+        self.shadowed_ids: Dict[str, List[Dict]] = defaultdict(list)
+        self.by_belt_category: Dict[Tuple[str, Optional[str]], List[Dict]] = defaultdict(list)
+        self.by_korean: Dict[str, List[Dict]] = defaultdict(list)
+        self.by_question_text: Dict[str, List[Dict]] = defaultdict(list)
+        self.max_id_number: Dict[str, int] = {}
+
+        for _, question in self.iter_questions():
+            self._index(question)
+
+    def _index(self, question: Dict) -> None:
+        question_id = question.get('id', '')
+        if question_id:
+            # First occurrence wins for duplicate IDs (see validate_unique_ids.py)
+            if self.by_id.setdefault(question_id, question) is not question:
+                self.shadowed_ids[question_id].append(question)
+            prefix, number = split_id(question_id)
+            if number is not None and number > self.max_id_number.get(prefix, 0):
+                self.max_id_number[prefix] = number
+
+        self.by_belt_category[(question.get('beltRank'), question.get('category'))].append(question)
+
+        korean = question.get('translations', {}).get('ko', '')
+        if korean:
+            self.by_korean[normalize_text(korean)].append(question)
+
+        question_text = (question.get('question') or {}).get('da', '')
+        if question_text:
+            self.by_question_text[canonicalize_text(question_text)].append(question)
+
+    def _unindex(self, question: Dict) -> None:
+        question_id = question.get('id', '')
+        if self.by_id.get(question_id) is question:
+            # The next question with the same ID takes its place, so edits by ID reach it
+            shadowed = self.shadowed_ids.get(question_id)
+            if shadowed:
+                self.by_id[question_id] = shadowed.pop(0)
+                if not shadowed:
+                    del self.shadowed_ids[question_id]
+            else:
+                del self.by_id[question_id]
+        elif question_id in self.shadowed_ids:
+            self._remove_from(self.shadowed_ids, question_id, question)
+
+        key = (question.get('beltRank'), question.get('category'))
+        self._remove_from(self.by_belt_category, key, question)
+
+        korean = question.get('translations', {}).get('ko', '')
+        if korean:
+            self._remove_from(self.by_korean, normalize_text(korean), question)
+
+        question_text = (question.get('question') or {}).get('da', '')
+        if question_text:
+            self._remove_from(self.by_question_text, canonicalize_text(question_text), question)
+
+    @staticmethod
+    def _remove_from(index: Dict, key, question: Dict) -> None:
+        bucket = index.get(key, [])
+        for i, candidate in enumerate(bucket):
+            if candidate is question:
+                del bucket[i]
+                break
+        if not bucket and key in index:
+            del index[key]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def vocabulary(self) -> List[Dict]:
+        return self.data[SECTIONS['vocabulary']]
+
+    @property
+    def theory(self) -> List[Dict]:
+        return self.data[SECTIONS['theory']]
+
+    def iter_questions(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (section, question) for every question in file order."""
+        for section, key in SECTIONS.items():
+            for question in self.data.get(key, []):
+                yield section, question
+
+    def get(self, question_id: str) -> Optional[Dict]:
+        return self.by_id.get(question_id)
+
+    def find_by_korean(self, korean: str) -> List[Dict]:
+        return self.by_korean.get(normalize_text(korean), [])
+
+    def find_by_question_text(self, question_text: str) -> List[Dict]:
+        return self.by_question_text.get(canonicalize_text(question_text), [])
+
+    def questions_for(self, belt_rank: str, category: Optional[str] = None) -> List[Dict]:
+        return self.by_belt_category.get((belt_rank, category), [])
+
+    def korean_to_id(self) -> Dict[str, str]:
+        """Map normalized Korean terms to question IDs (last occurrence wins)."""
+        return {
+            term: questions[-1]['id']
+            for term, questions in self.by_korean.items()
+            if questions[-1].get('id')
+        }
+
+    def question_to_id(self) -> Dict[str, str]:
+        """Map canonical Danish question text to question IDs (last occurrence wins)."""
+        return {
+            text: questions[-1]['id']
+            for text, questions in self.by_question_text.items()
+            if questions[-1].get('id')
+        }
+
+    # ------------------------------------------------------------------
+    # Edits
+    # ------------------------------------------------------------------
+
+    def allocate_id(self, prefix: str) -> str:
+        """Reserve and return the next free ID for a prefix."""
+        next_num = self.max_id_number.get(prefix, 0) + 1
+        self.max_id_number[prefix] = next_num
+        return f"{prefix}{next_num:03d}"
+
+    def add(self, section: str, question: Dict) -> Dict:
+        """Append a question to a section ('vocabulary' or 'theory')."""
+        self.data[SECTIONS[section]].append(question)
+        self._index(question)
+        self.pending.append({'op': 'add', 'section': section, 'question': copy.deepcopy(question)})
+        return question
+
+    def update(self, question: Dict, **fields) -> Dict:
+        """Replace top-level fields of a question, keeping indexes in sync."""
+        self._unindex(question)
+        question.update(fields)
+        self._index(question)
+        self.pending.append({'op': 'update', 'id': question['id'], 'fields': copy.deepcopy(fields)})
+        return question
+
+    def rename(self, question: Dict, new_id: str, belt_rank: Optional[str] = None) -> Dict:
+        """Change a question's ID (and optionally belt rank), keeping indexes in sync."""
+        old_id = question['id']
+        self._unindex(question)
+        question['id'] = new_id
+        if belt_rank:
+            question['beltRank'] = belt_rank
+        self._index(question)
+        self.pending.append({'op': 'rename', 'id': old_id, 'newId': new_id, 'beltRank': belt_rank})
+        return question
+
+    def replay(self, ops: List[Dict]) -> None:
+        """Apply recorded edit operations (e.g. from a change set) as pending edits."""
+        for op in ops:
+            self._apply(copy.deepcopy(op))
+            self.pending.append(copy.deepcopy(op))
+
+    def _apply(self, op: Dict) -> None:
+        """Apply a journaled operation without recording it again."""
+        if op['op'] == 'add':
+            self.data[SECTIONS[op['section']]].append(op['question'])
+            self._index(op['question'])
+            return
+
+        question = self.by_id[op['id']]
+        self._unindex(question)
+        if op['op'] == 'update':
+            question.update(op['fields'])
+        elif op['op'] == 'rename':
+            question['id'] = op['newId']
+            if op.get('beltRank'):
+                question['beltRank'] = op['beltRank']
+        self._index(question)
+
+
+
+def load_bank_or_exit(json_path: Path, **kwargs) -> QuestionBank:
+    """QuestionBank.load for scripts: a journal that does not fit is reported and exits with 1."""
+    try:
+        return QuestionBank.load(json_path, **kwargs)
+    except JournalError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the questions.json change journal')
+    parser.add_argument('command', choices=['compact', 'status'],
+                        help='compact: fold the journal into questions.json; status: show journal size')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if not DEFAULT_JSON_PATH.exists():
+        print(f"❌ Error: questions.json not found at {DEFAULT_JSON_PATH}")
+        return 1
+
+    bank = load_bank_or_exit(DEFAULT_JSON_PATH)
+
+    if args.command == 'status':
+        print(f"Journaled operations: {bank.journal_ops}")
+        return 0
+
+    if bank.journal_ops == 0:
+        print("✓ Nothing to compact")
+        return 0
+
+    ops = bank.journal_ops
+    bank.save()
+    print(f"✓ Compacted {ops} journaled operations into questions.json")
+    print_profile(args, {'compacted': ops})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# Run with: python3 question_store.py import|export
+"""
+Optional SQLite backend for the question bank.
+
+A local SQLite file (default src/data/questions.db) holds the same content
+as questions.json in indexed tables:
+
+  questions          one row per question: section, position, id, beltRank,
+                     category, normalized Korean term (all indexed)
+  translations       text per question, field (translations, question,
+                     correctAnswer) and language
+  incorrect_answers  incorrect answers per question and language, in order
+  document           the other top-level values (metadata) and key order
+
+QuestionBank.load() and the scripts' --store option accept a .db file.
+Saving applies only the pending edits (add, update, rename) as row-level
+changes in one transaction instead of rewriting the bank. The Vite app
+still imports questions.json, so export before building:
+
+  python3 question_store.py import   # questions.json -> questions.db
+  python3 question_store.py export   # questions.db -> questions.json
+
+The export is byte-for-byte the questions.json that was imported, apart
+from the edits made since.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, SECTIONS, JournalError, journal_path_for, load_bank_or_exit, normalize_text
+
+
+DEFAULT_DB_PATH = DEFAULT_JSON_PATH.with_suffix('.db')
+
+# Question fields stored in their own columns, and language -> text objects
+# stored in the translations table
+COLUMN_FIELDS = {'id': 'id', 'beltRank': 'belt_rank', 'category': 'category'}
+TEXT_FIELDS = ('translations', 'question', 'correctAnswer')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS document (
+    position INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    value TEXT                      -- JSON; NULL for question sections
+);
+CREATE TABLE IF NOT EXISTS questions (
+    pk INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT,
+    belt_rank TEXT,
+    category TEXT,
+    korean TEXT,                    -- normalize_text(translations.ko)
+    layout TEXT NOT NULL,           -- JSON: key order of the question and its objects
+    extra TEXT                      -- JSON: fields without a column or table
+);
+CREATE INDEX IF NOT EXISTS idx_questions_order ON questions (section, position);
+CREATE INDEX IF NOT EXISTS idx_questions_id ON questions (id);
+CREATE INDEX IF NOT EXISTS idx_questions_belt_category ON questions (belt_rank, category);
+CREATE INDEX IF NOT EXISTS idx_questions_korean ON questions (korean);
+CREATE TABLE IF NOT EXISTS translations (
+    question_pk INTEGER NOT NULL REFERENCES questions (pk) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    text TEXT,
+    PRIMARY KEY (question_pk, field, lang)
+);
+CREATE TABLE IF NOT EXISTS incorrect_answers (
+    question_pk INTEGER NOT NULL REFERENCES questions (pk) ON DELETE CASCADE,
+    lang TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT,
+    PRIMARY KEY (question_pk, lang, position)
+);
+"""
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path))
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _is_text_map(value) -> bool:
+    return isinstance(value, dict) and all(
+        text is None or isinstance(text, str) for text in value.values()
+    )
+
+
+def _is_answer_map(value) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(answers, list) and all(isinstance(text, str) for text in answers)
+        for answers in value.values()
+    )
+
+
+def _is_column_value(value) -> bool:
+    return value is None or isinstance(value, str)
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+
+def _insert_question(conn: sqlite3.Connection, section: str, position: int, question: Dict,
+                     pk: Optional[int] = None) -> int:
+    """Insert a question and its child rows. Returns its pk."""
+    layout = {'keys': list(question), 'objects': {}}
+    extra = {}
+    columns = {column: None for column in COLUMN_FIELDS.values()}
+    texts: List[Tuple[str, str, Optional[str]]] = []
+    answers: List[Tuple[str, int, str]] = []
+
+    for key, value in question.items():
+        if key in COLUMN_FIELDS and _is_column_value(value):
+            columns[COLUMN_FIELDS[key]] = value
+        elif key in TEXT_FIELDS and _is_text_map(value):
+            layout['objects'][key] = list(value)
+            texts.extend((key, lang, text) for lang, text in value.items())
+        elif key == 'incorrectAnswers' and _is_answer_map(value):
+            layout['objects'][key] = list(value)
+            answers.extend(
+                (lang, i, text) for lang, texts_ in value.items() for i, text in enumerate(texts_)
+            )
+        else:
+            extra[key] = value
+
+    korean = None
+    if section == 'vocabulary' and _is_text_map(question.get('translations')):
+        korean = normalize_text(question['translations'].get('ko') or '') or None
+
+    cursor = conn.execute(
+        'INSERT INTO questions (pk, section, position, id, belt_rank, category, korean, layout, extra) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (pk, section, position, columns['id'], columns['belt_rank'], columns['category'], korean,
+         json.dumps(layout, ensure_ascii=False),
+         json.dumps(extra, ensure_ascii=False) if extra else None),
+    )
+    pk = cursor.lastrowid
+    conn.executemany(
+        'INSERT INTO translations (question_pk, field, lang, text) VALUES (?, ?, ?, ?)',
+        [(pk, field, lang, text) for field, lang, text in texts],
+    )
+    conn.executemany(
+        'INSERT INTO incorrect_answers (question_pk, lang, position, text) VALUES (?, ?, ?, ?)',
+        [(pk, lang, i, text) for lang, i, text in answers],
+    )
+    return pk
+
+
+def write_document(db_path: Path, data: Dict) -> None:
+    """Replace the whole store with a questions.json document."""
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute('DELETE FROM incorrect_answers')
+            conn.execute('DELETE FROM translations')
+            conn.execute('DELETE FROM questions')
+            conn.execute('DELETE FROM document')
+            sections = {key: section for section, key in SECTIONS.items()}
+            for position, (key, value) in enumerate(data.items()):
+                section = sections.get(key)
+                if section and isinstance(value, list):
+                    conn.execute('INSERT INTO document (position, key, value) VALUES (?, ?, NULL)',
+                                 (position, key))
+                    for index, question in enumerate(value):
+                        _insert_question(conn, section, index, question)
+                else:
+                    conn.execute('INSERT INTO document (position, key, value) VALUES (?, ?, ?)',
+                                 (position, key, json.dumps(value, ensure_ascii=False)))
+    finally:
+        conn.close()
+
+
+def _find_pk(conn: sqlite3.Connection, question_id: str) -> Tuple[int, str, int]:
+    """(pk, section, position) of the first question with an ID, in document order."""
+    section_order = ' '.join(
+        f"WHEN '{section}' THEN {i}" for i, section in enumerate(SECTIONS)
+    )
+    row = conn.execute(
+        f'SELECT pk, section, position FROM questions WHERE id = ? '
+        f'ORDER BY CASE section {section_order} END, position LIMIT 1',
+        (question_id,),
+    ).fetchone()
+    if row is None:
+        raise KeyError(question_id)
+    return row
+
+
+def _replace_question(conn: sqlite3.Connection, pk: int, section: str, position: int,
+                      question: Dict) -> None:
+    conn.execute('DELETE FROM questions WHERE pk = ?', (pk,))
+    _insert_question(conn, section, position, question, pk=pk)
+
+
+def apply_ops(db_path: Path, ops: Iterable[Dict]) -> int:
+    """
+    Apply QuestionBank edit operations (add, update, rename) in one transaction.
+    Only the affected rows are touched. Returns the number of operations applied.
+    """
+    conn = connect(db_path)
+    count = 0
+    try:
+        with conn:
+            for op in ops:
+                if op['op'] == 'add':
+                    section = op['section']
+                    (position,) = conn.execute(
+                        'SELECT COALESCE(MAX(position) + 1, 0) FROM questions WHERE section = ?',
+                        (section,),
+                    ).fetchone()
+                    _insert_question(conn, section, position, op['question'])
+                else:
+                    pk, section, position = _find_pk(conn, op['id'])
+                    question = _read_question(conn, pk)
+                    if op['op'] == 'update':
+                        question.update(op['fields'])
+                    elif op['op'] == 'rename':
+                        question['id'] = op['newId']
+                        if op.get('beltRank'):
+                            question['beltRank'] = op['beltRank']
+                    _replace_question(conn, pk, section, position, question)
+                count += 1
+    finally:
+        conn.close()
+    return count
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+_QUESTION_COLUMNS = 'pk, section, id, belt_rank, category, layout, extra'
+
+
+def _build_question(row: Tuple, texts: Dict, answers: Dict) -> Dict:
+    """Rebuild a question dict with its original key order."""
+    _, _, question_id, belt_rank, category, layout, extra = row
+    layout = json.loads(layout)
+    extra = json.loads(extra) if extra else {}
+    columns = {'id': question_id, 'beltRank': belt_rank, 'category': category}
+
+    question = {}
+    for key in layout['keys']:
+        if key in extra:
+            question[key] = extra[key]
+        elif key in layout['objects']:
+            source = answers if key == 'incorrectAnswers' else texts.get(key, {})
+            question[key] = {
+                lang: list(source.get(lang, [])) if key == 'incorrectAnswers' else source.get(lang)
+                for lang in layout['objects'][key]
+            }
+        else:
+            question[key] = columns[key]
+    return question
+
+
+def _child_rows(conn: sqlite3.Connection, where: str, params: Tuple) -> Tuple[Dict, Dict]:
+    """Texts and incorrect answers per question pk for the questions matching `where`."""
+    texts: Dict[int, Dict[str, Dict]] = {}
+    for pk, field, lang, text in conn.execute(
+        f'SELECT t.question_pk, t.field, t.lang, t.text FROM translations t '
+        f'JOIN questions q ON q.pk = t.question_pk WHERE {where}', params
+    ):
+        texts.setdefault(pk, {}).setdefault(field, {})[lang] = text
+
+    answers: Dict[int, Dict[str, List[str]]] = {}
+    for pk, lang, text in conn.execute(
+        f'SELECT a.question_pk, a.lang, a.text FROM incorrect_answers a '
+        f'JOIN questions q ON q.pk = a.question_pk WHERE {where} '
+        f'ORDER BY a.question_pk, a.lang, a.position', params
+    ):
+        answers.setdefault(pk, {}).setdefault(lang, []).append(text)
+    return texts, answers
+
+
+def _read_question(conn: sqlite3.Connection, pk: int) -> Dict:
+    row = conn.execute(f'SELECT {_QUESTION_COLUMNS} FROM questions WHERE pk = ?', (pk,)).fetchone()
+    texts, answers = _child_rows(conn, 'q.pk = ?', (pk,))
+    return _build_question(row, texts.get(pk, {}), answers.get(pk, {}))
+
+
+def _iter_section(conn: sqlite3.Connection, section: str) -> Iterator[Dict]:
+    texts, answers = _child_rows(conn, 'q.section = ?', (section,))
+    for row in conn.execute(
+        f'SELECT {_QUESTION_COLUMNS} FROM questions WHERE section = ? ORDER BY position',
+        (section,),
+    ):
+        yield _build_question(row, texts.get(row[0], {}), answers.get(row[0], {}))
+
+
+def iter_questions(db_path: Path, section: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    """Yield (section, question) in document order, one section at a time."""
+    conn = connect(db_path)
+    try:
+        keys = [key for (key,) in conn.execute(
+            'SELECT key FROM document WHERE value IS NULL ORDER BY position'
+        )]
+        sections = {key: name for name, key in SECTIONS.items()}
+        for key in keys:
+            name = sections.get(key)
+            if name and (section is None or name == section):
+                for question in _iter_section(conn, name):
+                    yield name, question
+    finally:
+        conn.close()
+
+
+def load_document(db_path: Path) -> Dict:
+    """Rebuild the full questions.json document."""
+    conn = connect(db_path)
+    try:
+        sections = {key: name for name, key in SECTIONS.items()}
+        data = {}
+        for key, value in conn.execute('SELECT key, value FROM document ORDER BY position'):
+            if value is None:
+                data[key] = list(_iter_section(conn, sections[key]))
+            else:
+                data[key] = json.loads(value)
+        return data
+    finally:
+        conn.close()
+
+
+def read_metadata(db_path: Path) -> Dict:
+    """The metadata object, without reading any questions."""
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM document WHERE key = 'metadata'").fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else {}
+    finally:
+        conn.close()
+
+
+def get(db_path: Path, question_id: str) -> Optional[Dict]:
+    """The first question with an ID, using the id index."""
+    conn = connect(db_path)
+    try:
+        try:
+            pk, _, _ = _find_pk(conn, question_id)
+        except KeyError:
+            return None
+        return _read_question(conn, pk)
+    finally:
+        conn.close()
+
+
+def find_by_korean(db_path: Path, korean: str) -> List[Dict]:
+    """Vocabulary questions with a Korean term, using the korean index."""
+    conn = connect(db_path)
+    try:
+        pks = [pk for (pk,) in conn.execute(
+            'SELECT pk FROM questions WHERE korean = ? ORDER BY position', (normalize_text(korean),)
+        )]
+        return [_read_question(conn, pk) for pk in pks]
+    finally:
+        conn.close()
+
+
+def questions_for(db_path: Path, belt_rank: str, category: Optional[str] = None) -> List[Dict]:
+    """Questions of a belt rank and category, using the belt/category index."""
+    conn = connect(db_path)
+    try:
+        pks = [pk for (pk,) in conn.execute(
+            'SELECT pk FROM questions WHERE belt_rank = ? AND category IS ? ORDER BY section, position',
+            (belt_rank, category),
+        )]
+        return [_read_question(conn, pk) for pk in pks]
+    finally:
+        conn.close()
+
+
+def export_json(db_path: Path, json_path: Path) -> bool:
+    """
+    Write the store as questions.json (atomically). Returns True if the file changed.
+
+    Raises JournalError if questions.json has a change journal: its edits
+    would be lost, and it would no longer match the exported file.
+    """
+    journal_path = journal_path_for(json_path)
+    if journal_path.exists():
+        raise JournalError(f"{journal_path.name} has edits not in {json_path.name}; "
+                           f"compact it (python3 question_bank.py compact) or import it first")
+    content = json.dumps(load_document(db_path), ensure_ascii=False, indent=2).encode('utf-8')
+    if json_path.exists() and json_path.read_bytes() == content:
+        return False
+
+    fd, tmp_path = tempfile.mkstemp(dir=json_path.parent, prefix=f".{json_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        mode = json_path.stat().st_mode if json_path.exists() else 0o644
+        os.chmod(tmp_path, mode & 0o777)
+        os.replace(tmp_path, json_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert between questions.json and the SQLite store')
+    parser.add_argument('command', choices=['import', 'export'],
+                        help='import: questions.json -> SQLite; export: SQLite -> questions.json')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB_PATH,
+                        help='SQLite file (default: src/data/questions.db)')
+    parser.add_argument('--json', type=Path, default=DEFAULT_JSON_PATH,
+                        help='questions.json file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if args.command == 'import':
+        # Through the bank so journaled edits are included
+        if not args.json.exists():
+            print(f"❌ Error: questions.json not found at {args.json}")
+            return 1
+        bank = load_bank_or_exit(args.json)
+        with stage('write') as timing:
+            write_document(args.db, bank.data)
+            timing.rows = len(bank.vocabulary) + len(bank.theory)
+        print(f"✓ Imported {len(bank.vocabulary)} vocabulary and {len(bank.theory)} "
+              f"theory questions into {args.db}")
+        print_profile(args, {'vocabulary': len(bank.vocabulary), 'theory': len(bank.theory)})
+        return 0
+
+    if not args.db.exists():
+        print(f"❌ Error: SQLite store not found at {args.db}")
+        return 1
+    with stage('write'):
+        try:
+            changed = export_json(args.db, args.json)
+        except JournalError as e:
+            print(f"❌ Error: {e}")
+            return 1
+    print(f"{'✓ Exported' if changed else '✓ Unchanged'}: {args.json}")
+    print_profile(args, {'changed': changed})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for questions.json.
+
+iter_questions() yields one question at a time while reading the file in
+chunks, so scripts that only need a single pass (validate_unique_ids.py,
+match_vocabulary.py, match_theory.py) never hold the whole document in
+memory. Only the question being yielded and one read chunk are kept; other
+sections are decoded element by element and dropped.
+
+If the file has a change journal (see question_bank.py) the bank is loaded
+and the journal replayed instead, since journaled edits can change any
+question. SQLite stores (question_store.py) are read section by section.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from question_bank import DEFAULT_JSON_PATH, SECTIONS, is_sqlite_path, journal_path_for, load_bank_or_exit
+
+
+# Bytes read from the file at a time
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Key in questions.json -> section name
+_SECTION_KEYS = {key: section for section, key in SECTIONS.items()}
+
+
+class _JSONStream:
+    """Decode JSON values one at a time from a text file."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping what has been consumed. False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def keys(self) -> Iterator[str]:
+        """Walk the keys of an object; the caller must consume each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def elements(self) -> Iterator[Any]:
+        """Decode the elements of an array one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def _iter_top_level(json_path: Path, wanted: Optional[set]) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """
+    Yield (key, section, question) for every question in the wanted sections
+    and (key, None, value) for other top-level values. Questions in unwanted
+    sections are decoded one at a time and dropped.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        for key in stream.keys():
+            section = _SECTION_KEYS.get(key)
+            if section and stream.peek() == '[':
+                for question in stream.elements():
+                    if wanted is None or section in wanted:
+                        yield key, section, question
+            else:
+                yield key, None, stream.value()
+
+
+def iter_questions(json_path: Path = DEFAULT_JSON_PATH,
+                   section: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (section, question) for every question in file order without
+    loading the whole file.
+
+    Args:
+        json_path: Path to questions.json
+        section: 'vocabulary' or 'theory' to read only that section
+    """
+    json_path = Path(json_path)
+    wanted = None if section is None else {section}
+    if section is not None and section not in SECTIONS:
+        raise ValueError(f"Unknown section '{section}'")
+
+    if is_sqlite_path(json_path):
+        import question_store
+        yield from question_store.iter_questions(json_path, section)
+        return
+
+    if journal_path_for(json_path).exists():
+        for name, question in load_bank_or_exit(json_path).iter_questions():
+            if wanted is None or name in wanted:
+                yield name, question
+        return
+
+    for _, name, question in _iter_top_level(json_path, wanted):
+        if name is not None:
+            yield name, question
+
+
+def read_metadata(json_path: Path = DEFAULT_JSON_PATH) -> Dict:
+    """Read the metadata object, stopping as soon as it has been decoded."""
+    if is_sqlite_path(json_path):
+        import question_store
+        return question_store.read_metadata(json_path)
+    for key, section, value in _iter_top_level(Path(json_path), wanted=set()):
+        if key == 'metadata' and section is None:
+            return value
+    return {}
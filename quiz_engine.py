@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+# Run with: python3 quiz_engine.py sample|simulate [--belt 5_kup] [--questions 25]
+"""
+Python port of the quiz selection in src/utils/quizLogic.js and
+src/utils/answerGenerator.js, for simulating quizzes offline.
+
+QuizEngine reproduces selectQuestions (distribution, per-level selection and
+the top-up loop) and generateQuestion step by step: every Math.random() call
+of the JS code is one call of the engine's random function, in the same
+order, so given the same random stream both pick the same questions, in the
+same order, with the same answer options. The engine uses a seeded
+random.Random by default; pass random= to replay a recorded stream.
+
+With exact=False (--fast) selectQuestions only shuffles as many positions
+of each level as it takes questions (partial_shuffle). Every quiz is as
+likely as in the app, but the random stream differs and a quiz needs
+roughly its own length in random numbers rather than the size of every
+level it draws from.
+
+select_indices() also takes a weight per question (e.g. from scheduler.py).
+Each level still gets its getDistribution share, but within a level
+questions are drawn in proportion to their weight (weighted_sample) instead
+of uniformly. There is no JS counterpart, so weighted quizzes are not exact.
+
+Questions are numbered once (vocabulary, then theory, in file order) and each
+belt rank gets prebuilt index lists, so a simulated quiz only shuffles
+integers. Answer pools, which only depend on the question, are built on first
+use and reused.
+
+  sample    print one quiz
+  simulate  run many quizzes per belt rank and quiz length and report:
+              shortfall   questions missing per level before the top-up,
+                          and questions the top-up could not fill
+              coverage    share of the eligible questions seen at least once,
+                          per belt rank and category
+              repetition  share of a quiz's questions that were also in the
+                          previous quiz
+              short       answer lists with fewer than 4 options (--answers)
+"""
+
+import argparse
+import json
+import math
+import random as random_module
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from build_distractors import load_table
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, QuestionBank, load_bank_or_exit
+
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_DISTRACTORS_PATH = SCRIPT_DIR / 'src' / 'data' / 'distractors.json'
+
+# Belt rank hierarchy (BELT_RANKS in quizLogic.js and answerGenerator.js)
+BELT_RANKS = [
+    '10_kup', '9_kup', '8_kup', '7_kup', '6_kup',
+    '5_kup', '4_kup', '3_kup', '2_kup', '1_kup',
+    '1_dan', '2_dan', '3_dan'
+]
+
+# Quiz lengths offered in Setup.jsx (QUESTION_COUNTS)
+QUESTION_COUNTS = [10, 25, 50, 100]
+
+# Lower belt ranks used by generateVocabularyIncorrectAnswers (getLowerBeltRanks)
+LOWER_BELT_COUNT = 4
+
+ANSWER_OPTIONS = 4
+
+
+def get_distribution(previous_levels: int) -> List[float]:
+    """Share of the quiz for [current, -1, -2, -3, -4] belt ranks (getDistribution)."""
+    if previous_levels == 0:
+        return [1.0]
+    if previous_levels == 1:
+        return [0.7, 0.3]
+    if previous_levels == 2:
+        return [0.6, 0.25, 0.15]
+    if previous_levels == 3:
+        return [0.6, 0.25, 0.10, 0.05]
+    return [0.5, 0.3, 0.1, 0.05, 0.05]
+
+
+def get_belt_ranks_to_include(belt_rank: str) -> List[str]:
+    """The belt rank and all earlier ones, current first (getBeltRanksToInclude)."""
+    if belt_rank not in BELT_RANKS:
+        raise ValueError(f"Invalid belt rank: {belt_rank}")
+    return BELT_RANKS[:BELT_RANKS.index(belt_rank) + 1][::-1]
+
+
+def target_counts(belt_rank: str, total_questions: int) -> List[int]:
+    """Questions wanted from each level before the top-up."""
+    distribution = get_distribution(len(get_belt_ranks_to_include(belt_rank)) - 1)
+    return [math.floor(share * total_questions) for share in distribution]
+
+
+def get_lower_belt_ranks(belt_rank: str, count: int = LOWER_BELT_COUNT) -> List[str]:
+    """Up to `count` belt ranks below belt_rank, easiest first (getLowerBeltRanks)."""
+    if belt_rank not in BELT_RANKS:
+        return []
+    index = BELT_RANKS.index(belt_rank)
+    return BELT_RANKS[max(0, index - count):index]
+
+
+def shuffle(items: Sequence, random: Callable[[], float]) -> List:
+    """Fisher-Yates shuffle of a copy, drawing random numbers like shuffleArray."""
+    shuffled = list(items)
+    for i in range(len(shuffled) - 1, 0, -1):
+        j = int(random() * (i + 1))
+        shuffled[i], shuffled[j] = shuffled[j], shuffled[i]
+    return shuffled
+
+
+def partial_shuffle(items: Sequence, count: int, random: Callable[[], float]) -> List:
+    """`count` items in random order, as likely as shuffle(items)[:count]."""
+    shuffled = list(items)
+    n = len(shuffled)
+    count = min(count, n)
+    for i in range(count):
+        j = i + int(random() * (n - i))
+        shuffled[i], shuffled[j] = shuffled[j], shuffled[i]
+    return shuffled[:count]
+
+
+def weighted_sample(items: Sequence[int], count: int, weights: Sequence[float],
+                    random: Callable[[], float]) -> List[int]:
+    """
+    `count` question numbers drawn without replacement in proportion to
+    weights[n] (Efraimidis-Spirakis keys), heaviest key first. Weight 0 is
+    only drawn when nothing else is left.
+    """
+    keyed = []
+    for n in items:
+        weight = weights[n]
+        keyed.append((random() ** (1.0 / weight) if weight > 0 else -random(), n))
+    keyed.sort(reverse=True)
+    return [n for _, n in keyed[:count]]
+
+
+def _translation(question: Dict, language: str) -> Optional[str]:
+    return (question.get('translations') or {}).get(language)
+
+
+class QuizEngine:
+    """selectQuestions and generateQuestion over one questions.json document."""
+
+    def __init__(self, data: Dict, distractors: Optional[Dict] = None,
+                 seed: Optional[int] = None, random: Optional[Callable[[], float]] = None,
+                 exact: bool = True):
+        self.data = data
+        self.random = random or random_module.Random(seed).random
+        self.exact = exact
+        self.vocabulary = data.get('vocabularyQuestions', [])
+
+        # Every question by number: vocabulary first, then theory
+        self.questions: List[Dict] = self.vocabulary + data.get('theoryQuestions', [])
+        # Questions with the same ID share a key (the top-up compares IDs)
+        keys: Dict[str, int] = {}
+        self.keys = [keys.setdefault(q.get('id'), len(keys)) for q in self.questions]
+
+        # Per belt rank: question numbers in file order, vocabulary before theory
+        self.vocabulary_by_belt: Dict[str, List[int]] = {belt: [] for belt in BELT_RANKS}
+        self.theory_by_belt: Dict[str, List[int]] = {belt: [] for belt in BELT_RANKS}
+        for index, question in enumerate(self.questions):
+            belt = question.get('beltRank')
+            if belt not in self.vocabulary_by_belt:
+                continue
+            if index < len(self.vocabulary):
+                self.vocabulary_by_belt[belt].append(index)
+            elif len((question.get('incorrectAnswers') or {}).get('da') or []) >= 1:
+                # filterQuestionsByBeltRanks drops theory questions without incorrect answers
+                self.theory_by_belt[belt].append(index)
+        self._available: Dict = {}
+
+        # Precomputed distractor table (build_distractors.py); like a JS Map,
+        # a repeated ID keeps its last row and question
+        self.distractors = distractors
+        self.distractor_rows: Dict[str, int] = {}
+        if distractors:
+            self.distractor_rows = {question_id: row for row, question_id in enumerate(distractors['ids'])}
+        self.vocabulary_by_id = {q.get('id'): q for q in self.vocabulary}
+        self._precomputed_pools: Dict = {}
+        self._generated_pools: Dict = {}
+
+    @classmethod
+    def load(cls, json_path: Path = DEFAULT_JSON_PATH,
+             distractors_path: Optional[Path] = DEFAULT_DISTRACTORS_PATH, **kwargs) -> 'QuizEngine':
+        """Engine for a question store, with the distractor table if it exists."""
+        bank = QuestionBank.load(json_path)
+        distractors = load_table(distractors_path, bank)
+        return cls(bank.data, distractors, **kwargs)
+
+    # ------------------------------------------------------------------
+    # selectQuestions
+    # ------------------------------------------------------------------
+
+    def available(self, belt_rank: str, categories: Optional[Sequence[str]] = None) -> List[int]:
+        """Question numbers of a belt rank that pass the category filter."""
+        key = (belt_rank, None if categories is None else frozenset(categories))
+        numbers = self._available.get(key)
+        if numbers is None:
+            numbers = self.vocabulary_by_belt[belt_rank] + self.theory_by_belt[belt_rank]
+            if categories is not None:
+                numbers = [n for n in numbers if self.questions[n].get('category') in key[1]]
+            self._available[key] = numbers
+        return numbers
+
+    def select_indices(self, belt_rank: str, total_questions: int,
+                       categories: Optional[Sequence[str]] = None,
+                       level_counts: Optional[List[int]] = None,
+                       weights: Optional[Sequence[float]] = None) -> List[int]:
+        """
+        selectQuestions, returning question numbers.
+
+        Args:
+            level_counts: If given, filled with the questions taken from each
+                level before the top-up
+            weights: If given, the weight of each question number within its
+                level (see weighted_sample)
+        """
+        random = self.random
+        if weights is not None:
+            def take(items, count):
+                return weighted_sample(items, count, weights, random)
+        elif self.exact:
+            def take(items, count):
+                return shuffle(items, random)[:count]
+        else:
+            def take(items, count):
+                return partial_shuffle(items, count, random)
+
+        belt_ranks = get_belt_ranks_to_include(belt_rank)
+        distribution = get_distribution(len(belt_ranks) - 1)
+        targets = [math.floor(share * total_questions) for share in distribution]
+
+        selected: List[int] = []
+        for i in range(min(len(belt_ranks), len(distribution))):
+            taken = take(self.available(belt_ranks[i], categories), targets[i])
+            selected.extend(taken)
+            if level_counts is not None:
+                level_counts.append(len(taken))
+
+        # Top-up from every level, current first
+        if len(selected) < total_questions:
+            keys = self.keys
+            selected_keys = {keys[n] for n in selected}
+            shortage = total_questions - len(selected)
+            for rank in belt_ranks:
+                if shortage <= 0:
+                    break
+                remaining = [n for n in self.available(rank, categories) if keys[n] not in selected_keys]
+                if remaining:
+                    additional = take(remaining, min(len(remaining), shortage))
+                    selected.extend(additional)
+                    selected_keys.update(keys[n] for n in additional)
+                    shortage -= len(additional)
+
+        return shuffle(selected, random)
+
+    def select_questions(self, belt_rank: str, total_questions: int,
+                         categories: Optional[Sequence[str]] = None) -> Dict:
+        """selectQuestions: {'questions': [...], 'warning': None}"""
+        indices = self.select_indices(belt_rank, total_questions, categories)
+        return {'questions': [self.questions[n] for n in indices], 'warning': None}
+
+    # ------------------------------------------------------------------
+    # generateQuestion
+    # ------------------------------------------------------------------
+
+    def _precomputed_pool(self, question: Dict, language: str) -> Optional[List[str]]:
+        """Resolved answers of a question's distractor table row, or None if fewer than 3."""
+        key = (id(question), language)
+        if key in self._precomputed_pools:
+            return self._precomputed_pools[key]
+
+        pool = None
+        row = self.distractor_rows.get(question.get('id'))
+        candidates = self.distractors.get(language) if row is not None else None
+        if candidates is not None and row < len(candidates):
+            correct = _translation(question, language)
+            ids = self.distractors['ids']
+            pool = []
+            for index in candidates[row]:
+                candidate = self.vocabulary_by_id.get(ids[index])
+                answer = _translation(candidate, language) if candidate else None
+                if answer and answer != correct and answer not in pool:
+                    pool.append(answer)
+            if len(pool) < 3:
+                pool = None
+        self._precomputed_pools[key] = pool
+        return pool
+
+    def _precomputed_answers(self, question: Dict, language: str) -> Optional[List[str]]:
+        """getPrecomputedIncorrectAnswers: 3 answers drawn from the table row, or None if it is too short or stale."""
+        row = self.distractor_rows.get(question.get('id'))
+        candidates = self.distractors.get(language) if row is not None else None
+        if candidates is None or row >= len(candidates) or len(candidates[row]) < 3:
+            return None
+
+        correct = _translation(question, language)
+        ids = self.distractors['ids']
+        answers = []
+        for index in partial_shuffle(candidates[row], 3, self.random):
+            candidate = self.vocabulary_by_id.get(ids[index])
+            answer = _translation(candidate, language) if candidate else None
+            if not answer or answer == correct or answer in answers:
+                return None
+            answers.append(answer)
+        return answers
+
+    def _generated_pool(self, question: Dict, language: str) -> List[str]:
+        """Answer pool of generateVocabularyIncorrectAnswers (before it shuffles)."""
+        key = (id(question), language)
+        pool = self._generated_pools.get(key)
+        if pool is not None:
+            return pool
+
+        correct = _translation(question, language)
+        question_id = question.get('id')
+        pool = []
+        seen = set()
+
+        def add(candidates):
+            for q in candidates:
+                answer = _translation(q, language)
+                if answer and answer != correct and answer not in seen and q.get('id') != question_id:
+                    seen.add(answer)
+                    pool.append(answer)
+
+        add(q for q in self.vocabulary if q.get('category') == question.get('category'))
+        if len(pool) < 3:
+            add(q for q in self.vocabulary if q.get('beltRank') == question.get('beltRank'))
+        if len(pool) < 3:
+            lower = set(get_lower_belt_ranks(question.get('beltRank')))
+            add(q for q in self.vocabulary if q.get('beltRank') in lower)
+
+        self._generated_pools[key] = pool
+        return pool
+
+    def generate_vocabulary_question(self, question: Dict) -> Dict:
+        """generateVocabularyQuestion"""
+        random = self.random
+        direction = ['ko_to_da', 'da_to_ko'][int(random() * 2)]
+        if direction == 'ko_to_da':
+            target = 'da'
+            question_text = f'Hvad er "{_translation(question, "ko")}" på dansk?'
+        else:
+            target = 'ko'
+            question_text = f'Hvad er "{_translation(question, "da")}" på koreansk?'
+        correct = _translation(question, target)
+
+        provided = (question.get('incorrectAnswers') or {}).get(target)
+        if provided:
+            incorrect = provided[:3]
+        else:
+            incorrect = self._precomputed_answers(question, target) if self.distractors else None
+            if incorrect is None:
+                incorrect = shuffle(self._generated_pool(question, target), random)[:3]
+
+        return {
+            'id': question.get('id'),
+            'type': 'vocabulary',
+            'direction': direction,
+            'questionText': question_text,
+            'answers': shuffle([correct] + incorrect, random),
+            'correctAnswer': correct,
+            'beltRank': question.get('beltRank'),
+            'category': question.get('category'),
+        }
+
+    def generate_theory_question(self, question: Dict, language: str = 'da') -> Dict:
+        """generateTheoryQuestion"""
+        correct = question['correctAnswer'][language]
+        incorrect = (question.get('incorrectAnswers') or {}).get(language) or []
+        if len(incorrect) > 3:
+            incorrect = shuffle(incorrect, self.random)[:3]
+
+        return {
+            'id': question.get('id'),
+            'type': 'theory',
+            'questionText': question['question'][language],
+            'answers': shuffle([correct] + incorrect, self.random),
+            'correctAnswer': correct,
+            'beltRank': question.get('beltRank'),
+        }
+
+    def generate_question(self, question: Dict, language: str = 'da') -> Dict:
+        """generateQuestion"""
+        # Like the JS truthiness check on an object: present and not null
+        if question.get('translations') is not None:
+            return self.generate_vocabulary_question(question)
+        if question.get('question') is not None:
+            return self.generate_theory_question(question, language)
+        raise ValueError('Unknown question type')
+
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+
+def _category(question: Dict) -> str:
+    return question.get('category') or 'uncategorized'
+
+
+def simulate(engine: QuizEngine, belt_rank: str, total_questions: int, quizzes: int,
+             categories: Optional[Sequence[str]] = None, answers: bool = False) -> Dict:
+    """
+    Run `quizzes` quizzes for one belt rank and length.
+
+    Returns a dict with the per-level targets and shortfall, the questions the
+    top-up could not fill, coverage per belt rank and category, the
+    repetition rate between consecutive quizzes and, with answers=True, the
+    answer lists with fewer than 4 options.
+    """
+    belt_ranks = get_belt_ranks_to_include(belt_rank)
+    targets = target_counts(belt_rank, total_questions)
+    eligible = [n for rank in belt_ranks for n in engine.available(rank, categories)]
+    seen = bytearray(len(engine.questions))
+
+    level_counts: List[int] = []
+    unfilled = 0
+    repeated = 0
+    picked = 0
+    short = 0
+    previous = set()
+    select = engine.select_indices
+    for _ in range(quizzes):
+        level_counts.clear()
+        selected = select(belt_rank, total_questions, categories, level_counts)
+        unfilled += total_questions - len(selected)
+        picked += len(selected)
+        current = set(selected)
+        repeated += len(current & previous)
+        previous = current
+        for n in selected:
+            seen[n] = 1
+        if answers:
+            for n in selected:
+                if len(engine.generate_question(engine.questions[n])['answers']) < ANSWER_OPTIONS:
+                    short += 1
+
+    coverage: Dict[str, Dict[str, List[int]]] = {}
+    for n in eligible:
+        question = engine.questions[n]
+        counts = coverage.setdefault(question['beltRank'], {}).setdefault(_category(question), [0, 0])
+        counts[0] += seen[n]
+        counts[1] += 1
+
+    return {
+        'beltRank': belt_rank,
+        'questions': total_questions,
+        'quizzes': quizzes,
+        'targets': targets,
+        # Per-level selection is deterministic: min(available, target)
+        'shortfall': [target - taken for target, taken in zip(targets, level_counts)],
+        'unfilled': unfilled / quizzes if quizzes else 0,
+        'repetition': repeated / picked if picked else 0,
+        'coverage': {
+            rank: {category: {'seen': s, 'eligible': e} for category, (s, e) in by_category.items()}
+            for rank, by_category in coverage.items()
+        },
+        'shortAnswers': short,
+    }
+
+
+def _coverage_share(result: Dict) -> float:
+    seen = eligible = 0
+    for by_category in result['coverage'].values():
+        for counts in by_category.values():
+            seen += counts['seen']
+            eligible += counts['eligible']
+    return seen / eligible if eligible else 0
+
+
+def print_sample(engine: QuizEngine, belt_rank: str, total_questions: int,
+                 categories: Optional[Sequence[str]]) -> None:
+    quiz = engine.select_questions(belt_rank, total_questions, categories)['questions']
+    print(f"Quiz for {belt_rank}, {len(quiz)} of {total_questions} questions:\n")
+    for number, question in enumerate(quiz, 1):
+        generated = engine.generate_question(question)
+        print(f"{number:3}. [{generated['beltRank']}] {generated['questionText']}")
+        for answer in generated['answers']:
+            print(f"       {'✓' if answer == generated['correctAnswer'] else ' '} {answer}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate quizzes offline with the app selection logic')
+    parser.add_argument('command', choices=['sample', 'simulate'],
+                        help='sample: print one quiz; simulate: report shortfall, coverage and repetition')
+    parser.add_argument('--belt', default=None,
+                        help='Belt rank (default: 10_kup for sample, every belt rank for simulate)')
+    parser.add_argument('--questions', default=None,
+                        help='Quiz length, comma-separated for simulate (default: 10 / 10,25,50,100)')
+    parser.add_argument('--categories', help='Comma-separated categories to include (default: all)')
+    parser.add_argument('--quizzes', type=int, default=10000,
+                        help='simulate: quizzes per belt rank and length (default: 10000)')
+    parser.add_argument('--answers', action='store_true',
+                        help='simulate: also generate the answer options of every question')
+    parser.add_argument('--fast', action='store_true',
+                        help='simulate: sample with the same odds as the app but not the same random stream')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed (default: random)')
+    parser.add_argument('--json', type=Path, metavar='FILE', help='simulate: also write the results as JSON')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    parser.add_argument('--distractors', type=Path, default=DEFAULT_DISTRACTORS_PATH,
+                        help='Distractor table (default: src/data/distractors.json, skipped if missing)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if not args.store.exists():
+        print(f"❌ Error: questions.json not found at {args.store}")
+        return 1
+    if args.belt and args.belt not in BELT_RANKS:
+        print(f"❌ Error: Invalid belt rank '{args.belt}'")
+        print(f"Valid options: {', '.join(BELT_RANKS)}")
+        return 1
+
+    bank = load_bank_or_exit(args.store)
+    engine = QuizEngine(bank.data, load_table(args.distractors, bank), seed=args.seed,
+                        exact=not (args.fast and args.command == 'simulate'))
+    categories = args.categories.split(',') if args.categories else None
+
+    if args.command == 'sample':
+        print_sample(engine, args.belt or BELT_RANKS[0], int(args.questions or QUESTION_COUNTS[0]), categories)
+        print_profile(args)
+        return 0
+
+    belts = [args.belt] if args.belt else BELT_RANKS
+    lengths = [int(n) for n in args.questions.split(',')] if args.questions else QUESTION_COUNTS
+    results = []
+    start = time.perf_counter()
+    print(f"{'Belt':<7} {'Length':>6} {'Shortfall per level':<22} {'Unfilled':>8} {'Coverage':>9} {'Repeat':>7}")
+    with stage('simulate') as timing:
+        for belt in belts:
+            for length in lengths:
+                result = simulate(engine, belt, length, args.quizzes, categories, args.answers)
+                results.append(result)
+                shortfall = ' '.join(str(n) for n in result['shortfall'])
+                print(f"{belt:<7} {length:>6} {shortfall:<22} {result['unfilled']:>8.1f} "
+                      f"{_coverage_share(result):>8.1%} {result['repetition']:>6.1%}")
+        timing.rows = len(results) * args.quizzes
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'seed': args.seed, 'categories': categories, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    quizzes = len(results) * args.quizzes
+    print(f"\n{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Simulated quizzes: {quizzes:,} ({quizzes / elapsed * 60 if elapsed else 0:,.0f} per minute)")
+    print(f"  ⚠️  Belt/length pairs with a shortfall: {sum(1 for r in results if any(r['shortfall']))}")
+    print(f"  ✗ Belt/length pairs the top-up cannot fill: {sum(1 for r in results if r['unfilled'])}")
+    if args.answers:
+        print(f"  ✗ Answer lists with fewer than {ANSWER_OPTIONS} options: "
+              f"{sum(r['shortAnswers'] for r in results)}")
+    if args.json:
+        print(f"✓ Results written to {args.json}")
+    print_profile(args, {'quizzes': quizzes, 'pairs': len(results)})
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
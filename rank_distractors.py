@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# Run with: python3 rank_distractors.py [--top-k 3] [--full] [--dry-run]
+"""
+Rank the distractors of each question by how often students pick them.
+
+Reads the item statistics of answer_stats.py and, for every question with at
+least MIN_RESPONSES answers, orders the candidate wrong answers by confusion
+rate (times picked / answers to the question):
+
+  vocabulary  candidates are the question's incorrectAnswers and the answers
+              the app would otherwise offer (the distractor table row, or
+              the same-category pool of
+              generateVocabularyIncorrectAnswers) plus every wrong answer
+              students actually picked, each resolved to the vocabulary
+              question it translates. incorrectAnswers.da is written from
+              ko_to_da picks and incorrectAnswers.ko from da_to_ko picks,
+              and only when at least k candidates were picked in that
+              direction; en names the same questions as da.
+  theory      the authored incorrectAnswers are reordered by pick rate, all
+              languages alike and none dropped, and distractors picked by
+              fewer than WEAK_RATE of the students are reported as too easy
+              to rule out.
+
+A language without enough picks is left as it is, so questions with little
+evidence change as little as possible: an empty list lets the app keep
+drawing distractors from its pool. All changes go into the bank in one
+write (or a change set with --dry-run / --save-changes).
+
+By default only questions whose statistics changed since the last applied
+run are recomputed: answer_stats.py numbers each ingest (batch) and the last
+batch applied is kept in .cache/rank-distractors.json. --full recomputes
+every question.
+
+Answer logs do not record which options were shown, so the rate is per
+answer to the question rather than per time a distractor was shown; once a
+vocabulary question has incorrectAnswers the app always shows those, and
+only they collect new picks.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from answer_log import DIRECTIONS
+from answer_stats import DEFAULT_STATS_PATH, MIN_RESPONSES, NO_DIRECTION, AnswerStats, ItemStats
+from build_distractors import load_table
+from changeset import (ChangeSet, StaleChangeSetError, add_changeset_arguments, bank_fingerprint,
+                       finish, is_preview, summary_title)
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, QuestionBank, load_bank_or_exit
+from quiz_engine import DEFAULT_DISTRACTORS_PATH, QuizEngine
+
+
+SCRIPT_DIR = Path(__file__).parent
+STATE_PATH = SCRIPT_DIR / '.cache' / 'rank-distractors.json'
+
+# Answer language of each vocabulary direction
+DIRECTION_LANGUAGES = {'ko_to_da': 'da', 'da_to_ko': 'ko'}
+
+# incorrectAnswers languages written for vocabulary questions
+LANGUAGES = ('da', 'ko', 'en')
+
+# Options the app shows besides the correct answer
+DEFAULT_TOP_K = 3
+
+# Theory distractors picked by fewer students than this are reported
+WEAK_RATE = 0.02
+
+
+def load_state(state_path: Path) -> Dict:
+    """Load the stats batch applied by the last run."""
+    if not state_path.exists():
+        return {'stats': None, 'batch': 0}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state_path: Path, state: Dict) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def _translation(question: Dict, language: str) -> Optional[str]:
+    return (question.get('translations') or {}).get(language)
+
+
+class DistractorRanker:
+    """Confusion-rate ranking of distractors over one bank and its answer statistics."""
+
+    def __init__(self, bank: QuestionBank, stats: AnswerStats,
+                 distractors: Optional[Dict] = None, top_k: int = DEFAULT_TOP_K):
+        self.bank = bank
+        self.stats = stats
+        self.top_k = top_k
+        self.engine = QuizEngine(bank.data, distractors)
+        # language -> answer -> vocabulary questions with that translation
+        self.by_answer: Dict[str, Dict[str, List[Dict]]] = {language: {} for language in LANGUAGES}
+        for question in bank.vocabulary:
+            for language in LANGUAGES:
+                answer = _translation(question, language)
+                if answer:
+                    self.by_answer[language].setdefault(answer, []).append(question)
+
+    def has_new_evidence(self, question_id: str, since_batch: int) -> bool:
+        return any(item.batch > since_batch for item in self.stats.get(question_id).values())
+
+    # ------------------------------------------------------------------
+    # Vocabulary
+    # ------------------------------------------------------------------
+
+    def _resolve(self, question: Dict, answer: str, language: str) -> Optional[Dict]:
+        """The vocabulary question an answer translates, preferring the question's category."""
+        matches = [q for q in self.by_answer[language].get(answer, []) if q is not question]
+        for match in matches:
+            if match.get('category') == question.get('category'):
+                return match
+        return matches[0] if matches else None
+
+    def _pool(self, question: Dict, language: str) -> List[str]:
+        """The answers the app offers when the question has no incorrectAnswers."""
+        pool = self.engine._precomputed_pool(question, language) if self.engine.distractors else None
+        return pool if pool is not None else self.engine._generated_pool(question, language)
+
+    def rank_vocabulary(self, question: Dict) -> Optional[Tuple[Dict[str, List[str]], List[Tuple[Dict, float]]]]:
+        """
+        Rank the candidate questions of a vocabulary question.
+
+        Returns:
+            (incorrectAnswers, [(candidate, rate), ...] best first), or None if
+            there are too few answers or no language has top_k picked
+            candidates
+        """
+        items = self.stats.get(question['id'])
+        answered = sum(items[d].n for d in DIRECTIONS if d in items)
+        if answered < MIN_RESPONSES:
+            return None
+
+        # Candidates in the order the app offers them now, then picked answers
+        candidates: List[Dict] = []
+        seen = set()
+
+        def add(answer: str, language: str) -> None:
+            candidate = self._resolve(question, answer, language)
+            if candidate is not None and id(candidate) not in seen:
+                seen.add(id(candidate))
+                candidates.append(candidate)
+
+        current = question.get('incorrectAnswers') or {}
+        for language in DIRECTION_LANGUAGES.values():
+            for answer in (current.get(language) or []) + self._pool(question, language):
+                add(answer, language)
+        for direction, language in DIRECTION_LANGUAGES.items():
+            if direction in items:
+                for answer in items[direction].picks:
+                    add(answer, language)
+
+        def picks(candidate: Dict, direction: str) -> int:
+            if direction not in items:
+                return 0
+            return items[direction].picks.get(_translation(candidate, DIRECTION_LANGUAGES[direction]), 0)
+
+        # sorted is stable: candidates with equal picks keep the app's order
+        ranked = sorted(((c, sum(picks(c, d) for d in DIRECTION_LANGUAGES) / answered) for c in candidates),
+                        key=lambda r: -r[1])
+
+        # A language is only written when top_k candidates were picked in
+        # its direction; otherwise the app keeps offering its own pool
+        current = question.get('incorrectAnswers') or {}
+        incorrect = dict(current)
+        written = False
+        for direction, language in DIRECTION_LANGUAGES.items():
+            picked = sorted((c for c in candidates if picks(c, direction)), key=lambda c: -picks(c, direction))
+            answers, chosen = self._top_answers(question, picked, language)
+            if len(answers) < self.top_k:
+                continue
+            incorrect[language] = answers
+            written = True
+            if language == 'da':
+                # en names the same questions as da
+                incorrect['en'] = self._top_answers(question, chosen, 'en')[0]
+        if not written:
+            return None
+        return incorrect, ranked
+
+    def _top_answers(self, question: Dict, candidates: List[Dict],
+                     language: str) -> Tuple[List[str], List[Dict]]:
+        """The first top_k distinct wrong answers in a language, and the candidates they came from."""
+        correct = _translation(question, language)
+        answers, chosen = [], []
+        for candidate in candidates:
+            answer = _translation(candidate, language)
+            if answer and answer != correct and answer not in answers:
+                answers.append(answer)
+                chosen.append(candidate)
+                if len(answers) == self.top_k:
+                    break
+        return answers, chosen
+
+    # ------------------------------------------------------------------
+    # Theory
+    # ------------------------------------------------------------------
+
+    def rank_theory(self, question: Dict) -> Optional[Tuple[Dict[str, List[str]], List[Tuple[str, float]]]]:
+        """
+        Reorder a theory question's incorrectAnswers by pick rate.
+
+        No answer is dropped. When the languages do not have the same number
+        of answers, incorrectAnswers is returned unchanged.
+
+        Returns:
+            (incorrectAnswers, [(da answer, rate), ...] best first), or None if
+            there are too few answers
+        """
+        item: Optional[ItemStats] = self.stats.get(question['id']).get(NO_DIRECTION)
+        current = question.get('incorrectAnswers') or {}
+        answers = current.get('da') or []
+        if item is None or item.n < MIN_RESPONSES or not answers:
+            return None
+
+        order = sorted(range(len(answers)), key=lambda i: -item.picks.get(answers[i], 0))
+        ranked = [(answers[i], item.picks.get(answers[i], 0) / item.n) for i in order]
+        # Every language is reordered alike, and only while they are parallel
+        if any(len(values or []) != len(answers) for values in current.values()):
+            return current, ranked
+        incorrect = {language: [values[i] for i in order] for language, values in current.items()}
+        return incorrect, ranked
+
+
+def rank_bank(ranker: DistractorRanker, since_batch: int) -> Dict:
+    """
+    Rank every question with new evidence and record the changes in the bank.
+
+    Returns:
+        Counts and the weak theory distractors found
+    """
+    results = {'considered': 0, 'ranked': 0, 'changed': 0, 'too_few': 0, 'weak': []}
+    bank = ranker.bank
+    for section, question in list(bank.iter_questions()):
+        if not ranker.has_new_evidence(question['id'], since_batch):
+            continue
+        results['considered'] += 1
+
+        if section == 'vocabulary':
+            ranking = ranker.rank_vocabulary(question)
+        else:
+            ranking = ranker.rank_theory(question)
+        if ranking is None:
+            results['too_few'] += 1
+            continue
+        results['ranked'] += 1
+
+        incorrect, ranked = ranking
+        if section == 'theory':
+            results['weak'].extend((question['id'], answer, rate)
+                                   for answer, rate in ranked if rate < WEAK_RATE)
+        if incorrect != question.get('incorrectAnswers'):
+            bank.update(question, incorrectAnswers=incorrect)
+            results['changed'] += 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank distractors by how often students pick them')
+    parser.add_argument('--stats', type=Path, default=DEFAULT_STATS_PATH,
+                        help='Stats file of answer_stats.py (default: answer-stats.json)')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help=f'Distractors kept per vocabulary question (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--full', action='store_true',
+                        help='Recompute every question, not only those with new answers')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    parser.add_argument('--distractors', type=Path, default=DEFAULT_DISTRACTORS_PATH,
+                        help='Distractor table of build_distractors.py (default: src/data/distractors.json)')
+    parser.add_argument('--state', type=Path, default=STATE_PATH,
+                        help='Last applied stats batch (default: .cache/rank-distractors.json)')
+    add_changeset_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if not args.store.exists():
+        print(f"❌ Error: questions.json not found at {args.store}")
+        return 1
+    if not args.stats.exists():
+        print(f"❌ Error: stats file not found at {args.stats} (run answer_stats.py ingest first)")
+        return 1
+    if args.top_k < 1:
+        print("❌ Error: --top-k must be at least 1")
+        return 1
+
+    with stage('load'):
+        try:
+            stats = AnswerStats.load(args.stats)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        fingerprint = bank_fingerprint(args.store)
+        bank = load_bank_or_exit(args.store)
+        distractors = load_table(args.distractors, bank)
+
+    state = load_state(args.state)
+    stats_key = str(args.stats.resolve())
+    since_batch = 0
+    if not args.full and state.get('stats') == stats_key and state.get('batch', 0) <= stats.batch:
+        since_batch = state['batch']
+    if since_batch:
+        print(f"Ranking questions with answers after batch {since_batch} (of {stats.batch})...\n")
+    else:
+        print(f"Ranking all questions with answers (batch {stats.batch})...\n")
+
+    with stage('rank') as timing:
+        ranker = DistractorRanker(bank, stats, distractors, top_k=args.top_k)
+        results = rank_bank(ranker, since_batch)
+        timing.rows = results['considered']
+
+    if results['weak']:
+        print(f"⚠️  Theory distractors picked by fewer than {WEAK_RATE:.0%} of students:")
+        for question_id, answer, rate in results['weak']:
+            print(f"  {question_id}: '{answer}' ({rate:.1%})")
+        print()
+
+    changes = ChangeSet()
+    with stage('write'):
+        changes.save_bank(bank, fingerprint)
+        try:
+            written = finish(changes, args)
+        except StaleChangeSetError as e:
+            # Keep the old state so the next run ranks these answers again
+            print(f"❌ Error: {e}")
+            return 1
+    if not is_preview(args):
+        save_state(args.state, {'stats': stats_key, 'batch': stats.batch})
+
+    print(f"\n{'='*50}")
+    print(summary_title(args))
+    print(f"{'='*50}")
+    print(f"Questions with new answers: {results['considered']}")
+    print(f"  ✓ Ranked: {results['ranked']}")
+    print(f"  ✓ incorrectAnswers changed: {results['changed']}")
+    print(f"  ⚠️  Too few answers or candidates: {results['too_few']}")
+    print(f"  ⚠️  Weak theory distractors: {len(results['weak'])}")
+    if written:
+        print(f"✓ Written: {args.store}")
+    print_profile(args, {'considered': results['considered'], 'changed': results['changed'],
+                         'written': written})
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+# Run with: python3 scheduler.py update|due|quiz [answers.jsonl] [--user anna]
+"""
+Spaced-repetition scheduling of questions per student, from answer logs.
+
+Every answered question (see answer_log.py) is graded and updates the
+student's SM-2 state for that question ID:
+
+  grade  1  wrong answer (a lapse: the question comes back the next day)
+         3  correct but slow (latency >= SLOW_MS)
+         4  correct
+         5  correct and fast (latency <= FAST_MS)
+
+  interval  1 day, then 6 days, then the previous interval x ease
+  ease      starts at 2.5, moves with the grade (SM-2), never below 1.3
+
+A question is due once its interval has passed since the last answer. New
+(never answered) questions are listed separately.
+
+Progress is kept per student in UserProgress: parallel fixed-type arrays
+with a row (24 bytes) per question the student has answered, so scheduling a
+student is a scan over a few short arrays, plus a question -> row dict
+(rebuilt on load) so recording an answer does not search the arrays. The progress file (--progress)
+holds the question IDs and every student's arrays; questions added to or
+removed from the bank since are mapped by ID when it is loaded, following
+the renames recorded in id-remap.json (fix_belt_ranks.py, sync_sources.py).
+
+  update  apply answer logs to the progress file
+  due     print a student's due and new questions per belt rank, or schedule
+          every student and report the throughput
+  quiz    select a quiz like the app, with due questions weighted up within
+          each belt rank's share (QuizEngine.select_indices weights)
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from answer_log import AnswerLogError, event_latency, event_time, is_correct, iter_events
+from fix_belt_ranks import DEFAULT_REMAP_PATH, load_remap
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, load_bank_or_exit
+from quiz_engine import BELT_RANKS, QuizEngine, get_belt_ranks_to_include
+
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_PROGRESS_PATH = SCRIPT_DIR / 'progress.bin'
+
+FORMAT_VERSION = 1
+
+DAY = 86400.0
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVALS = (1.0, 6.0)
+
+# Latency (ms) for grading correct answers
+FAST_MS = 2500
+SLOW_MS = 8000
+
+# Selection weights: due questions get up to 1 + MAX_OVERDUE_BONUS
+NEW_WEIGHT = 1.0
+NOT_DUE_WEIGHT = 0.1
+MAX_OVERDUE_BONUS = 3.0
+
+
+def grade(correct: bool, latency: Optional[float] = None) -> int:
+    """SM-2 quality (0-5) of an answer."""
+    if not correct:
+        return 1
+    if latency is None:
+        return 4
+    if latency <= FAST_MS:
+        return 5
+    if latency >= SLOW_MS:
+        return 3
+    return 4
+
+
+class UserProgress:
+    """SM-2 state of one student: parallel arrays with a row per answered question."""
+
+    __slots__ = ('questions', 'ease', 'interval', 'reps', 'lapses', 'due', 'rows')
+
+    # (attribute, array typecode, value of a new row) in file order
+    FIELDS = (('questions', 'I', 0), ('ease', 'f', DEFAULT_EASE), ('interval', 'f', 0.0),
+              ('reps', 'H', 0), ('lapses', 'H', 0), ('due', 'd', 0.0))
+
+    def __init__(self):
+        for name, typecode, _ in self.FIELDS:
+            setattr(self, name, array(typecode))
+        # question slot -> row
+        self.rows: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def find(self, question: int) -> Optional[int]:
+        """Row of a question slot, or None if the student has not answered it."""
+        return self.rows.get(question)
+
+    def row(self, question: int) -> int:
+        """Row of a question slot, added on first use."""
+        row = self.rows.get(question)
+        if row is None:
+            for name, _, initial in self.FIELDS:
+                getattr(self, name).append(initial)
+            self.questions[-1] = question
+            row = self.rows[question] = len(self.questions) - 1
+        return row
+
+    def review(self, question: int, quality: int, now: float) -> None:
+        """Apply one graded answer (SM-2)."""
+        row = self.row(question)
+        ease = self.ease[row] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+        self.ease[row] = max(MIN_EASE, ease)
+
+        if quality < 3:
+            self.reps[row] = 0
+            self.lapses[row] = min(self.lapses[row] + 1, 0xFFFF)
+            interval = FIRST_INTERVALS[0]
+        else:
+            reps = min(self.reps[row] + 1, 0xFFFF)
+            self.reps[row] = reps
+            if reps <= len(FIRST_INTERVALS):
+                interval = FIRST_INTERVALS[reps - 1]
+            else:
+                interval = self.interval[row] * self.ease[row]
+        self.interval[row] = interval
+        self.due[row] = now + interval * DAY
+
+    def to_bytes(self) -> bytes:
+        chunks = []
+        for name, _, _ in self.FIELDS:
+            values = getattr(self, name)
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            chunks.append(values.tobytes())
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, rows: int) -> 'UserProgress':
+        progress = cls.__new__(cls)
+        offset = 0
+        for name, typecode, _ in cls.FIELDS:
+            values = array(typecode)
+            end = offset + values.itemsize * rows
+            values.frombytes(data[offset:end])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            setattr(progress, name, values)
+            offset = end
+        progress.rows = {question: row for row, question in enumerate(progress.questions)}
+        return progress
+
+    @classmethod
+    def record_size(cls, rows: int) -> int:
+        return sum(array(typecode).itemsize for _, typecode, _ in cls.FIELDS) * rows
+
+
+class Scheduler:
+    """Progress of every student over one question bank."""
+
+    def __init__(self, ids: Sequence[str], belt_ranks: Sequence[Optional[str]]):
+        self.ids = list(ids)
+        self.index = {question_id: i for i, question_id in enumerate(self.ids)}
+        belt_index = {belt: i for i, belt in enumerate(BELT_RANKS)}
+        # BELT_RANKS index of each question (-1: not offered in quizzes)
+        self.belts = array('b', [belt_index.get(belt, -1) for belt in belt_ranks])
+        self.by_belt: Dict[int, List[int]] = {b: [] for b in range(len(BELT_RANKS))}
+        for i, b in enumerate(self.belts):
+            if b >= 0:
+                self.by_belt[b].append(i)
+        self.users: Dict[str, UserProgress] = {}
+
+    @classmethod
+    def from_bank(cls, data: Dict) -> 'Scheduler':
+        """One slot per question ID (the first question with a repeated ID)."""
+        belts: Dict[str, Optional[str]] = {}
+        for key in ('vocabularyQuestions', 'theoryQuestions'):
+            for question in data.get(key, []):
+                belts.setdefault(question.get('id'), question.get('beltRank'))
+        return cls(list(belts), list(belts.values()))
+
+    def user(self, name: str) -> UserProgress:
+        progress = self.users.get(name)
+        if progress is None:
+            progress = self.users[name] = UserProgress()
+        return progress
+
+    # ------------------------------------------------------------------
+    # Answers
+    # ------------------------------------------------------------------
+
+    def record(self, event: Dict, now: Optional[float] = None) -> bool:
+        """
+        Apply one answer event. Returns False if its user or question is
+        unknown or its time or latency is invalid.
+        """
+        index = self.index.get(event.get('id'))
+        user = event.get('user')
+        if index is None or not user:
+            return False
+        try:
+            when = event_time(event)
+            latency = event_latency(event)
+        except ValueError:
+            return False
+        self.user(user).review(index, grade(is_correct(event), latency),
+                               when if when is not None else (now or time.time()))
+        return True
+
+    def ingest(self, events: Iterable[Dict]) -> Dict[str, int]:
+        """Apply answer events in order. Returns 'events', 'applied' and 'skipped' counts."""
+        stats = {'events': 0, 'applied': 0, 'skipped': 0}
+        now = time.time()
+        for event in events:
+            stats['events'] += 1
+            if self.record(event, now):
+                stats['applied'] += 1
+            else:
+                stats['skipped'] += 1
+        return stats
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def due(self, user: str, now: float, belt_ranks: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+        """
+        Due question IDs per belt rank, most overdue first, and the number
+        of questions the student has not answered yet.
+
+        Returns:
+            {belt rank: {'due': [...], 'new': count}} for belt_ranks (default: all)
+        """
+        wanted = sorted(BELT_RANKS.index(belt) for belt in (belt_ranks or BELT_RANKS))
+        overdue: Dict[int, List] = {b: [] for b in wanted}
+        answered = dict.fromkeys(wanted, 0)
+
+        progress = self.users.get(user)
+        if progress is not None:
+            belts = self.belts
+            for question, due in zip(progress.questions, progress.due):
+                b = belts[question]
+                entries = overdue.get(b)
+                if entries is not None:
+                    answered[b] += 1
+                    if due <= now:
+                        entries.append((due, question))
+
+        ids = self.ids
+        return {
+            BELT_RANKS[b]: {
+                'due': [ids[question] for _, question in sorted(overdue[b])],
+                'new': len(self.by_belt[b]) - answered[b],
+            }
+            for b in wanted
+        }
+
+    def weights(self, user: str, now: float) -> array:
+        """
+        Selection weight per question slot: NEW_WEIGHT for new questions,
+        1 plus up to MAX_OVERDUE_BONUS (overdue time / interval) for due
+        ones and NOT_DUE_WEIGHT for the rest.
+        """
+        weights = array('f', [NEW_WEIGHT]) * len(self.ids)
+        progress = self.users.get(user)
+        if progress is None:
+            return weights
+        for question, due, interval in zip(progress.questions, progress.due, progress.interval):
+            if due <= now:
+                weights[question] = 1.0 + min((now - due) / (interval * DAY), MAX_OVERDUE_BONUS)
+            else:
+                weights[question] = NOT_DUE_WEIGHT
+        return weights
+
+    def weights_for(self, questions: Sequence[Dict], user: str, now: float) -> List[float]:
+        """weights() per question of a list, e.g. QuizEngine.questions."""
+        weights = self.weights(user, now)
+        index = self.index
+        return [weights[index[q.get('id')]] if q.get('id') in index else NEW_WEIGHT for q in questions]
+
+    # ------------------------------------------------------------------
+    # Progress file: a JSON header line, then each user's arrays
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        users = list(self.users)
+        header = {'version': FORMAT_VERSION, 'ids': self.ids, 'users': users,
+                  'rows': [len(self.users[user]) for user in users]}
+        fd, tmp_path = tempfile.mkstemp(dir=Path(path).parent, prefix='.progress-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+                for user in users:
+                    f.write(self.users[user].to_bytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_progress(self, path: Path, remap: Optional[Dict[str, str]] = None) -> None:
+        """
+        Read a progress file, mapping its question IDs to this bank's.
+
+        IDs no longer in the bank are looked up in remap (old -> current ID,
+        as in id-remap.json). A renamed question's state is dropped if the
+        file also has state under its current ID.
+        """
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported progress file version: {header.get('version')}")
+            stored_ids = header['ids']
+            same_ids = stored_ids == self.ids
+            mapping = {old: self.index.get(question_id) for old, question_id in enumerate(stored_ids)}
+            if remap and not same_ids:
+                stored = set(stored_ids)
+                for old, question_id in enumerate(stored_ids):
+                    new_id = remap.get(question_id)
+                    if mapping[old] is None and new_id is not None and new_id not in stored:
+                        mapping[old] = self.index.get(new_id)
+            for user, rows in zip(header['users'], header['rows']):
+                progress = UserProgress.from_bytes(f.read(UserProgress.record_size(rows)), rows)
+                if not same_ids:
+                    progress = self._remap(progress, mapping)
+                self.users[user] = progress
+
+    @staticmethod
+    def _remap(stored: UserProgress, mapping: Dict[int, Optional[int]]) -> UserProgress:
+        """Rows of questions still in the bank, with their new slots."""
+        progress = UserProgress()
+        for row, question in enumerate(stored.questions):
+            if mapping.get(question) is None:
+                continue
+            new_row = progress.row(mapping[question])
+            # FIELDS[0] is the question slot, already set by row()
+            for name, _, _ in UserProgress.FIELDS[1:]:
+                getattr(progress, name)[new_row] = getattr(stored, name)[row]
+        return progress
+
+
+def load_scheduler(json_path: Path, progress_path: Path,
+                   remap_path: Optional[Path] = DEFAULT_REMAP_PATH) -> Scheduler:
+    scheduler = Scheduler.from_bank(load_bank_or_exit(json_path).data)
+    if progress_path.exists():
+        with stage('load') as timing:
+            scheduler.load_progress(progress_path, load_remap(remap_path) if remap_path else None)
+            timing.rows = len(scheduler.users)
+    return scheduler
+
+
+def parse_now(value: Optional[str]) -> float:
+    if not value:
+        return time.time()
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def print_due(scheduler: Scheduler, user: str, now: float, belt: Optional[str], limit: int) -> Dict:
+    belts = get_belt_ranks_to_include(belt) if belt else None
+    due = scheduler.due(user, now, belts)
+    when = datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%d %H:%M')
+    print(f"Due for {user} ({when} UTC):\n")
+    for rank, entries in due.items():
+        if not entries['due'] and not entries['new']:
+            continue
+        print(f"  {rank:<7} {len(entries['due']):>4} due {entries['new']:>4} new")
+        progress = scheduler.users.get(user)
+        for question_id in entries['due'][:limit]:
+            overdue = (now - progress.due[progress.find(scheduler.index[question_id])]) / DAY
+            print(f"    {question_id} ({overdue:.1f} days overdue)")
+        if len(entries['due']) > limit:
+            print(f"    ... {len(entries['due']) - limit} more")
+    return due
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spaced-repetition scheduling from answer logs')
+    parser.add_argument('command', choices=['update', 'due', 'quiz'],
+                        help='update: apply answer logs; due: list due questions; quiz: select a weighted quiz')
+    parser.add_argument('logs', nargs='*', help='update: answer log JSONL files (- for stdin, .gz allowed)')
+    parser.add_argument('--user', help='due/quiz: student (due without --user schedules every student)')
+    parser.add_argument('--belt', help='due: only this belt rank and earlier ones; quiz: belt rank (default: 10_kup)')
+    parser.add_argument('--questions', type=int, default=10, help='quiz: quiz length (default: 10)')
+    parser.add_argument('--limit', type=int, default=10, help='due: due questions listed per belt rank (default: 10)')
+    parser.add_argument('--now', help='Schedule as of this ISO 8601 time (default: now)')
+    parser.add_argument('--seed', type=int, default=None, help='quiz: random seed (default: random)')
+    parser.add_argument('--json', type=Path, metavar='FILE', help='due: also write the due sets as JSON')
+    parser.add_argument('--progress', type=Path, default=DEFAULT_PROGRESS_PATH,
+                        help='Progress file (default: progress.bin)')
+    parser.add_argument('--remap-file', type=Path, default=DEFAULT_REMAP_PATH,
+                        help='Old -> new ID history applied to the progress file (default: src/data/id-remap.json)')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    if not args.store.exists():
+        print(f"❌ Error: questions.json not found at {args.store}")
+        return 1
+    if args.belt and args.belt not in BELT_RANKS:
+        print(f"❌ Error: Invalid belt rank '{args.belt}'")
+        print(f"Valid options: {', '.join(BELT_RANKS)}")
+        return 1
+
+    scheduler = load_scheduler(args.store, args.progress, args.remap_file)
+    now = parse_now(args.now)
+
+    if args.command == 'update':
+        if not args.logs:
+            print("❌ Error: no answer logs given")
+            return 1
+        totals = {'events': 0, 'applied': 0, 'skipped': 0}
+        start = time.perf_counter()
+        try:
+            with stage('ingest') as timing:
+                for log in args.logs:
+                    for key, value in scheduler.ingest(iter_events(log)).items():
+                        totals[key] += value
+                timing.rows = totals['events']
+        except AnswerLogError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        elapsed = time.perf_counter() - start
+        with stage('write') as timing:
+            scheduler.save(args.progress)
+            timing.rows = len(scheduler.users)
+
+        print(f"{'='*50}")
+        print(f"SUMMARY")
+        print(f"{'='*50}")
+        print(f"Answer events: {totals['events']} ({totals['events'] / elapsed if elapsed else 0:,.0f}/s)")
+        print(f"  ✓ Applied: {totals['applied']}")
+        print(f"  ⚠️  Skipped (unknown question, no user, invalid time or latency): {totals['skipped']}")
+        print(f"Students: {len(scheduler.users)}")
+        print(f"✓ Progress written to {args.progress}")
+        print_profile(args, totals)
+        return 0
+
+    if args.command == 'quiz':
+        if not args.user:
+            print("❌ Error: quiz needs --user")
+            return 1
+        engine = QuizEngine.load(args.store, seed=args.seed)
+        weights = scheduler.weights_for(engine.questions, args.user, now)
+        selected = engine.select_indices(args.belt or BELT_RANKS[0], args.questions, weights=weights)
+        print(f"Quiz for {args.user} ({args.belt or BELT_RANKS[0]}, {len(selected)} questions):\n")
+        for number, n in enumerate(selected, 1):
+            state = 'due' if weights[n] > NEW_WEIGHT else 'new' if weights[n] == NEW_WEIGHT else ''
+            print(f"  {number:3}. {engine.questions[n]['id']:<40} {state}")
+        print_profile(args)
+        return 0
+
+    if args.user:
+        due = print_due(scheduler, args.user, now, args.belt, args.limit)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({args.user: due}, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            print(f"\n✓ Due sets written to {args.json}")
+        print_profile(args, {'due': sum(len(e['due']) for e in due.values())})
+        return 0
+
+    # Every student
+    belts = get_belt_ranks_to_include(args.belt) if args.belt else None
+    start = time.perf_counter()
+    with stage('schedule') as timing:
+        schedules = {user: scheduler.due(user, now, belts) for user in scheduler.users}
+        timing.rows = len(schedules)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(schedules, f, ensure_ascii=False)
+            f.write('\n')
+
+    due_total = sum(len(e['due']) for due in schedules.values() for e in due.values())
+    print(f"{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Students scheduled: {len(schedules)} ({len(schedules) / elapsed if elapsed else 0:,.0f}/s)")
+    print(f"Due questions: {due_total}")
+    if args.json:
+        print(f"✓ Due sets written to {args.json}")
+    print_profile(args, {'students': len(schedules), 'due': due_total})
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
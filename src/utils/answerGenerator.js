@@ -3,6 +3,8 @@
  * Handles both vocabulary (bidirectional) and theory questions
  */
 
+import distractorTable from '../data/distractors.json';
+
 // Belt rank hierarchy
 const BELT_RANKS = [
   '10_kup', '9_kup', '8_kup', '7_kup', '6_kup',
@@ -36,6 +38,52 @@ function getLowerBeltRanks(beltRank, count = 4) {
   return BELT_RANKS.slice(Math.max(0, currentIndex - count), currentIndex);
 }
 
+// Row of each question in the precomputed distractor table (build_distractors.py)
+const distractorRows = new Map(distractorTable.ids.map((id, index) => [id, index]));
+
+// ID -> question lookup per questions data object, built once on first use
+const questionsById = new WeakMap();
+
+function getQuestionsById(questionsData) {
+  let byId = questionsById.get(questionsData);
+  if (!byId) {
+    byId = new Map(questionsData.vocabularyQuestions.map(q => [q.id, q]));
+    questionsById.set(questionsData, byId);
+  }
+  return byId;
+}
+
+/**
+ * Get incorrect answers from the precomputed distractor table
+ * @param {Object} question - Vocabulary question
+ * @param {string} targetLang - Target language ('da', 'ko', or 'en')
+ * @param {Object} questionsData - Complete questions data
+ * @returns {string[]|null} - Array of 3 incorrect answers, or null if the row is too short or stale
+ */
+function getPrecomputedIncorrectAnswers(question, targetLang, questionsData) {
+  const row = distractorRows.get(question.id);
+  const candidates = row === undefined ? null : distractorTable[targetLang]?.[row];
+  if (!candidates || candidates.length < 3) return null;
+
+  // Draw 3 distinct positions of the (short, deduplicated) row: partial Fisher-Yates
+  const picked = [...candidates];
+  for (let i = 0; i < 3; i++) {
+    const j = i + Math.floor(Math.random() * (picked.length - i));
+    [picked[i], picked[j]] = [picked[j], picked[i]];
+  }
+
+  // Resolve against the current data so a stale table never shows wrong answers
+  const byId = getQuestionsById(questionsData);
+  const correctAnswer = question.translations[targetLang];
+  const answers = [];
+  for (let i = 0; i < 3; i++) {
+    const answer = byId.get(distractorTable.ids[picked[i]])?.translations[targetLang];
+    if (!answer || answer === correctAnswer || answers.includes(answer)) return null;
+    answers.push(answer);
+  }
+  return answers;
+}
+
 /**
  * Generate incorrect answers for vocabulary question
  * @param {Object} question - Vocabulary question
@@ -115,8 +163,9 @@ export function generateVocabularyQuestion(question, questionsData, language = '
     // Use provided incorrect answers
     incorrectAnswers = question.incorrectAnswers[targetLang].slice(0, 3);
   } else {
-    // Generate random incorrect answers
-    incorrectAnswers = generateVocabularyIncorrectAnswers(question, targetLang, questionsData);
+    // Use precomputed candidates, generating them if the table is missing or stale
+    incorrectAnswers = getPrecomputedIncorrectAnswers(question, targetLang, questionsData)
+      || generateVocabularyIncorrectAnswers(question, targetLang, questionsData);
   }
 
   // Combine and shuffle all answers
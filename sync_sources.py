@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# Run with: python3 sync_sources.py sync|watch
+"""
+Sync roskilde-source/*.md with questions.json in a single pass.
+
+Does the work of match_vocabulary.py, match_theory.py and fix_belt_ranks.py
+in one run:
+  - parses each markdown file once
+  - resolves the ID of every vocabulary term and theory question
+  - moves vocabulary questions whose belt rank differs from the markdown
+    file they are listed in (the markdown files are the master source)
+  - writes the markdown ID columns and the questions.json corrections, and
+    records renamed IDs in id-remap.json (--remap-file, see fix_belt_ranks.py)
+
+Files whose content hash (and the questions.json they were synced against)
+has not changed since the last run are skipped. Use --force to sync all.
+
+'watch' keeps running and syncs again whenever a markdown file or
+questions.json changes. It polls file mtimes (no dependencies) and waits
+until saves have settled for --debounce-ms before syncing, so an editor
+writing a file several times in a row triggers one sync. The bank stays
+loaded between syncs and is reloaded only when the store itself changes.
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from changeset import bank_fingerprint
+from fix_belt_ranks import DEFAULT_REMAP_PATH, corrected_id, extract_id_info, load_remap, save_remap
+from markdown_tables import (
+    ParseCache,
+    belt_rank_from_filename,
+    format_markdown_table,
+    is_theory_table,
+    write_if_changed,
+)
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, JournalError, QuestionBank, is_sqlite_path, journal_path_for
+
+
+SCRIPT_DIR = Path(__file__).parent
+STATE_PATH = SCRIPT_DIR / '.cache' / 'sync-state.json'
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of a file's text content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def load_state(state_path: Path) -> Dict:
+    """Load the hashes recorded by the last sync."""
+    if not state_path.exists():
+        return {'bank': None, 'files': {}}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state_path: Path, state: Dict) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def resolve_vocabulary(bank: QuestionBank, korean: str, belt_rank: str) -> Optional[Dict]:
+    """
+    Find the question for a Korean term, preferring one in the file's belt rank.
+    Falls back to the last question with that term (as match_vocabulary.py does).
+    """
+    candidates = bank.find_by_korean(korean)
+    for question in reversed(candidates):
+        if question.get('beltRank') == belt_rank:
+            return question
+    return candidates[-1] if candidates else None
+
+
+def resolve_theory(bank: QuestionBank, question_text: str) -> Optional[Dict]:
+    """Find the theory question with this Danish question text."""
+    candidates = bank.find_by_question_text(question_text)
+    return candidates[-1] if candidates else None
+
+
+class SourceFile:
+    """A parsed markdown file and the question resolved for each of its rows."""
+
+    def __init__(self, path: Path, content: str, rows: List[List[str]]):
+        self.path = path
+        self.content = content
+        self.rows = rows
+        self.is_theory = is_theory_table(self.rows)
+        self.belt_rank = belt_rank_from_filename(path.name)
+        # (row, question or None) for every data row
+        self.matches: List = []
+        self.id_column_index = None
+
+    def resolve(self, bank: QuestionBank) -> None:
+        if not self.rows:
+            return
+
+        header = self.rows[0]
+        if 'ID' not in header:
+            header.append('ID')
+        self.id_column_index = header.index('ID')
+
+        with stage('match') as timing:
+            for row in self.rows[1:]:
+                if len(row) < 2:
+                    continue
+                while len(row) <= self.id_column_index:
+                    row.append('')
+
+                if self.is_theory:
+                    question = resolve_theory(bank, row[1].strip())
+                else:
+                    question = resolve_vocabulary(bank, row[1].strip(), self.belt_rank)
+                self.matches.append((row, question))
+            timing.rows = len(self.matches)
+
+    def render(self) -> str:
+        """Fill the ID column from the (possibly renamed) questions and format the table."""
+        if not self.rows:
+            return self.content
+        for row, question in self.matches:
+            row[self.id_column_index] = question['id'] if question else 'Not found'
+        return format_markdown_table(self.rows)
+
+
+def find_misplaced(source: SourceFile) -> List[Dict]:
+    """Vocabulary questions listed in a file for another belt rank."""
+    if source.is_theory:
+        for row, question in source.matches:
+            belt_rank = row[0].replace('-', '_').lower()
+            if question and question.get('beltRank') != belt_rank:
+                print(f"  ⚠️  {question['id']} is listed as {row[0]} in {source.path.name}")
+        return []
+
+    misplaced = []
+    for _, question in source.matches:
+        if not question or question.get('beltRank') == source.belt_rank:
+            continue
+        id_belt_rank, _, _ = extract_id_info(question.get('id', ''))
+        if id_belt_rank:
+            misplaced.append(question)
+    return misplaced
+
+
+def collect_belt_corrections(sources: List[SourceFile]) -> List:
+    """
+    Decide which misplaced questions to move, as (source, question) pairs.
+
+    A question is not moved if its own belt's file also lists it (the same
+    romanization can mean different things at different belts, e.g. 'Pal'),
+    and it is moved at most once per sync.
+    """
+    anchored = {
+        id(question)
+        for source in sources if not source.is_theory
+        for _, question in source.matches
+        if question and question.get('beltRank') == source.belt_rank
+    }
+
+    moved = {}
+    corrections = []
+    for source in sources:
+        for question in find_misplaced(source):
+            key = id(question)
+            korean = question['translations']['ko']
+            if key in anchored:
+                print(f"  ⚠️  {korean} in {source.path.name} matches {question['id']}, "
+                      f"which is also listed for {question['beltRank']}; not moved")
+            elif key in moved:
+                print(f"  ⚠️  {korean} is also listed in {moved[key]}, not moved again")
+            else:
+                moved[key] = source.path.name
+                corrections.append((source, question))
+    return corrections
+
+
+def sync(json_path: Path, source_dir: Path, state_path: Path,
+         force: bool = False, dry_run: bool = False, verbose: bool = True,
+         remap_path: Path = DEFAULT_REMAP_PATH, bank: Optional[QuestionBank] = None) -> Dict:
+    """
+    Run one sync pass. Returns summary stats.
+    With verbose=False, only files that change are reported. `bank` is the
+    already loaded store at json_path (loaded here if not given); it is
+    saved if questions are moved.
+    """
+    state = {'bank': None, 'files': {}} if force else load_state(state_path)
+    fingerprint = bank_fingerprint(json_path)
+    if bank is None:
+        bank = QuestionBank.load(json_path)
+    bank_unchanged = state.get('bank') == fingerprint
+
+    stats = {'files': 0, 'skipped': 0, 'written': 0, 'found': 0, 'not_found': 0, 'corrected': 0}
+
+    # Read every file once; resolve only those that changed since the last sync
+    cache = ParseCache()
+    sources = []
+    skipped = []
+    for md_file in sorted(source_dir.glob('*.md')):
+        content, rows = cache.read_table(md_file)
+        source = SourceFile(md_file, content, rows)
+        if bank_unchanged and state['files'].get(md_file.name) == content_hash(content):
+            skipped.append(source)
+        else:
+            sources.append(source)
+
+    for source in sources:
+        source.resolve(bank)
+
+    # A move changes IDs that unchanged files may reference (and those files may
+    # anchor a question to its belt), so parse every file before deciding
+    if skipped and any(find_misplaced(source) for source in sources if not source.is_theory):
+        for source in skipped:
+            source.resolve(bank)
+            sources.append(source)
+        sources.sort(key=lambda source: source.path.name)
+        skipped = []
+
+    corrections = collect_belt_corrections(sources)
+    history = load_remap(remap_path) if corrections else {}
+    remap = {}
+    # IDs renamed in this run are retired too, so a swap cannot reuse them
+    retired = set(history)
+
+    if corrections:
+        print(f"Moving {len(corrections)} misplaced questions:\n")
+    for source, question in corrections:
+        old_id = question['id']
+        old_belt = question['beltRank']
+        new_id = corrected_id(bank, old_id, source.belt_rank, retired=retired)
+        bank.rename(question, new_id, belt_rank=source.belt_rank)
+        retired.add(old_id)
+        remap.setdefault(old_id, new_id)
+        stats['corrected'] += 1
+        print(f"  ✓ {question['translations']['ko']}: {old_belt} → {source.belt_rank}")
+        print(f"    Old ID: {old_id}")
+        print(f"    New ID: {new_id}")
+    if corrections:
+        print()
+
+    new_files = {}
+    for source in skipped:
+        if verbose:
+            print(f"Skipping {source.path.name} (unchanged)")
+        stats['skipped'] += 1
+        new_files[source.path.name] = content_hash(source.content)
+
+    writes = []
+    for source in sources:
+        stats['files'] += 1
+        updated = source.render()
+        found = sum(1 for _, question in source.matches if question)
+        not_found = len(source.matches) - found
+        stats['found'] += found
+        stats['not_found'] += not_found
+
+        changed = updated != source.content
+        if verbose or changed:
+            print(f"Processing {source.path.name}... ✓ {found} matched, {not_found} not found"
+                  + (" (updated)" if changed else ""))
+
+        if not source.rows:
+            print(f"  ⚠️  No table found in {source.path.name}")
+
+        if changed:
+            writes.append((source.path, updated))
+        new_files[source.path.name] = content_hash(updated)
+
+    cache.save()
+
+    if dry_run:
+        return stats
+
+    # The bank and id-remap.json are saved before the markdown files: if the
+    # sync is interrupted, the next one re-derives the markdown from them
+    if corrections:
+        bank.save()
+        save_remap(remap_path, history, remap)
+
+    for path, updated in writes:
+        if write_if_changed(path, updated):
+            stats['written'] += 1
+
+    save_state(state_path, {'bank': bank_fingerprint(json_path), 'files': new_files})
+    return stats
+
+
+def snapshot(json_path: Path, source_dir: Path) -> Dict[str, Tuple[int, int]]:
+    """(mtime, size) of the question store, its journal and every markdown file."""
+    paths = [json_path] + sorted(source_dir.glob('*.md'))
+    if not is_sqlite_path(json_path):
+        paths.append(journal_path_for(json_path))
+    result = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        result[str(path)] = (stat.st_mtime_ns, stat.st_size)
+    return result
+
+
+def changed_paths(before: Dict, after: Dict) -> List[str]:
+    """Names of files added, removed or modified between two snapshots."""
+    return sorted(Path(path).name for path in before.keys() | after.keys()
+                  if before.get(path) != after.get(path))
+
+
+class LoadedBank:
+    """The store at a path, loaded again only when its fingerprint changes."""
+
+    def __init__(self, json_path: Path):
+        self.json_path = json_path
+        self.bank: Optional[QuestionBank] = None
+        self.fingerprint: Optional[str] = None
+
+    def get(self) -> QuestionBank:
+        fingerprint = bank_fingerprint(self.json_path)
+        if self.bank is None or fingerprint != self.fingerprint:
+            self.bank = QuestionBank.load(self.json_path)
+            self.fingerprint = fingerprint
+        return self.bank
+
+    def saved(self) -> None:
+        """The bank was saved by us, so it matches the store again."""
+        self.fingerprint = bank_fingerprint(self.json_path)
+
+    def discard(self) -> None:
+        self.bank = None
+
+
+def watch(json_path: Path, source_dir: Path, state_path: Path,
+          interval: float = 0.05, debounce: float = 0.1,
+          remap_path: Path = DEFAULT_REMAP_PATH) -> None:
+    """
+    Sync whenever the sources change, until interrupted.
+
+    The bank stays loaded between syncs and is only reloaded when the store
+    changed on disk.
+
+    Args:
+        interval: Seconds between polls
+        debounce: Seconds the files must stay unchanged before syncing
+    """
+    loaded = LoadedBank(json_path)
+    stats = sync(json_path, source_dir, state_path, verbose=False,
+                 remap_path=remap_path, bank=loaded.get())
+    loaded.saved()
+    print(f"\n👀 Watching {source_dir.name}/*.md and {json_path.name} "
+          f"({stats['files']} files synced, {stats['skipped']} unchanged). Press Ctrl+C to stop.")
+    baseline = snapshot(json_path, source_dir)
+
+    while True:
+        time.sleep(interval)
+        current = snapshot(json_path, source_dir)
+        if current == baseline:
+            continue
+
+        # Wait for the burst of saves to settle
+        settled_at = time.monotonic()
+        while time.monotonic() - settled_at < debounce:
+            time.sleep(interval)
+            latest = snapshot(json_path, source_dir)
+            if latest != current:
+                current = latest
+                settled_at = time.monotonic()
+
+        print(f"\n↻ Changed: {', '.join(changed_paths(baseline, current))}")
+        start = time.perf_counter()
+        try:
+            stats = sync(json_path, source_dir, state_path, verbose=False,
+                         remap_path=remap_path, bank=loaded.get())
+            loaded.saved()
+        except (OSError, ValueError, JournalError) as e:
+            # e.g. a file caught mid-write; retry on its next change
+            print(f"  ⚠️  Sync failed: {e}")
+            # The bank may hold edits that were not saved
+            loaded.discard()
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"  ✓ Synced {stats['files']} files in {elapsed_ms:.0f} ms "
+                  f"({stats['written']} written, {stats['corrected']} belt ranks corrected)")
+        # Our own writes are part of the new baseline
+        baseline = snapshot(json_path, source_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sync roskilde-source markdown files with questions.json'
+    )
+    parser.add_argument('command', choices=['sync', 'watch'],
+                        help='sync: one full pass over all markdown files; '
+                             'watch: sync again whenever a source file changes')
+    parser.add_argument('--force', action='store_true',
+                        help='Sync all files even if unchanged since the last run')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report what would change without writing')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    parser.add_argument('--remap-file', type=Path, default=DEFAULT_REMAP_PATH,
+                        help='Old -> new ID history (default: src/data/id-remap.json)')
+    parser.add_argument('--interval-ms', type=int, default=50,
+                        help='watch: milliseconds between polls (default: 50)')
+    parser.add_argument('--debounce-ms', type=int, default=100,
+                        help='watch: milliseconds files must stay unchanged before syncing (default: 100)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    json_path = args.store
+    source_dir = SCRIPT_DIR / 'roskilde-source'
+
+    # Validate paths
+    if not json_path.exists():
+        print(f"❌ Error: questions.json not found at {json_path}")
+        return 1
+
+    if not source_dir.exists():
+        print(f"❌ Error: roskilde-source directory not found at {source_dir}")
+        return 1
+
+    if args.command == 'watch':
+        if args.dry_run:
+            print("❌ Error: --dry-run cannot be used with watch")
+            return 1
+        try:
+            watch(json_path, source_dir, STATE_PATH,
+                  interval=args.interval_ms / 1000, debounce=args.debounce_ms / 1000,
+                  remap_path=args.remap_file)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        except JournalError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        # Stage totals over every sync of the session
+        print_profile(args)
+        return 0
+
+    try:
+        stats = sync(json_path, source_dir, STATE_PATH, force=args.force, dry_run=args.dry_run,
+                     remap_path=args.remap_file)
+    except JournalError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    # Summary
+    print(f"\n{'='*50}")
+    print(f"SUMMARY{' (DRY RUN)' if args.dry_run else ''}")
+    print(f"{'='*50}")
+    print(f"Files synced: {stats['files']} ({stats['skipped']} unchanged, {stats['written']} written)")
+    print(f"  ✓ Matched: {stats['found']}")
+    print(f"  ✗ Not found: {stats['not_found']}")
+    print(f"  ↻ Belt ranks corrected: {stats['corrected']}")
+    print_profile(args, stats)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
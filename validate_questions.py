@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# Run with: python3 validate_questions.py [--json]
+"""
+Validate the structure and integrity of questions.json in a single pass.
+
+Checks every question once and reports all problems together:
+  - duplicate_id         the same ID is used more than once
+  - missing_field        a required field or translation is missing or empty
+  - id_format            the ID is not vocab-<belt>-<category>-NNN / theory-<belt>-NNN
+  - id_mismatch          the belt rank or category in the ID differs from the fields
+  - unknown_belt         beltRank is not in metadata.beltRanks
+  - unknown_category     category is not in metadata.categories
+  - no_incorrect_answers a theory question has no incorrect answers for a language
+  - duplicate_korean     the same Korean term is used by several vocabulary questions
+                         (a warning: some terms are homonyms, e.g. 'Pal')
+
+Exits with 1 if any errors are found (or warnings, with --strict).
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_bank import DEFAULT_JSON_PATH, SECTIONS, load_bank_or_exit, normalize_text
+
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Languages the quiz uses (ko <-> da for vocabulary, da for theory); English is optional
+VOCABULARY_LANGUAGES = ('ko', 'da')
+THEORY_LANGUAGES = ('da',)
+
+
+def _issue(severity: str, check: str, section: str, index: int, question_id, message: str) -> Dict:
+    return {
+        'severity': severity,
+        'check': check,
+        'section': section,
+        'index': index,
+        'id': question_id,
+        'message': message,
+    }
+
+
+def parse_question_id(section: str, question_id: str) -> Tuple:
+    """
+    Split an ID into (belt rank, category, number).
+
+    'vocab-10_kup-stances-001' -> ('10_kup', 'stances', '001')
+    'theory-1_dan-004'         -> ('1_dan', None, '004')
+    Returns None if the ID does not have the expected shape.
+    """
+    parts = question_id.split('-')
+    if section == 'vocabulary':
+        if len(parts) != 4 or parts[0] != 'vocab':
+            return None
+        _, belt_rank, category, number = parts
+    else:
+        if len(parts) != 3 or parts[0] != 'theory':
+            return None
+        _, belt_rank, number = parts
+        category = None
+    if not belt_rank or (section == 'vocabulary' and not category) or not number.isdigit():
+        return None
+    return belt_rank, category, number
+
+
+def _missing_text(question: Dict, field: str, languages: Tuple[str, ...]) -> List[str]:
+    values = question.get(field)
+    if not isinstance(values, dict):
+        return [field]
+    return [f"{field}.{lang}" for lang in languages if not values.get(lang)]
+
+
+def validate_questions(questions: Iterable[Tuple[str, Dict]], metadata: Dict) -> Dict:
+    """
+    Validate (section, question) pairs in one pass.
+
+    Args:
+        questions: (section, question) pairs, e.g. QuestionBank.iter_questions()
+        metadata: The metadata object with beltRanks and categories
+
+    Returns:
+        Report dict with 'counts', 'errors', 'warnings' and the list of 'issues'
+    """
+    belt_ranks = metadata.get('beltRanks', {})
+    categories = metadata.get('categories', {})
+
+    issues: List[Dict] = []
+    counts = {section: 0 for section in SECTIONS}
+    # First (section, index) of each ID and Korean term, and later occurrences
+    first_id: Dict[str, Tuple[str, int]] = {}
+    repeated_ids: Dict[str, List[Tuple[str, int]]] = {}
+    first_korean: Dict[str, Tuple[int, str]] = {}
+    repeated_korean: Dict[str, List[Tuple[int, str]]] = {}
+
+    for section, question in questions:
+        index = counts[section]
+        counts[section] += 1
+        question_id = question.get('id')
+
+        if not question_id:
+            issues.append(_issue(ERROR, 'missing_field', section, index, None, "missing id"))
+        elif question_id in first_id:
+            repeated_ids.setdefault(question_id, []).append((section, index))
+        else:
+            first_id[question_id] = (section, index)
+
+        if section == 'vocabulary':
+            missing = _missing_text(question, 'translations', VOCABULARY_LANGUAGES)
+        else:
+            missing = (_missing_text(question, 'question', THEORY_LANGUAGES)
+                       + _missing_text(question, 'correctAnswer', THEORY_LANGUAGES))
+        for field in ('beltRank',) + (('category',) if section == 'vocabulary' else ()):
+            if not question.get(field):
+                missing.append(field)
+        for field in missing:
+            issues.append(_issue(ERROR, 'missing_field', section, index, question_id,
+                                 f"missing {field}"))
+
+        belt_rank = question.get('beltRank')
+        category = question.get('category')
+        if belt_rank and belt_rank not in belt_ranks:
+            issues.append(_issue(ERROR, 'unknown_belt', section, index, question_id,
+                                 f"unknown belt rank '{belt_rank}'"))
+        if category and category not in categories:
+            issues.append(_issue(ERROR, 'unknown_category', section, index, question_id,
+                                 f"unknown category '{category}'"))
+
+        if question_id:
+            parsed = parse_question_id(section, question_id)
+            if parsed is None:
+                expected = ('vocab-<belt>-<category>-NNN' if section == 'vocabulary'
+                            else 'theory-<belt>-NNN')
+                issues.append(_issue(ERROR, 'id_format', section, index, question_id,
+                                     f"ID does not match {expected}"))
+            else:
+                id_belt, id_category, _ = parsed
+                if belt_rank and id_belt != belt_rank:
+                    issues.append(_issue(ERROR, 'id_mismatch', section, index, question_id,
+                                         f"ID belt rank '{id_belt}' but beltRank is '{belt_rank}'"))
+                if id_category and category and id_category != category:
+                    issues.append(_issue(ERROR, 'id_mismatch', section, index, question_id,
+                                         f"ID category '{id_category}' but category is '{category}'"))
+
+        if section == 'theory':
+            incorrect = question.get('incorrectAnswers') or {}
+            for lang in THEORY_LANGUAGES:
+                if len(incorrect.get(lang) or []) < 1:
+                    issues.append(_issue(ERROR, 'no_incorrect_answers', section, index, question_id,
+                                         f"no incorrect answers for '{lang}'"))
+        else:
+            korean = normalize_text((question.get('translations') or {}).get('ko') or '')
+            if korean:
+                if korean in first_korean:
+                    repeated_korean.setdefault(korean, []).append((index, question_id))
+                else:
+                    first_korean[korean] = (index, question_id)
+
+    for question_id, others in repeated_ids.items():
+        section, index = first_id[question_id]
+        places = [(section, index)] + others
+        where = ', '.join(f"{s}[{i}]" for s, i in places)
+        issues.append(_issue(ERROR, 'duplicate_id', section, index, question_id,
+                             f"ID appears {len(places)} times: {where}"))
+
+    for korean, others in repeated_korean.items():
+        index, question_id = first_korean[korean]
+        ids = ', '.join(str(other_id) for _, other_id in [(index, question_id)] + others)
+        issues.append(_issue(WARNING, 'duplicate_korean', 'vocabulary', index, question_id,
+                             f"Korean term '{korean}' is used by {len(others) + 1} questions: {ids}"))
+
+    return {
+        'counts': counts,
+        'errors': sum(1 for issue in issues if issue['severity'] == ERROR),
+        'warnings': sum(1 for issue in issues if issue['severity'] == WARNING),
+        'issues': issues,
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Print a report grouped by check."""
+    counts = report['counts']
+    print(f"Total questions found: {sum(counts.values())}")
+    print(f"  - Vocabulary questions: {counts['vocabulary']}")
+    print(f"  - Theory questions: {counts['theory']}")
+
+    by_check: Dict[str, List[Dict]] = {}
+    for issue in report['issues']:
+        by_check.setdefault(issue['check'], []).append(issue)
+
+    for check, issues in by_check.items():
+        icon = '❌' if issues[0]['severity'] == ERROR else '⚠️ '
+        print(f"\n{icon} {check}: {len(issues)}")
+        for issue in issues:
+            label = issue['id'] or f"{issue['section']}[{issue['index']}]"
+            print(f"  {label}: {issue['message']}")
+
+    print(f"\n{'='*50}")
+    print(f"SUMMARY")
+    print(f"{'='*50}")
+    print(f"Errors: {report['errors']}")
+    print(f"Warnings: {report['warnings']}")
+    if not report['errors']:
+        print("\n✅ No errors found!")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Validate the structure and integrity of questions.json'
+    )
+    parser.add_argument('--json', action='store_true',
+                        help='Print the report as JSON')
+    parser.add_argument('--strict', action='store_true',
+                        help='Exit with 1 on warnings as well as errors')
+    parser.add_argument('--store', type=Path, default=DEFAULT_JSON_PATH,
+                        help='Question store: questions.json or a SQLite .db file (default: src/data/questions.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    json_path = args.store
+    if not json_path.exists():
+        print(f"❌ Error: questions.json not found at {json_path}")
+        return 1
+
+    bank = load_bank_or_exit(json_path)
+    start = time.perf_counter()
+    with stage('validate') as timing:
+        report = validate_questions(bank.iter_questions(), bank.data.get('metadata', {}))
+        timing.rows = sum(report['counts'].values())
+    report['seconds'] = round(time.perf_counter() - start, 4)
+
+    summary = {'questions': sum(report['counts'].values()),
+               'errors': report['errors'], 'warnings': report['warnings']}
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        # Keep stdout parseable JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            print_profile(args, summary)
+    else:
+        print(f"Validating: {json_path}\n")
+        print_report(report)
+        print_profile(args, summary)
+
+    failed = report['errors'] or (args.strict and report['warnings'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
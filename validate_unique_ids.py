@@ -2,13 +2,17 @@
 # Run with: python3 validate_unique_ids.py
 """
 Validate that all question IDs in questions.json are unique.
+
+For the full structure and integrity checks see validate_questions.py.
 """
 
-import json
+import argparse
 import sys
-from collections import Counter
 from pathlib import Path
 
+from profiling import add_profile_arguments, print_profile, stage, start_profiling
+from question_stream import iter_questions
+
 
 def validate_unique_ids(json_path: str) -> bool:
     """
@@ -20,46 +24,30 @@ def validate_unique_ids(json_path: str) -> bool:
     Returns:
         True if all IDs are unique, False otherwise
     """
-    # Load the JSON file
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # Collect all IDs
-    all_ids = []
-
-    # Get IDs from vocabulary questions
-    vocab_questions = data.get('vocabularyQuestions', [])
-    for question in vocab_questions:
+    # Stream the questions and collect the sections each ID appears in, in one pass
+    id_sections = {}
+    section_counts = {'vocabulary': 0, 'theory': 0}
+    for section, question in iter_questions(Path(json_path)):
+        section_counts[section] += 1
         if 'id' in question:
-            all_ids.append(('vocabulary', question['id']))
-
-    # Get IDs from theory questions
-    theory_questions = data.get('theoryQuestions', [])
-    for question in theory_questions:
-        if 'id' in question:
-            all_ids.append(('theory', question['id']))
-
-    # Extract just the IDs for counting
-    ids_only = [id_tuple[1] for id_tuple in all_ids]
+            id_sections.setdefault(question['id'], []).append(section)
 
     # Check for duplicates
-    id_counts = Counter(ids_only)
-    duplicates = {id_val: count for id_val, count in id_counts.items() if count > 1}
+    duplicates = {id_val: sections for id_val, sections in id_sections.items() if len(sections) > 1}
 
     # Report results
-    print(f"Total questions found: {len(all_ids)}")
-    print(f"  - Vocabulary questions: {len(vocab_questions)}")
-    print(f"  - Theory questions: {len(theory_questions)}")
-    print(f"\nTotal unique IDs: {len(id_counts)}")
+    print(f"Total questions found: {sum(len(sections) for sections in id_sections.values())}")
+    print(f"  - Vocabulary questions: {section_counts['vocabulary']}")
+    print(f"  - Theory questions: {section_counts['theory']}")
+    print(f"\nTotal unique IDs: {len(id_sections)}")
 
     if duplicates:
         print(f"\n❌ DUPLICATE IDs FOUND: {len(duplicates)}\n")
-        for duplicate_id, count in duplicates.items():
-            print(f"  '{duplicate_id}' appears {count} times")
+        for duplicate_id, sections in duplicates.items():
+            print(f"  '{duplicate_id}' appears {len(sections)} times")
             # Show which question types contain this duplicate
-            for q_type, q_id in all_ids:
-                if q_id == duplicate_id:
-                    print(f"    - in {q_type} questions")
+            for q_type in sections:
+                print(f"    - in {q_type} questions")
         return False
     else:
         print("\n✅ All IDs are unique!")
@@ -67,6 +55,11 @@ def validate_unique_ids(json_path: str) -> bool:
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Validate that all question IDs are unique')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
     # Determine the path to questions.json
     script_dir = Path(__file__).parent
     json_path = script_dir / 'src' / 'data' / 'questions.json'
@@ -77,7 +70,9 @@ def main():
 
     print(f"Validating IDs in: {json_path}\n")
 
-    is_valid = validate_unique_ids(str(json_path))
+    with stage('validate'):
+        is_valid = validate_unique_ids(str(json_path))
+    print_profile(args, {'valid': is_valid})
 
     sys.exit(0 if is_valid else 1)
 